@@ -36,6 +36,8 @@ class UserViewSet(viewsets.ModelViewSet):
     - DELETE /api/accounts/users/{id}/ - Eliminar usuario
     """
     queryset = User.objects.all().order_by('-date_joined')
+    # auth_user no tiene índice en date_joined: al paginar se usa la PK
+    cursor_ordering = ('-id',)
     permission_classes = [permissions.IsAdminUser]
     
     def get_serializer_class(self):
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Assessment, Question, CandidateAnswer
+from .models import Assessment, Question, CandidateAnswer, BankQuestion, QuestionBankRefill
 
 
 class QuestionInline(admin.TabularInline):
@@ -14,7 +14,7 @@ class AssessmentAdmin(admin.ModelAdmin):
     list_display = ['title', 'candidate', 'project', 'assessment_type', 'difficulty', 'status', 'score', 'created_at']
     list_filter = ['assessment_type', 'difficulty', 'status', 'created_at']
     search_fields = ['title', 'candidate__username', 'project__title']
-    readonly_fields = ['created_at', 'updated_at', 'started_at', 'completed_at']
+    readonly_fields = ['created_at', 'updated_at', 'started_at', 'completed_at', 'total_points', 'earned_points']
     inlines = [QuestionInline]
     
     fieldsets = (
@@ -25,7 +25,7 @@ class AssessmentAdmin(admin.ModelAdmin):
             'fields': ('assessment_type', 'difficulty', 'time_limit_minutes', 'passing_score')
         }),
         ('Estado', {
-            'fields': ('status', 'score', 'started_at', 'completed_at')
+            'fields': ('status', 'score', 'total_points', 'earned_points', 'started_at', 'completed_at')
         }),
         ('Metadata', {
             'fields': ('created_at', 'updated_at'),
@@ -97,3 +97,22 @@ class CandidateAnswerAdmin(admin.ModelAdmin):
     def question_short(self, obj):
         return obj.question.question_text[:40] + '...' if len(obj.question.question_text) > 40 else obj.question.question_text
     question_short.short_description = 'Pregunta'
+
+
+@admin.register(BankQuestion)
+class BankQuestionAdmin(admin.ModelAdmin):
+    list_display = ['question_text_short', 'topic', 'difficulty', 'language', 'assessment_type', 'times_used', 'created_at']
+    list_filter = ['assessment_type', 'difficulty', 'language', 'with_code']
+    search_fields = ['topic', 'question_text']
+    readonly_fields = ['times_used', 'created_at']
+
+    def question_text_short(self, obj):
+        return obj.question_text[:60] + '...' if len(obj.question_text) > 60 else obj.question_text
+    question_text_short.short_description = 'Pregunta'
+
+
+@admin.register(QuestionBankRefill)
+class QuestionBankRefillAdmin(admin.ModelAdmin):
+    list_display = ['topic', 'difficulty', 'assessment_type', 'count', 'generated', 'status', 'created_at']
+    list_filter = ['status', 'assessment_type']
+    readonly_fields = ['generated', 'last_error', 'locked_at', 'created_at', 'finished_at']
@@ -1,9 +1,8 @@
-import resend
 from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Assessment
+from notifications.outbox import enqueue_emails
+from .models import Assessment, CandidateAnswer
 import logging
-import time
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +17,9 @@ def send_assessment_invitation(assessment_id, user_ids, custom_message=None):
         custom_message: Mensaje personalizado opcional
     
     Returns:
-        dict: Resultado del envío con conteo de éxitos/errores
+        dict: Resultado con los ids del outbox (el envío lo hace send_outbox_emails)
     """
     try:
-        # Configurar API key de Resend
-        resend.api_key = settings.RESEND_API_KEY
-        
         # Obtener el assessment con relaciones
         assessment = Assessment.objects.select_related(
             'candidate', 'project'
@@ -32,87 +28,77 @@ def send_assessment_invitation(assessment_id, user_ids, custom_message=None):
         # Obtener usuarios a notificar
         users = User.objects.filter(id__in=user_ids)
         
-        emails_sent = 0
-        failed = 0
+        messages = []
         recipients = []
-        errors = []
         
         for user in users:
-            try:
-                # Construir el link directo
-                assessment_link = f"{settings.FRONTEND_URL}/assessments/{assessment_id}"
-                
-                # Mensaje personalizado si existe
-                custom_msg_section = ""
-                if custom_message:
-                    custom_msg_section = f"\n\n💬 Mensaje del equipo:\n{custom_message}\n"
+            if not user.email:
+                continue
+            # Construir el link directo
+            assessment_link = f"{settings.FRONTEND_URL}/assessments/{assessment_id}"
+            
+            # Mensaje personalizado si existe
+            custom_msg_section = ""
+            if custom_message:
+                custom_msg_section = f"\n\n💬 Mensaje del equipo:\n{custom_message}\n"
+            
+            # Template del email
+            html_content = f"""
+            <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <h2 style="color: #4F46E5;">Nueva Evaluación Técnica Asignada</h2>
                 
-                # Template del email
-                html_content = f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <h2 style="color: #4F46E5;">Nueva Evaluación Técnica Asignada</h2>
-                    
-                    <p>Hola <strong>{user.first_name or user.username}</strong>,</p>
-                    
-                    <p>Te han asignado una nueva evaluación técnica:</p>
-                    
-                    <div style="background-color: #f3f4f6; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                        <p style="margin: 8px 0;"><strong>📋 Evaluación:</strong> {assessment.title}</p>
-                        <p style="margin: 8px 0;"><strong>🎯 Tipo:</strong> {assessment.get_assessment_type_display()}</p>
-                    </div>
-                    {custom_msg_section}
-                    <p>
-                        <a href="{assessment_link}" 
-                           style="display: inline-block; background-color: #4F46E5; color: white; 
-                                  padding: 12px 24px; text-decoration: none; border-radius: 6px; 
-                                  font-weight: bold;">
-                            Iniciar Evaluación
-                        </a>
-                    </p>
-                    
-                    <p style="color: #6B7280; font-size: 14px;">
-                        ¡Mucho éxito! Si tienes alguna duda, no dudes en contactarnos.
-                    </p>
-                </body>
-                </html>
-                """
+                <p>Hola <strong>{user.first_name or user.username}</strong>,</p>
                 
-                # Enviar email
-                params = {
-                    "from": settings.FROM_EMAIL,
-                    "to": [user.email],
-                    "subject": f"Nueva Evaluación Técnica Asignada - {assessment.title}",
-                    "html": html_content,
-                }
+                <p>Te han asignado una nueva evaluación técnica:</p>
                 
-                resend.Emails.send(params)
-                emails_sent += 1
-                recipients.append(user.email)
-                logger.info(f"✅ Email enviado a {user.email} para assessment {assessment_id}")
-                time.sleep(0.6)  # Delay para respetar rate limit de Resend (2 req/sec)
+                <div style="background-color: #f3f4f6; padding: 20px; border-radius: 8px; margin: 20px 0;">
+                    <p style="margin: 8px 0;"><strong>📋 Evaluación:</strong> {assessment.title}</p>
+                    <p style="margin: 8px 0;"><strong>🎯 Tipo:</strong> {assessment.get_assessment_type_display()}</p>
+                </div>
+                {custom_msg_section}
+                <p>
+                    <a href="{assessment_link}" 
+                       style="display: inline-block; background-color: #4F46E5; color: white; 
+                              padding: 12px 24px; text-decoration: none; border-radius: 6px; 
+                              font-weight: bold;">
+                        Iniciar Evaluación
+                    </a>
+                </p>
                 
-            except Exception as e:
-                failed += 1
-                error_msg = f"Error enviando a {user.email}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+                <p style="color: #6B7280; font-size: 14px;">
+                    ¡Mucho éxito! Si tienes alguna duda, no dudes en contactarnos.
+                </p>
+            </body>
+            </html>
+            """
+            
+            messages.append({
+                "to": user.email,
+                "subject": f"Nueva Evaluación Técnica Asignada - {assessment.title}",
+                "html": html_content,
+            })
+            recipients.append(user.email)
+        
+        outbox_ids = enqueue_emails(
+            messages, category="assessment_invitation", reference=f"assessment:{assessment_id}"
+        )
+        logger.info(f"📧 {len(outbox_ids)} invitaciones encoladas para assessment {assessment_id}")
         
         return {
             "success": True,
-            "emails_sent": emails_sent,
-            "failed": failed,
+            "emails_queued": len(outbox_ids),
+            "outbox_ids": outbox_ids,
             "recipients": recipients,
-            "errors": errors if errors else None,
-            "message": f"Invitaciones enviadas: {emails_sent} exitosas, {failed} fallidas"
+            "message": f"Invitaciones encoladas: {len(outbox_ids)}"
         }
         
     except Assessment.DoesNotExist:
         logger.error(f"Assessment {assessment_id} no existe")
         return {
             "success": False,
-            "emails_sent": 0,
-            "failed": 0,
+            "emails_queued": 0,
+            "outbox_ids": [],
             "recipients": [],
             "message": "Assessment no encontrado"
         }
@@ -120,8 +106,8 @@ def send_assessment_invitation(assessment_id, user_ids, custom_message=None):
         logger.error(f"Error general en send_assessment_invitation: {str(e)}")
         return {
             "success": False,
-            "emails_sent": 0,
-            "failed": 0,
+            "emails_queued": 0,
+            "outbox_ids": [],
             "recipients": [],
             "message": f"Error: {str(e)}"
         }
@@ -137,25 +123,19 @@ def notify_assessment_completed(assessment_id):
         assessment_id: ID del assessment completado
     
     Returns:
-        dict: Resultado del envío
+        dict: Resultado con los ids del outbox
     """
     try:
-        resend.api_key = settings.RESEND_API_KEY
-        
         # Obtener assessment con relaciones
         assessment = Assessment.objects.select_related(
             'candidate', 'project'
-        ).prefetch_related('answers').get(id=assessment_id)
+        ).get(id=assessment_id)
         
-        emails_sent = 0
-        failed = 0
-        recipients = []
-        errors = []
+        messages = []
         
         # 1. NOTIFICAR AL CANDIDATO
-        try:
-            candidate = assessment.candidate
-            
+        candidate = assessment.candidate
+        if candidate.email:
             html_candidate = f"""
             <html>
             <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
@@ -178,98 +158,82 @@ def notify_assessment_completed(assessment_id):
             </body>
             </html>
             """
-            
-            resend.Emails.send({
-                "from": settings.FROM_EMAIL,
-                "to": [candidate.email],
+            messages.append({
+                "to": candidate.email,
                 "subject": f"Evaluación Completada - {assessment.title}",
                 "html": html_candidate,
             })
-            
-            emails_sent += 1
-            recipients.append(candidate.email)
-            logger.info(f"✅ Confirmación enviada a candidato {candidate.email}")
-            
-        except Exception as e:
-            failed += 1
-            error_msg = f"Error notificando a candidato: {str(e)}"
-            errors.append(error_msg)
-            logger.error(error_msg)
         
         # 2. NOTIFICAR A LOS ADMINS
         admins = User.objects.filter(is_staff=True) | User.objects.filter(is_superuser=True)
         admins = admins.distinct()
         
-        num_answers = assessment.answers.count()
+        num_answers = CandidateAnswer.objects.filter(
+            question__assessment=assessment, candidate=assessment.candidate
+        ).count()
         completed_at = assessment.completed_at.strftime("%d/%m/%Y %H:%M") if assessment.completed_at else "Ahora"
         admin_link = f"{settings.FRONTEND_URL}/admin/assessments"
         
+        # El contenido es el mismo para todos los admins
+        html_admin = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <h2 style="color: #F59E0B;">Evaluación Completada para Revisión</h2>
+            
+            <p>Hola <strong>Admin</strong>,</p>
+            
+            <p>Un candidato ha completado una evaluación:</p>
+            
+            <div style="background-color: #fef3c7; padding: 20px; border-radius: 8px; 
+                        border-left: 4px solid #F59E0B; margin: 20px 0;">
+                <p style="margin: 8px 0;"><strong>👤 Candidato:</strong> {assessment.candidate.first_name} {assessment.candidate.last_name}</p>
+                <p style="margin: 8px 0;"><strong>📧 Email:</strong> {assessment.candidate.email}</p>
+                <p style="margin: 8px 0;"><strong>📋 Evaluación:</strong> {assessment.title}</p>
+                <p style="margin: 8px 0;"><strong>🎯 Tipo:</strong> {assessment.get_assessment_type_display()}</p>
+                <p style="margin: 8px 0;"><strong>📝 Respuestas:</strong> {num_answers}</p>
+                <p style="margin: 8px 0;"><strong>📅 Completada:</strong> {completed_at}</p>
+            </div>
+            
+            <p>
+                <a href="{admin_link}" 
+                   style="display: inline-block; background-color: #F59E0B; color: white; 
+                          padding: 12px 24px; text-decoration: none; border-radius: 6px; 
+                          font-weight: bold;">
+                    Revisar y Calificar
+                </a>
+            </p>
+        </body>
+        </html>
+        """
+
         for admin in admins:
-            try:
-                html_admin = f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <h2 style="color: #F59E0B;">Evaluación Completada para Revisión</h2>
-                    
-                    <p>Hola <strong>Admin</strong>,</p>
-                    
-                    <p>Un candidato ha completado una evaluación:</p>
-                    
-                    <div style="background-color: #fef3c7; padding: 20px; border-radius: 8px; 
-                                border-left: 4px solid #F59E0B; margin: 20px 0;">
-                        <p style="margin: 8px 0;"><strong>👤 Candidato:</strong> {assessment.candidate.first_name} {assessment.candidate.last_name}</p>
-                        <p style="margin: 8px 0;"><strong>📧 Email:</strong> {assessment.candidate.email}</p>
-                        <p style="margin: 8px 0;"><strong>📋 Evaluación:</strong> {assessment.title}</p>
-                        <p style="margin: 8px 0;"><strong>🎯 Tipo:</strong> {assessment.get_assessment_type_display()}</p>
-                        <p style="margin: 8px 0;"><strong>📝 Respuestas:</strong> {num_answers}</p>
-                        <p style="margin: 8px 0;"><strong>📅 Completada:</strong> {completed_at}</p>
-                    </div>
-                    
-                    <p>
-                        <a href="{admin_link}" 
-                           style="display: inline-block; background-color: #F59E0B; color: white; 
-                                  padding: 12px 24px; text-decoration: none; border-radius: 6px; 
-                                  font-weight: bold;">
-                            Revisar y Calificar
-                        </a>
-                    </p>
-                </body>
-                </html>
-                """
-                
-                resend.Emails.send({
-                    "from": settings.FROM_EMAIL,
-                    "to": [admin.email],
-                    "subject": f"Evaluación Completada para Revisión - {assessment.title}",
-                    "html": html_admin,
-                })
-                
-                emails_sent += 1
-                recipients.append(admin.email)
-                logger.info(f"✅ Notificación enviada a admin {admin.email}")
-                time.sleep(0.6)  # Delay para respetar rate limit de Resend (2 req/sec)
-                
-            except Exception as e:
-                failed += 1
-                error_msg = f"Error notificando a admin {admin.email}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+            if not admin.email:
+                continue
+            messages.append({
+                "to": admin.email,
+                "subject": f"Evaluación Completada para Revisión - {assessment.title}",
+                "html": html_admin,
+            })
+        
+        outbox_ids = enqueue_emails(
+            messages, category="assessment_completed", reference=f"assessment:{assessment_id}"
+        )
+        logger.info(f"📧 {len(outbox_ids)} notificaciones encoladas para assessment {assessment_id}")
         
         return {
             "success": True,
-            "emails_sent": emails_sent,
-            "failed": failed,
-            "recipients": recipients,
-            "errors": errors if errors else None,
-            "message": f"Notificaciones enviadas: {emails_sent} exitosas, {failed} fallidas"
+            "emails_queued": len(outbox_ids),
+            "outbox_ids": outbox_ids,
+            "recipients": [m["to"] for m in messages],
+            "message": f"Notificaciones encoladas: {len(outbox_ids)}"
         }
         
     except Assessment.DoesNotExist:
         logger.error(f"Assessment {assessment_id} no existe")
         return {
             "success": False,
-            "emails_sent": 0,
-            "failed": 0,
+            "emails_queued": 0,
+            "outbox_ids": [],
             "recipients": [],
             "message": "Assessment no encontrado"
         }
@@ -277,8 +241,8 @@ def notify_assessment_completed(assessment_id):
         logger.error(f"Error en notify_assessment_completed: {str(e)}")
         return {
             "success": False,
-            "emails_sent": 0,
-            "failed": 0,
+            "emails_queued": 0,
+            "outbox_ids": [],
             "recipients": [],
             "message": f"Error: {str(e)}"
         }
@@ -0,0 +1,60 @@
+"""
+Corrección automática de preguntas cerradas (QUIZ).
+
+La clave de respuestas se arma una vez por evaluación (respuesta correcta
+ya normalizada por pregunta) y cada respuesta del candidato se compara
+contra ella en memoria; evaluate_quiz guarda todo con un solo bulk_update.
+"""
+
+
+def build_answer_key(questions):
+    """{question_id: {"type", "expected", "points", "explanation"}}"""
+    key = {}
+    for question in questions:
+        correct = str(question.correct_answer)
+        if question.question_type == "MULTIPLE_CHOICE":
+            expected = correct.strip()
+        elif question.question_type == "TRUE_FALSE":
+            expected = correct.lower()
+        elif question.question_type == "SHORT_ANSWER":
+            expected = correct.lower().strip()
+        else:
+            expected = None  # CODE no se corrige aquí
+        key[question.id] = {
+            "type": question.question_type,
+            "expected": expected,
+            "points": question.points,
+            "explanation": question.explanation or "",
+        }
+    return key
+
+
+def is_correct_answer(entry, answer):
+    """Compara la respuesta del candidato con la entrada de la clave"""
+    question_type = entry["type"]
+    if question_type == "MULTIPLE_CHOICE":
+        # El frontend puede enviar answer_text ("0", "1", ...) o selected_option_index (int)
+        given = answer.answer_text.strip() if answer.answer_text else str(answer.selected_option_index)
+        return given == entry["expected"]
+    if question_type == "TRUE_FALSE":
+        return answer.answer_text.lower() == entry["expected"]
+    if question_type == "SHORT_ANSWER":
+        return answer.answer_text.lower().strip() == entry["expected"]
+    return False
+
+
+def grade_answers(answer_key, answers):
+    """
+    Marca is_correct / points_earned / feedback en las respuestas (sin
+    guardar). Retorna la lista de respuestas modificadas.
+    """
+    graded = []
+    for answer in answers:
+        entry = answer_key.get(answer.question_id)
+        if entry is None:
+            continue
+        answer.is_correct = is_correct_answer(entry, answer)
+        answer.points_earned = entry["points"] if answer.is_correct else 0
+        answer.feedback = entry["explanation"]
+        graded.append(answer)
+    return graded
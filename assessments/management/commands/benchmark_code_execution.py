@@ -0,0 +1,61 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from assessments.sandbox import LocalSubprocessBackend, WarmPool, WarmPythonPoolBackend, run_test_cases
+
+CODE = """def solution(arr):
+    total = 0
+    for x in arr:
+        if x % 2 == 0:
+            total += x
+    return total
+"""
+
+
+class Command(BaseCommand):
+    help = "Compara la latencia de lanzar un intérprete por corrida contra el pool warm"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=30, help="Corridas por backend")
+        parser.add_argument("--cases", type=int, default=5, help="Test cases por corrida")
+
+    def handle(self, *args, **options):
+        test_cases = [
+            {"input": f"[{list(range(i * 10))}]", "expected_output": str(sum(x for x in range(i * 10) if x % 2 == 0))}
+            for i in range(1, options["cases"] + 1)
+        ]
+
+        # Un worker por corrida, como en producción
+        pool = WarmPool(size=1)
+        warm_backend = WarmPythonPoolBackend(pool)
+        pool.warm_up()
+        try:
+            results = {
+                "Cold spawn": self._measure(LocalSubprocessBackend(), test_cases, options["runs"]),
+                # Entre corridas se espera el reemplazo, como entre requests
+                "Pool warm ": self._measure(warm_backend, test_cases, options["runs"], before_run=pool.wait_ready),
+            }
+        finally:
+            pool.close()
+
+        self.stdout.write(f"📊 {options['runs']} corridas de {len(test_cases)} test cases")
+        for name, latencies in results.items():
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            self.stdout.write(f"   {name}: p50 {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms")
+        speedup = statistics.median(results["Cold spawn"]) / max(statistics.median(results["Pool warm "]), 1e-9)
+        self.stdout.write(self.style.SUCCESS(f"✅ Pool warm {speedup:.1f}x más rápido (p50)"))
+
+    @staticmethod
+    def _measure(backend, test_cases, runs, before_run=None):
+        latencies = []
+        for _ in range(runs):
+            if before_run:
+                before_run()
+            started = time.perf_counter()
+            _, passed = run_test_cases(CODE, "python", test_cases, backend=backend)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if passed != len(test_cases):
+                raise CommandError(f"❌ {backend.name}: {passed}/{len(test_cases)} tests pasados")
+        return latencies
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from assessments.models import Assessment
+from assessments.points import annotate_real_points
+
+TOLERANCE = 1e-6
+
+
+class Command(BaseCommand):
+    help = "Compara total_points / earned_points de cada evaluación con la suma real en la base"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, default=None, help="Solo las evaluaciones de un proyecto")
+        parser.add_argument("--fix", action="store_true", help="Corrige los agregados que difieran")
+
+    def handle(self, *args, **options):
+        assessments = Assessment.objects.all()
+        if options["project"] is not None:
+            assessments = assessments.filter(project_id=options["project"])
+
+        rows = annotate_real_points(assessments).values_list(
+            "id", "total_points", "real_total_points", "earned_points", "real_earned_points"
+        )
+        mismatches = []
+        checked = 0
+        for assessment_id, total, real_total, earned, real_earned in rows.iterator():
+            checked += 1
+            if abs(total - real_total) > TOLERANCE or abs(earned - real_earned) > TOLERANCE:
+                mismatches.append((assessment_id, real_total, real_earned))
+                self.stdout.write(
+                    f"⚠️ Assessment {assessment_id}: total {total} (real {real_total}), "
+                    f"obtenidos {earned} (real {real_earned})"
+                )
+
+        if options["fix"]:
+            for assessment_id, real_total, real_earned in mismatches:
+                Assessment.objects.filter(id=assessment_id).update(
+                    total_points=real_total, earned_points=real_earned
+                )
+
+        action = "corregidas" if options["fix"] else "con diferencias"
+        self.stdout.write(self.style.SUCCESS(f"✅ {checked} evaluaciones revisadas, {len(mismatches)} {action}"))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from assessments.models import BankQuestion
+from assessments.question_bank import enqueue_refill, pool_for, process_pending_refills
+
+
+class Command(BaseCommand):
+    help = "Pre-genera preguntas en el banco (por tema y dificultad) y procesa los refills pendientes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--topic", action="append", default=[], help="Tema a pre-generar (se puede repetir)")
+        parser.add_argument("--difficulty", action="append", choices=["EASY", "MEDIUM", "HARD"], default=[])
+        parser.add_argument("--type", dest="assessment_type", choices=["QUIZ", "CODING"], default="QUIZ")
+        parser.add_argument("--language", default="es", help="Idioma de las preguntas QUIZ")
+        parser.add_argument("--programming-language", default="python", help="Lenguaje de los desafíos CODING")
+        parser.add_argument("--with-code", action="store_true", help="Preguntas QUIZ con fragmentos de código")
+        parser.add_argument("--count", type=int, default=None, help="Preguntas a generar por pool")
+        parser.add_argument("--stats", action="store_true", help="Solo muestra el tamaño de cada pool")
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            pools = (
+                BankQuestion.objects.values("topic_key", "difficulty", "language", "assessment_type", "programming_language")
+                .annotate(total=Count("id"))
+                .order_by("topic_key", "difficulty")
+            )
+            for pool in pools:
+                self.stdout.write(
+                    f"🏦 {pool['topic_key']} [{pool['assessment_type']} {pool['difficulty']} "
+                    f"{pool['programming_language'] or pool['language']}]: {pool['total']}"
+                )
+            return
+
+        for topic in options["topic"]:
+            for difficulty in options["difficulty"] or ["MEDIUM"]:
+                pool = pool_for(
+                    topic, difficulty, options["assessment_type"], options["language"],
+                    programming_language=options["programming_language"], with_code=options["with_code"],
+                )
+                job = enqueue_refill(topic, pool, count=options["count"])
+                self.stdout.write(f"📥 {topic} ({difficulty}): refill {job.id} de {job.count} preguntas")
+
+        processed = process_pending_refills()
+        self.stdout.write(self.style.SUCCESS(f"✅ {processed} refills procesados"))
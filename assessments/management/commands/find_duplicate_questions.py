@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from assessments.models import BankQuestion, Question
+from assessments.similarity import find_clusters
+
+
+class Command(BaseCommand):
+    help = "Reporta grupos de preguntas casi duplicadas (MinHash/LSH) en las evaluaciones o en el banco"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bank", action="store_true", help="Analiza el banco de preguntas en vez de Question")
+        parser.add_argument("--assessment", type=int, help="Solo las preguntas de esta evaluación")
+        parser.add_argument("--project", type=int, help="Solo las preguntas de las evaluaciones de este proyecto")
+        parser.add_argument("--threshold", type=float, default=None, help="Similitud mínima (default QUESTION_SIMILARITY_THRESHOLD)")
+        parser.add_argument("--limit", type=int, default=20, help="Grupos a mostrar")
+
+    def handle(self, *args, **options):
+        if options["bank"]:
+            queryset = BankQuestion.objects.all()
+        else:
+            queryset = Question.objects.all()
+            if options["assessment"]:
+                queryset = queryset.filter(assessment_id=options["assessment"])
+            if options["project"]:
+                queryset = queryset.filter(assessment__project_id=options["project"])
+
+        rows = queryset.order_by("id").values_list("id", "question_text", "code_snippet")
+        total = queryset.count()
+        clusters = find_clusters(rows.iterator(chunk_size=2000), threshold=options["threshold"])
+
+        texts = dict(queryset.filter(id__in=[i for ids in clusters[:options["limit"]] for i in ids]).values_list("id", "question_text"))
+        for ids in clusters[:options["limit"]]:
+            self.stdout.write(f"🔁 {len(ids)} preguntas: {', '.join(str(i) for i in ids)}")
+            for question_id in ids[:3]:
+                self.stdout.write(f"   - [{question_id}] {texts[question_id][:100]}")
+
+        duplicated = sum(len(ids) - 1 for ids in clusters)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {total} preguntas analizadas: {len(clusters)} grupos, {duplicated} casi duplicadas"
+        ))
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from assessments.models import ExecutionCacheEntry
+
+
+class Command(BaseCommand):
+    help = "Elimina del cache de ejecución las entradas vencidas y las menos usadas sobre el máximo"
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=settings.CODE_EXECUTION_CACHE_TTL_DAYS)
+        expired, _ = ExecutionCacheEntry.objects.filter(created_at__lt=cutoff).delete()
+
+        overflow = 0
+        max_rows = settings.CODE_EXECUTION_CACHE_MAX_ROWS
+        if ExecutionCacheEntry.objects.count() > max_rows:
+            # Conservar las max_rows usadas más recientemente
+            threshold = (
+                ExecutionCacheEntry.objects.order_by("-last_used_at")
+                .values_list("last_used_at", flat=True)[max_rows]
+            )
+            overflow, _ = ExecutionCacheEntry.objects.filter(last_used_at__lte=threshold).delete()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {expired} entradas vencidas y {overflow} por exceso eliminadas"))
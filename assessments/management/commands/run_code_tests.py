@@ -0,0 +1,78 @@
+import time
+from concurrent.futures import as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from assessments.models import CandidateAnswer
+from assessments.sandbox import SchedulerBusyError, get_scheduler
+from assessments.sandbox.cache import lookup, merge, store
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta los test_cases de las respuestas CODE a través del scheduler y guarda "
+        "test_results / is_correct (el puntaje con calidad IA sigue en evaluate_code_sandbox)"
+    )
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument("--assessment", type=int, help="Solo las respuestas de esta evaluación")
+        group.add_argument("--project", type=int, help="Todas las evaluaciones del proyecto")
+        parser.add_argument("--no-cache", action="store_true", help="Ejecuta todo aunque haya resultados en cache")
+
+    def handle(self, *args, **options):
+        answers = CandidateAnswer.objects.select_related("question").filter(question__question_type="CODE")
+        if options["assessment"] is not None:
+            answers = answers.filter(question__assessment_id=options["assessment"])
+        else:
+            answers = answers.filter(question__assessment__project_id=options["project"])
+        answers = [a for a in answers.exclude(code_answer="") if a.question.test_cases]
+        if not answers:
+            raise CommandError("No hay respuestas de código con test_cases para ejecutar")
+
+        scheduler = get_scheduler()
+        use_cache = settings.CODE_EXECUTION_CACHE_ENABLED and not options["no_cache"]
+        started = time.perf_counter()
+        updated = []
+        futures = {}
+        for answer in answers:
+            language = (answer.question.programming_language or "python").lower()
+            test_cases = answer.question.test_cases
+            # El cache se consulta y se escribe desde este thread; al scheduler solo van los faltantes
+            cached = lookup(answer.code_answer, language, test_cases) if use_cache else [None] * len(test_cases)
+            missing = [tc for tc, entry in zip(test_cases, cached) if entry is None]
+            if not missing:
+                self._save(answer, *merge(test_cases, cached, []), updated)
+                continue
+            try:
+                future = scheduler.submit(answer.candidate_id, answer.code_answer, language, missing)
+            except SchedulerBusyError as e:
+                self.stderr.write(f"⚠️ Answer {answer.id} no encolada: {e}")
+                continue
+            futures[future] = (answer, language, cached, missing)
+
+        for future in as_completed(futures):
+            answer, language, cached, missing = futures[future]
+            try:
+                fresh_results, _ = future.result()
+            except Exception as e:
+                self.stderr.write(f"❌ Answer {answer.id}: {e}")
+                continue
+            if use_cache:
+                store(answer.code_answer, language, missing, fresh_results)
+            self._save(answer, *merge(answer.question.test_cases, cached, fresh_results), updated)
+
+        CandidateAnswer.objects.bulk_update(updated, ["test_results", "is_correct"], batch_size=200)
+        elapsed = time.perf_counter() - started
+        metrics = scheduler.metrics_snapshot()["latency_ms"]
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(updated)}/{len(answers)} respuestas en {elapsed:.1f}s "
+            f"(espera p95 {metrics['wait_p95']}ms, ejecución p95 {metrics['run_p95']}ms)"
+        ))
+
+    def _save(self, answer, test_results, passed, updated):
+        answer.test_results = test_results
+        answer.is_correct = passed == len(test_results)
+        updated.append(answer)
+        self.stdout.write(f"   Answer {answer.id}: {passed}/{len(test_results)} tests")
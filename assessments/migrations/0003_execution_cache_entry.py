@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0002_candidateanswer_code_answer_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecutionCacheEntry',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('language', models.CharField(max_length=50)),
+                ('actual_output', models.TextField(blank=True)),
+                ('execution_time_ms', models.FloatField(default=0.0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='assessments_last_us_c938a9_idx')],
+            },
+        ),
+    ]
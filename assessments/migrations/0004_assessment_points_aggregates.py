@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:59
+
+from django.db import migrations, models
+from django.db.models import FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_points(apps, schema_editor):
+    Assessment = apps.get_model('assessments', 'Assessment')
+    Question = apps.get_model('assessments', 'Question')
+    CandidateAnswer = apps.get_model('assessments', 'CandidateAnswer')
+
+    total = (
+        Question.objects.filter(assessment=OuterRef('pk'))
+        .values('assessment').annotate(total=Sum('points')).values('total')
+    )
+    earned = (
+        CandidateAnswer.objects.filter(question__assessment=OuterRef('pk'), candidate=OuterRef('candidate'))
+        .values('question__assessment').annotate(total=Sum('points_earned')).values('total')
+    )
+    Assessment.objects.update(
+        total_points=Coalesce(Subquery(total, output_field=FloatField()), Value(0.0)),
+        earned_points=Coalesce(Subquery(earned, output_field=FloatField()), Value(0.0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0003_execution_cache_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='earned_points',
+            field=models.FloatField(default=0.0, help_text='Suma de points_earned del candidato'),
+        ),
+        migrations.AddField(
+            model_name='assessment',
+            name='total_points',
+            field=models.FloatField(default=0.0, help_text='Suma de los puntos de las preguntas'),
+        ),
+        migrations.RunPython(populate_points, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0004_assessment_points_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(help_text='Tema tal como se pidió', max_length=200)),
+                ('topic_key', models.CharField(help_text='Tema normalizado (minúsculas, sin acentos)', max_length=200)),
+                ('difficulty', models.CharField(choices=[('EASY', 'Fácil'), ('MEDIUM', 'Medio'), ('HARD', 'Difícil')], max_length=10)),
+                ('language', models.CharField(default='es', help_text='Idioma de la pregunta', max_length=5)),
+                ('assessment_type', models.CharField(choices=[('QUIZ', 'Cuestionario Técnico'), ('CODING', 'Prueba Práctica de Código')], max_length=10)),
+                ('programming_language', models.CharField(blank=True, max_length=50)),
+                ('with_code', models.BooleanField(default=False, help_text='Generada pidiendo fragmentos de código')),
+                ('question_type', models.CharField(choices=[('MULTIPLE_CHOICE', 'Opción Múltiple'), ('TRUE_FALSE', 'Verdadero/Falso'), ('CODE', 'Código (Editor Monaco)'), ('SHORT_ANSWER', 'Respuesta Corta')], max_length=20)),
+                ('question_text', models.TextField()),
+                ('code_snippet', models.TextField(blank=True)),
+                ('options', models.JSONField(blank=True, default=list)),
+                ('correct_answer', models.TextField(blank=True)),
+                ('test_cases', models.JSONField(blank=True, default=list)),
+                ('points', models.FloatField(default=10.0)),
+                ('explanation', models.TextField(blank=True)),
+                ('times_used', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['times_used', 'id'],
+                'indexes': [models.Index(fields=['topic_key', 'difficulty', 'language', 'assessment_type', 'programming_language', 'with_code'], name='bank_pool_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='bank_question',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='uses', to='assessments.bankquestion'),
+        ),
+        migrations.CreateModel(
+            name='QuestionBankRefill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=200)),
+                ('topic_key', models.CharField(max_length=200)),
+                ('difficulty', models.CharField(choices=[('EASY', 'Fácil'), ('MEDIUM', 'Medio'), ('HARD', 'Difícil')], max_length=10)),
+                ('language', models.CharField(default='es', max_length=5)),
+                ('assessment_type', models.CharField(choices=[('QUIZ', 'Cuestionario Técnico'), ('CODING', 'Prueba Práctica de Código')], max_length=10)),
+                ('programming_language', models.CharField(blank=True, max_length=50)),
+                ('with_code', models.BooleanField(default=False)),
+                ('count', models.IntegerField(help_text='Preguntas a generar')),
+                ('status', models.CharField(choices=[('PENDING', 'Pendiente'), ('RUNNING', 'En ejecución'), ('DONE', 'Terminado'), ('FAILED', 'Fallido')], default='PENDING', max_length=20)),
+                ('generated', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='assessments_status_0168c2_idx')],
+            },
+        ),
+    ]
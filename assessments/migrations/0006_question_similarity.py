@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from assessments.similarity import band_keys, signature
+
+
+def index_bank(apps, schema_editor):
+    BankQuestion = apps.get_model('assessments', 'BankQuestion')
+    BankQuestionBand = apps.get_model('assessments', 'BankQuestionBand')
+    for question in BankQuestion.objects.all().iterator():
+        question.signature = signature(question.question_text, question.code_snippet)
+        question.save(update_fields=['signature'])
+        BankQuestionBand.objects.bulk_create([
+            BankQuestionBand(bank_question_id=question.id, band_key=key) for key in band_keys(question.signature)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0005_question_bank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankquestion',
+            name='signature',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.CreateModel(
+            name='BankQuestionBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band_key', models.CharField(max_length=24)),
+                ('bank_question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='assessments.bankquestion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band_key'], name='assessments_band_ke_ac6af2_idx')],
+            },
+        ),
+        migrations.RunPython(index_bank, migrations.RunPython.noop),
+    ]
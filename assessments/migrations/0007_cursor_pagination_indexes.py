@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0006_question_similarity'),
+        ('projects', '0003_project_is_hidden'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['-created_at'], name='assessments_created_e654f3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['candidate', '-created_at'], name='assessments_candida_fbad06_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidateanswer',
+            index=models.Index(fields=['-answered_at'], name='assessments_answere_1020cb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidateanswer',
+            index=models.Index(fields=['candidate', '-answered_at'], name='assessments_candida_77110d_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessments', '0007_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionbankrefill',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -37,6 +37,9 @@ class Assessment(models.Model):
     # Metadata
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
     score = models.FloatField(null=True, blank=True, help_text="Puntuación final (0-100)")
+    # Agregados mantenidos por Question / CandidateAnswer (ver points.py)
+    total_points = models.FloatField(default=0.0, help_text="Suma de los puntos de las preguntas")
+    earned_points = models.FloatField(default=0.0, help_text="Suma de points_earned del candidato")
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -47,8 +50,23 @@ class Assessment(models.Model):
         indexes = [
             models.Index(fields=["candidate", "status"]),
             models.Index(fields=["project"]),
+            # Paginación por cursor (todas / las del candidato)
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["candidate", "-created_at"]),
         ]
     
+    AGGREGATE_FIELDS = ("total_points", "earned_points")
+
+    def save(self, *args, **kwargs):
+        # Los agregados se actualizan con UPDATE atómicos desde preguntas y
+        # respuestas; guardar una instancia cargada antes no debe pisarlos
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.AGGREGATE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.title} - {self.candidate.username} ({self.get_assessment_type_display()})"
 
@@ -84,6 +102,10 @@ class Question(models.Model):
     # Generado por IA
     generated_by_ai = models.BooleanField(default=False)
     ai_prompt = models.TextField(blank=True, help_text="Prompt usado para generar la pregunta")
+    # Pregunta del banco de la que se copió (para no repetirla al mismo candidato)
+    bank_question = models.ForeignKey(
+        "BankQuestion", null=True, blank=True, on_delete=models.SET_NULL, related_name="uses"
+    )
     
     class Meta:
         ordering = ["assessment", "order"]
@@ -91,6 +113,37 @@ class Question(models.Model):
             models.Index(fields=["assessment", "order"]),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_points = (instance.__dict__.get("assessment_id"), instance.__dict__.get("points"))
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .points import add_total_points
+
+        previous_assessment, previous_points = getattr(self, "_saved_points", (None, None))
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"points", "assessment", "assessment_id"} & set(update_fields):
+            if previous_assessment is None or previous_points is None:
+                add_total_points(self.assessment_id, self.points)
+            elif previous_assessment != self.assessment_id:
+                add_total_points(previous_assessment, -previous_points)
+                add_total_points(self.assessment_id, self.points)
+            else:
+                add_total_points(self.assessment_id, self.points - previous_points)
+        self._saved_points = (self.assessment_id, self.points)
+
+    def delete(self, *args, **kwargs):
+        from .points import recompute_points
+
+        assessment_id = self.assessment_id
+        result = super().delete(*args, **kwargs)
+        # El borrado en cascada de respuestas no pasa por CandidateAnswer.delete
+        recompute_points(assessment_id)
+        return result
+
     def __str__(self):
         return f"Q{self.order}: {self.question_text[:50]}..."
 
@@ -124,7 +177,160 @@ class CandidateAnswer(models.Model):
         ordering = ["-answered_at"]
         indexes = [
             models.Index(fields=["candidate", "question"]),
+            # Paginación por cursor (todas / las del candidato)
+            models.Index(fields=["-answered_at"]),
+            models.Index(fields=["candidate", "-answered_at"]),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_points = (
+            instance.__dict__.get("question_id"),
+            instance.__dict__.get("candidate_id"),
+            instance.__dict__.get("points_earned"),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .points import add_earned_points
+
+        previous_question, previous_candidate, previous_points = getattr(self, "_saved_points", (None, None, None))
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not {"points_earned", "question", "candidate"} & set(update_fields):
+            return
+        if previous_question is None or previous_points is None:
+            add_earned_points(self.question_id, self.candidate_id, self.points_earned)
+        elif (previous_question, previous_candidate) != (self.question_id, self.candidate_id):
+            add_earned_points(previous_question, previous_candidate, -previous_points)
+            add_earned_points(self.question_id, self.candidate_id, self.points_earned)
+        else:
+            add_earned_points(self.question_id, self.candidate_id, self.points_earned - previous_points)
+        self._saved_points = (self.question_id, self.candidate_id, self.points_earned)
+
+    def delete(self, *args, **kwargs):
+        from .points import add_earned_points
+
+        question_id, candidate_id, points = self.question_id, self.candidate_id, self.points_earned
+        result = super().delete(*args, **kwargs)
+        add_earned_points(question_id, candidate_id, -points)
+        return result
+
     def __str__(self):
         return f"{self.candidate.username} - {self.question.question_text[:30]}..."
+
+
+class ExecutionCacheEntry(models.Model):
+    """
+    Resultado de ejecutar un código con un input (capa persistente del cache
+    de ejecución). La clave es un hash de (lenguaje, código, input).
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    language = models.CharField(max_length=50)
+    actual_output = models.TextField(blank=True)
+    execution_time_ms = models.FloatField(default=0.0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["last_used_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.language} {self.key[:12]}"
+
+
+class BankQuestion(models.Model):
+    """
+    Pregunta pre-generada por IA en el banco reutilizable. El pool se indexa
+    por (tema normalizado, dificultad, idioma, tipo de prueba, lenguaje de
+    programación, con código); generate_questions toma de aquí antes de
+    llamar a OpenAI (ver question_bank.py).
+    """
+    topic = models.CharField(max_length=200, help_text="Tema tal como se pidió")
+    topic_key = models.CharField(max_length=200, help_text="Tema normalizado (minúsculas, sin acentos)")
+    difficulty = models.CharField(max_length=10, choices=Assessment.DIFFICULTY_CHOICES)
+    language = models.CharField(max_length=5, default="es", help_text="Idioma de la pregunta")
+    assessment_type = models.CharField(max_length=10, choices=Assessment.TYPE_CHOICES)
+    programming_language = models.CharField(max_length=50, blank=True)
+    with_code = models.BooleanField(default=False, help_text="Generada pidiendo fragmentos de código")
+
+    # Mismo contenido que Question
+    question_type = models.CharField(max_length=20, choices=Question.TYPE_CHOICES)
+    question_text = models.TextField()
+    code_snippet = models.TextField(blank=True)
+    options = JSONField(default=list, blank=True)
+    correct_answer = models.TextField(blank=True)
+    test_cases = JSONField(default=list, blank=True)
+    points = models.FloatField(default=10.0)
+    explanation = models.TextField(blank=True)
+
+    times_used = models.IntegerField(default=0)
+    # Firma MinHash de question_text + code_snippet (ver similarity.py)
+    signature = JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["times_used", "id"]
+        indexes = [
+            models.Index(
+                fields=["topic_key", "difficulty", "language", "assessment_type", "programming_language", "with_code"],
+                name="bank_pool_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"[{self.topic} / {self.difficulty}] {self.question_text[:50]}"
+
+
+class BankQuestionBand(models.Model):
+    """Banda LSH de la firma de una pregunta del banco (búsqueda de casi duplicados)"""
+    bank_question = models.ForeignKey(BankQuestion, on_delete=models.CASCADE, related_name="bands")
+    band_key = models.CharField(max_length=24)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["band_key"]),
+        ]
+
+    def __str__(self):
+        return f"{self.band_key} -> {self.bank_question_id}"
+
+
+class QuestionBankRefill(models.Model):
+    """Pedido pendiente de generar más preguntas para un pool del banco"""
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pendiente"),
+        ("RUNNING", "En ejecución"),
+        ("DONE", "Terminado"),
+        ("FAILED", "Fallido"),
+    ]
+
+    topic = models.CharField(max_length=200)
+    topic_key = models.CharField(max_length=200)
+    difficulty = models.CharField(max_length=10, choices=Assessment.DIFFICULTY_CHOICES)
+    language = models.CharField(max_length=5, default="es")
+    assessment_type = models.CharField(max_length=10, choices=Assessment.TYPE_CHOICES)
+    programming_language = models.CharField(max_length=50, blank=True)
+    with_code = models.BooleanField(default=False)
+    count = models.IntegerField(help_text="Preguntas a generar")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    generated = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Cuándo lo tomó un worker: vencido QUESTION_BANK_REFILL_LOCK_TIMEOUT_SECONDS se retoma
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Refill {self.topic} / {self.difficulty} x{self.count} ({self.status})"
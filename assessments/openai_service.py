@@ -2,10 +2,44 @@
 Servicio de integración con OpenAI para generar pruebas técnicas
 """
 import json
+import logging
 import os
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+
 from django.conf import settings
 
+from core.openai_client import chat_completion
+
+from .similarity import MinHashIndex, question_signature
+
+logger = logging.getLogger(__name__)
+
+# Enfoques que se reparten entre las tandas de generación en paralelo
+QUIZ_CHUNK_FOCUSES = [
+    "conceptos fundamentales aplicados a casos prácticos",
+    "análisis de código y predicción de comportamiento",
+    "mejores prácticas, patrones y comparación de enfoques",
+    "casos edge, errores comunes y debugging",
+    "rendimiento, optimización y trade-offs",
+    "herramientas, ecosistema y uso en proyectos reales",
+]
+
+
+def _chunk_focus(index, total):
+    focus = QUIZ_CHUNK_FOCUSES[index % len(QUIZ_CHUNK_FOCUSES)]
+    return f"""
+
+🧩 TANDA {index + 1} DE {total}: otras tandas generan el resto de la evaluación en paralelo.
+Enfoca estas preguntas principalmente en: {focus}."""
+
+
+def _avoid_instructions(questions, limit=30):
+    listed = "\n".join(f"- {q.get('question_text', '')[:160]}" for q in questions[:limit])
+    return f"""
+
+🚫 YA EXISTEN ESTAS PREGUNTAS, NO LAS REPITAS NI HAGAS VARIANTES DE ELLAS:
+{listed}"""
+
 
 class OpenAIAssessmentService:
     """Servicio para generar preguntas técnicas usando OpenAI"""
@@ -14,12 +48,14 @@ class OpenAIAssessmentService:
         api_key = getattr(settings, 'OPENAI_API_KEY', os.getenv('OPENAI_API_KEY'))
         if not api_key:
             raise ValueError("OPENAI_API_KEY no está configurada en settings o variables de entorno")
-        self.client = OpenAI(api_key=api_key)
         
     def generate_quiz_questions(self, topic, difficulty="MEDIUM", num_questions=10, language="es", include_code_snippets=False):
         """
         Genera preguntas de cuestionario técnico
         
+        Si num_questions supera QUIZ_GENERATION_CHUNK_SIZE, el pedido se divide
+        en tandas que se piden en paralelo (ver _generate_quiz_in_chunks).
+        
         Args:
             topic: Tema técnico (ej: "Python avanzado", "React Hooks", "Algoritmos")
             difficulty: EASY, MEDIUM, HARD
@@ -30,6 +66,74 @@ class OpenAIAssessmentService:
         Returns:
             Lista de diccionarios con preguntas
         """
+        chunk_size = settings.QUIZ_GENERATION_CHUNK_SIZE
+        if chunk_size <= 0 or num_questions <= chunk_size:
+            questions = self._request_quiz_questions(topic, difficulty, num_questions, language, include_code_snippets)
+            if len(questions) < num_questions:
+                logger.warning(f"⚠️ Se generaron solo {len(questions)} de {num_questions} preguntas solicitadas")
+            return questions
+        return self._generate_quiz_in_chunks(topic, difficulty, num_questions, language, include_code_snippets, chunk_size)
+
+    def _generate_quiz_in_chunks(self, topic, difficulty, num_questions, language, include_code_snippets, chunk_size):
+        """
+        Pide las preguntas en tandas de hasta chunk_size, como máximo
+        QUIZ_GENERATION_MAX_PARALLEL a la vez. Cada tanda recibe un enfoque
+        distinto para reducir repeticiones; al juntar se descartan casi duplicados
+        y lo que falte se vuelve a pedir (hasta QUIZ_GENERATION_TOPUP_ROUNDS
+        rondas) indicando las preguntas ya generadas.
+        """
+        sizes = [chunk_size] * (num_questions // chunk_size)
+        if num_questions % chunk_size:
+            sizes.append(num_questions % chunk_size)
+
+        questions = []
+        index = MinHashIndex()  # descarta casi duplicados entre tandas
+        errors = []
+
+        def merge(batch):
+            for question in batch:
+                if not question.get("question_text"):
+                    continue
+                if index.add_unique(len(questions), question_signature(question)) is None:
+                    questions.append(question)
+
+        def request(size, extra_instructions):
+            try:
+                return self._request_quiz_questions(
+                    topic, difficulty, size, language, include_code_snippets, extra_instructions
+                )
+            except Exception as e:
+                errors.append(e)
+                logger.warning(f"⚠️ Falló una tanda de {size} preguntas: {e}")
+                return []
+
+        workers = max(1, min(settings.QUIZ_GENERATION_MAX_PARALLEL, len(sizes)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quiz-gen") as pool:
+            futures = [
+                pool.submit(request, size, _chunk_focus(index, len(sizes)))
+                for index, size in enumerate(sizes)
+            ]
+            # Se junta en el orden de las tandas para que el resultado sea estable
+            for future in futures:
+                merge(future.result())
+
+        if not questions and len(errors) == len(sizes):
+            # Todas las tandas fallaron (chat_completion ya reintentó): no insistir
+            raise errors[0]
+
+        for round_number in range(settings.QUIZ_GENERATION_TOPUP_ROUNDS):
+            missing = num_questions - len(questions)
+            if missing <= 0:
+                break
+            logger.info(f"🔁 Completando {missing} preguntas faltantes (ronda {round_number + 1})")
+            merge(request(missing, _avoid_instructions(questions)))
+
+        if len(questions) < num_questions:
+            logger.warning(f"⚠️ Se generaron solo {len(questions)} de {num_questions} preguntas solicitadas")
+        return questions[:num_questions]
+
+    def _request_quiz_questions(self, topic, difficulty, num_questions, language, include_code_snippets, extra_instructions=""):
+        """Una sola llamada a OpenAI por num_questions preguntas"""
         difficulty_map = {
             "EASY": {
                 "description": "nivel BÁSICO/JUNIOR",
@@ -162,13 +266,14 @@ EJEMPLO DE PREGUNTA DE CALIDAD PARA {diff_info['description']}:
   "correct_answer": "1",
   "explanation": "La virtualización (opción B) es la más efectiva porque renderiza solo los elementos visibles en el viewport, reduciendo drásticamente el DOM. React.memo ayuda pero no resuelve el problema de 10,000 elementos montados. Las keys son necesarias pero no mejoran el rendimiento significativamente. useCallback optimiza re-renders pero no reduce la cantidad de elementos.",
   "points": 10
-}}
+}}{extra_instructions}
 
 Ahora genera EXACTAMENTE {num_questions} preguntas de {diff_info['description']} sobre {topic}:
 """
         
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                "quiz_generation",
                 model="gpt-4o-mini",
                 messages=[
                     {
@@ -184,10 +289,6 @@ Ahora genera EXACTAMENTE {num_questions} preguntas de {diff_info['description']}
             result = json.loads(response.choices[0].message.content)
             questions = result.get("questions", [])
             
-            # Validación: asegurar que se generaron suficientes preguntas
-            if len(questions) < num_questions:
-                print(f"⚠️ ADVERTENCIA: Se generaron solo {len(questions)} de {num_questions} preguntas solicitadas")
-            
             # Añadir metadata de tiempo sugerido a cada pregunta
             for question in questions:
                 if "suggested_time_minutes" not in question:
@@ -407,7 +508,8 @@ Ahora genera los {num_challenges} desafíos sobre {topic} en {language}:
 """
         
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                "coding_generation",
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": f"Eres un experto en crear desafíos de programación en {language}. Respondes SOLO con JSON válido."},
@@ -515,7 +617,8 @@ Responde SOLO con JSON:
 RECORDATORIO FINAL: Si marcas "is_correct": true, el score_percentage NO puede ser menor a {criteria['min_score']}."""
 
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                "code_evaluation",
                 model="gpt-4o-mini",
                 messages=[
                     {
@@ -690,7 +793,8 @@ RESPONDE EN JSON con esta estructura EXACTA:
 }}"""
 
             # 4. Llamar a OpenAI
-            response = self.client.chat.completions.create(
+            response = chat_completion(
+                "application_analysis",
                 model="gpt-4o-mini",
                 messages=[
                     {
@@ -0,0 +1,65 @@
+"""
+Agregados de puntaje mantenidos en Assessment.
+
+Assessment.total_points (suma de los puntos de sus preguntas) y
+Assessment.earned_points (suma de points_earned de las respuestas de su
+candidato) se actualizan con UPDATE ... SET x = x + delta cuando se guarda o
+borra una Question / CandidateAnswer, así submit no recorre preguntas ni
+respuestas. Las operaciones masivas (bulk_create / bulk_update) no pasan por
+save(): después de ellas hay que llamar a recompute_points, que recalcula con
+Sum en la base. check_assessment_points detecta y corrige diferencias.
+"""
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Assessment, CandidateAnswer, Question
+
+
+def add_total_points(assessment_id, delta):
+    if delta:
+        Assessment.objects.filter(id=assessment_id).update(total_points=F("total_points") + delta)
+
+
+def add_earned_points(question_id, candidate_id, delta):
+    """Solo cuenta si la respuesta es del candidato de la evaluación"""
+    if delta:
+        Assessment.objects.filter(questions__id=question_id, candidate_id=candidate_id).update(
+            earned_points=F("earned_points") + delta
+        )
+
+
+def annotate_real_points(queryset):
+    """Agrega real_total_points / real_earned_points calculados con Sum (subconsultas)"""
+    total = (
+        Question.objects.filter(assessment=OuterRef("pk"))
+        .values("assessment")
+        .annotate(total=Sum("points"))
+        .values("total")
+    )
+    earned = (
+        CandidateAnswer.objects.filter(question__assessment=OuterRef("pk"), candidate=OuterRef("candidate"))
+        .values("question__assessment")
+        .annotate(total=Sum("points_earned"))
+        .values("total")
+    )
+    return queryset.annotate(
+        real_total_points=Coalesce(Subquery(total, output_field=FloatField()), Value(0.0)),
+        real_earned_points=Coalesce(Subquery(earned, output_field=FloatField()), Value(0.0)),
+    )
+
+
+def recompute_points(assessment):
+    """Fallback: recalcula ambos agregados en la base. Acepta instancia o id."""
+    assessment_id = getattr(assessment, "id", assessment)
+    real = annotate_real_points(Assessment.objects.filter(id=assessment_id)).values(
+        "real_total_points", "real_earned_points"
+    ).first()
+    if real is None:
+        return None
+    Assessment.objects.filter(id=assessment_id).update(
+        total_points=real["real_total_points"], earned_points=real["real_earned_points"]
+    )
+    if isinstance(assessment, Assessment):
+        assessment.total_points = real["real_total_points"]
+        assessment.earned_points = real["real_earned_points"]
+    return real["real_total_points"], real["real_earned_points"]
@@ -0,0 +1,245 @@
+"""
+Banco de preguntas pre-generadas.
+
+Los temas que se evalúan seguido ("Python avanzado" en MEDIUM) no deberían
+esperar a OpenAI en cada generate_questions. El banco guarda preguntas por
+pool (tema normalizado, dificultad, idioma, tipo de prueba, lenguaje de
+programación y si llevan código). generate_questions toma primero las que el
+candidato todavía no vio (las menos usadas primero) y solo pide a OpenAI lo
+que falte. Cuando a un pool le quedan menos de QUESTION_BANK_MIN_AVAILABLE
+preguntas sin usar por ese candidato se encola un QuestionBankRefill, que
+procesa el worker (process_cv_jobs o fill_question_bank). Al agregar
+preguntas se descartan las casi duplicadas del pool (similarity.py).
+"""
+import logging
+import unicodedata
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import BankQuestion, BankQuestionBand, QuestionBankRefill
+from .openai_service import OpenAIAssessmentService
+from .similarity import MinHashIndex, band_keys, question_signature
+
+logger = logging.getLogger(__name__)
+
+POOL_FIELDS = ("topic_key", "difficulty", "language", "assessment_type", "programming_language", "with_code")
+
+
+def normalize_topic(topic):
+    """'  Python  Avanzado ' y 'python avanzado' caen en el mismo pool"""
+    text = unicodedata.normalize("NFKD", topic or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.lower().split())[:200]
+
+
+def pool_for(topic, difficulty, assessment_type, language="es", programming_language="", with_code=False):
+    """Diccionario con los campos que identifican un pool"""
+    if assessment_type == "CODING":
+        with_code = False  # los desafíos siempre llevan código
+    else:
+        programming_language = ""
+    return {
+        "topic_key": normalize_topic(topic),
+        "difficulty": difficulty,
+        "language": language or "es",
+        "assessment_type": assessment_type,
+        "programming_language": programming_language or "",
+        "with_code": bool(with_code),
+    }
+
+
+def available_for(pool, candidate):
+    """Preguntas del pool que el candidato no recibió en ninguna prueba"""
+    return BankQuestion.objects.filter(**pool).exclude(uses__assessment__candidate=candidate)
+
+
+def _as_generated(question):
+    """Mismo formato que devuelve OpenAIAssessmentService, con bank_question_id"""
+    return {
+        "bank_question_id": question.id,
+        "question_type": question.question_type,
+        "question_text": question.question_text,
+        "code_snippet": question.code_snippet,
+        "options": question.options,
+        "correct_answer": question.correct_answer,
+        "test_cases": question.test_cases,
+        "programming_language": question.programming_language,
+        "explanation": question.explanation,
+        "points": question.points,
+    }
+
+
+def draw_questions(topic, pool, candidate, count):
+    """
+    Toma hasta `count` preguntas del pool que el candidato no haya visto y
+    encola un refill si el pool queda bajo. Retorna dicts con el formato de
+    la generación con IA (puede haber menos de `count`).
+    """
+    if not settings.QUESTION_BANK_ENABLED or count <= 0:
+        return []
+
+    drawn = list(available_for(pool, candidate).order_by("times_used", "id")[:count])
+    if drawn:
+        BankQuestion.objects.filter(id__in=[q.id for q in drawn]).update(times_used=F("times_used") + 1)
+        logger.info(f"🏦 {len(drawn)} preguntas tomadas del banco para '{pool['topic_key']}' ({pool['difficulty']})")
+
+    remaining = available_for(pool, candidate).exclude(id__in=[q.id for q in drawn]).count()
+    if remaining < settings.QUESTION_BANK_MIN_AVAILABLE:
+        enqueue_refill(topic, pool)
+    return [_as_generated(q) for q in drawn]
+
+
+def enqueue_refill(topic, pool, count=None):
+    """
+    Crea un refill para el pool, salvo que ya haya uno pendiente. Un refill
+    RUNNING abandonado también cuenta: process_pending_refills lo retoma.
+    """
+    count = count or (
+        settings.QUESTION_BANK_CODING_REFILL_SIZE if pool["assessment_type"] == "CODING"
+        else settings.QUESTION_BANK_REFILL_SIZE
+    )
+    job = QuestionBankRefill.objects.filter(status__in=["PENDING", "RUNNING"], **pool).first()
+    if job is None:
+        job = QuestionBankRefill.objects.create(topic=topic, count=count, **pool)
+        logger.info(f"📥 Refill encolado para '{pool['topic_key']}' ({pool['difficulty']}): {count} preguntas")
+    return job
+
+
+def _generate(job):
+    service = OpenAIAssessmentService()
+    if job.assessment_type == "CODING":
+        return service.generate_coding_challenges(
+            topic=job.topic,
+            difficulty=job.difficulty,
+            num_challenges=job.count,
+            language=job.programming_language or "python",
+        )
+    return service.generate_quiz_questions(
+        topic=job.topic,
+        difficulty=job.difficulty,
+        num_questions=job.count,
+        language=job.language,
+        include_code_snippets=job.with_code,
+    )
+
+
+def _pool_index(pool, signatures):
+    """
+    Índice con las preguntas del pool que comparten alguna banda LSH con las
+    firmas nuevas (un solo SELECT por el índice de band_key, no todo el pool)
+    """
+    keys = {key for sig in signatures for key in band_keys(sig)}
+    index = MinHashIndex()
+    if keys:
+        candidates = BankQuestion.objects.filter(bands__band_key__in=keys, **pool).distinct()
+        for question_id, sig in candidates.values_list("id", "signature"):
+            if sig:
+                index.add(question_id, sig)
+    return index
+
+
+def add_to_bank(topic, pool, generated):
+    """
+    Agrega al pool las preguntas generadas que no sean casi duplicados de las
+    que ya tiene (ni entre sí). Retorna las BankQuestion creadas.
+    """
+    candidates = [data for data in generated if data.get("question_text")]
+    signatures = [question_signature(data) for data in candidates]
+    index = _pool_index(pool, signatures)
+
+    rows = []
+    for i, (data, sig) in enumerate(zip(candidates, signatures)):
+        match = index.add_unique(("new", i), sig)
+        if match is not None:
+            logger.info(f"🔁 Casi duplicado descartado ({match[1]:.2f}): {data['question_text'][:80]}")
+            continue
+        coding = pool["assessment_type"] == "CODING"
+        rows.append(BankQuestion(
+            topic=topic,
+            question_type=data.get("question_type", "CODE" if coding else "MULTIPLE_CHOICE"),
+            question_text=data["question_text"],
+            code_snippet=data.get("code_snippet", "") or "",
+            options=data.get("options", []),
+            correct_answer=str(data.get("correct_answer", "")),
+            test_cases=data.get("test_cases", []),
+            points=data.get("points", 20 if coding else 10),
+            explanation=data.get("explanation", ""),
+            signature=sig,
+            **pool,
+        ))
+    if not rows:
+        return []
+
+    with transaction.atomic():
+        created = BankQuestion.objects.bulk_create(rows)
+        if created[0].pk is None:
+            # MySQL no retorna ids en bulk_create (ver questions.save_generated_questions)
+            ids = list(BankQuestion.objects.filter(**pool).order_by("-id").values_list("id", flat=True)[:len(created)])
+            for question, pk in zip(created, reversed(ids)):
+                question.pk = pk
+        BankQuestionBand.objects.bulk_create([
+            BankQuestionBand(bank_question_id=question.pk, band_key=key)
+            for question in created
+            for key in band_keys(question.signature)
+        ])
+    return created
+
+
+def run_refill(job):
+    """Genera las preguntas del job y las agrega al banco. Retorna cuántas."""
+    pool = {field: getattr(job, field) for field in POOL_FIELDS}
+    try:
+        created = add_to_bank(job.topic, pool, _generate(job))
+        job.status = "DONE"
+        job.generated = len(created)
+        job.locked_at = None
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "generated", "locked_at", "finished_at"])
+        logger.info(f"✅ Banco '{job.topic_key}' ({job.difficulty}): {len(created)} preguntas nuevas")
+        return len(created)
+    except Exception as e:
+        job.status = "FAILED"
+        job.last_error = str(e)
+        job.locked_at = None
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "last_error", "locked_at", "finished_at"])
+        logger.error(f"❌ Refill {job.id} falló: {e}")
+        raise
+
+
+def _claimable(now):
+    """Refills pendientes y RUNNING cuyo worker murió (lock vencido)"""
+    stale = now - timedelta(seconds=settings.QUESTION_BANK_REFILL_LOCK_TIMEOUT_SECONDS)
+    return QuestionBankRefill.objects.filter(
+        Q(status="PENDING") |
+        Q(status="RUNNING", locked_at__lt=stale) |
+        # Tomados antes de que existiera locked_at
+        Q(status="RUNNING", locked_at__isnull=True)
+    )
+
+
+def process_pending_refills(max_jobs=None):
+    """
+    Ejecuta los refills pendientes (y retoma los abandonados).
+    Retorna cuántos se procesaron.
+    """
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        now = timezone.now()
+        job_id = _claimable(now).order_by("created_at").values_list("id", flat=True).first()
+        if job_id is None:
+            break
+        # Tomar el job de forma atómica para no duplicarlo entre workers
+        claimed = _claimable(now).filter(id=job_id).update(status="RUNNING", locked_at=now)
+        if not claimed:
+            continue
+        try:
+            run_refill(QuestionBankRefill.objects.get(id=job_id))
+        except Exception:
+            pass  # ya quedó en FAILED con el error registrado
+        processed += 1
+    return processed
@@ -0,0 +1,36 @@
+"""
+Persistencia de preguntas generadas por IA.
+"""
+from django.db import transaction
+
+from .models import Question
+from .points import add_total_points
+
+
+def save_generated_questions(assessment, questions):
+    """
+    Guarda las preguntas (instancias sin guardar) con un bulk_create en una
+    transacción y retorna las mismas instancias con id, listas para el
+    serializer.
+    """
+    if not questions:
+        return []
+
+    with transaction.atomic():
+        created = Question.objects.bulk_create(questions)
+        if created[0].pk is None:
+            # MySQL no retorna ids en bulk_create: dentro de la transacción las
+            # filas recién insertadas son las últimas de la evaluación
+            ids = list(
+                Question.objects.filter(assessment=assessment)
+                .order_by('-id')
+                .values_list('id', flat=True)[:len(created)]
+            )
+            for question, pk in zip(created, reversed(ids)):
+                question.pk = pk
+        # bulk_create no pasa por Question.save(): actualizar total_points aquí
+        add_total_points(assessment.id, sum(q.points for q in created))
+
+    for question in created:
+        question._saved_points = (question.assessment_id, question.points)
+    return created
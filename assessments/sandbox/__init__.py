@@ -0,0 +1,40 @@
+"""
+Sandbox de ejecución de código para preguntas CODE.
+
+    from assessments.sandbox import get_scheduler, run_test_cases
+    test_results, passed = run_test_cases(code, "python", question.test_cases)
+
+Desde requests y comandos, pasar por el scheduler (cola justa y pool acotado):
+    test_results, passed = get_scheduler().run(candidate.id, code, "python", question.test_cases)
+
+Con cache de resultados (solo se ejecutan los casos que no estén guardados):
+    test_results, passed = run_cached(
+        lambda cases: get_scheduler().run(candidate.id, code, "python", cases),
+        code, "python", question.test_cases,
+    )
+"""
+from .cache import cache_stats, run_cached
+from .backends import BACKENDS, ExecutionBackend, LocalSubprocessBackend, PistonBackend, get_backend
+from .host_slots import HostSlots
+from .runner import run_test_cases
+from .warm_pool import WarmPool, WarmPythonPoolBackend, get_warm_pool
+from .scheduler import ExecutionScheduler, SchedulerBusyError, default_budget, get_scheduler
+
+__all__ = [
+    "BACKENDS",
+    "ExecutionBackend",
+    "ExecutionScheduler",
+    "HostSlots",
+    "LocalSubprocessBackend",
+    "PistonBackend",
+    "SchedulerBusyError",
+    "WarmPool",
+    "WarmPythonPoolBackend",
+    "cache_stats",
+    "default_budget",
+    "get_backend",
+    "get_scheduler",
+    "get_warm_pool",
+    "run_cached",
+    "run_test_cases",
+]
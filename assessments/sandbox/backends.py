@@ -0,0 +1,219 @@
+"""
+Backends de ejecución de código.
+
+Todos exponen `run(language, source)` y retornan un dict:
+    {"stdout": str, "stderr": str, "exit_code": int | None,
+     "timed_out": bool, "duration_ms": float}
+
+- LocalSubprocessBackend: ejecuta en un subproceso a través de launcher.py
+  (rlimits de CPU, memoria, archivos y procesos; sin red, sin acceso al
+  proyecto y como usuario sin privilegios) con timeout de pared. Python
+  siempre; JavaScript si `node` está instalado.
+- PistonBackend: API pública de Piston (emkc.org), para lenguajes que no
+  existen localmente.
+"""
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+
+try:
+    import resource
+except ImportError:  # Windows: sin rlimits, solo timeout de pared
+    resource = None
+
+# Máximo de salida que se conserva por ejecución
+MAX_OUTPUT_BYTES = 64 * 1024
+
+LAUNCHER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "launcher.py")
+# Código de salida de launcher.py cuando no puede aislar el proceso
+EXIT_NOT_ISOLATED = 126
+
+
+class ExecutionBackend:
+    name = ""
+
+    def supports(self, language):
+        raise NotImplementedError
+
+    def run(self, language, source, timeout=None, cpu_seconds=None, memory_mb=None):
+        """
+        timeout: segundos de pared (default CODE_EXECUTION_TIMEOUT_SECONDS).
+        cpu_seconds / memory_mb: presupuesto de la ejecución (default settings).
+        """
+        raise NotImplementedError
+
+
+def _truncate(data):
+    text = data.decode("utf-8", errors="replace") if isinstance(data, bytes) else (data or "")
+    if len(text) > MAX_OUTPUT_BYTES:
+        text = text[:MAX_OUTPUT_BYTES] + "\n... (salida truncada)"
+    return text
+
+
+def sandbox_command(command, cpu, cpu_hard, memory_mb=None):
+    """
+    `command` envuelto en launcher.py: límites y aislamiento se aplican en el
+    hijo antes del exec (sin preexec_fn). Lanzar con start_new_session=True.
+    """
+    config = {
+        "cpu": cpu,
+        "cpu_hard": cpu_hard,
+        "memory": memory_mb * 1024 * 1024 if memory_mb else None,
+        "nproc": settings.CODE_EXECUTION_MAX_PROCESSES,
+        "user": settings.CODE_EXECUTION_SANDBOX_USER,
+        "hide": [str(path) for path in settings.CODE_EXECUTION_HIDDEN_PATHS],
+        "tmp": tempfile.gettempdir(),
+        "require_isolation": settings.CODE_EXECUTION_REQUIRE_ISOLATION,
+    }
+    return [sys.executable, "-I", "-S", LAUNCHER_SCRIPT, json.dumps(config)] + command
+
+
+def sandbox_env(workdir):
+    """Entorno mínimo: nada de las variables del proceso (claves, DB...)"""
+    return {"PATH": os.environ.get("PATH", ""), "HOME": workdir, "LANG": "C.UTF-8"}
+
+
+class LocalSubprocessBackend(ExecutionBackend):
+    name = "local"
+
+    def __init__(self):
+        self.node = shutil.which("node")
+
+    def supports(self, language):
+        if resource is None and settings.CODE_EXECUTION_REQUIRE_ISOLATION:
+            return False  # sin rlimits ni namespaces (Windows): Piston
+        return language == "python" or (language == "javascript" and bool(self.node))
+
+    def _command(self, language, path, memory_mb):
+        if language == "python":
+            # -I: modo aislado (sin variables PYTHON*, sin site del usuario)
+            return [sys.executable, "-I", path], "solution.py"
+        return [self.node, f"--max-old-space-size={memory_mb}", path], "solution.js"
+
+
+    def run(self, language, source, timeout=None, cpu_seconds=None, memory_mb=None):
+        timeout = timeout or settings.CODE_EXECUTION_TIMEOUT_SECONDS
+        memory_mb = memory_mb or settings.CODE_EXECUTION_MEMORY_MB
+        # Sin presupuesto explícito, el límite de CPU escala con el tiempo de
+        # pared pedido (harness con N casos)
+        cpu = cpu_seconds or max(settings.CODE_EXECUTION_CPU_SECONDS, math.ceil(timeout) - 1)
+        with tempfile.TemporaryDirectory(prefix="sandbox_") as workdir:
+            command, filename = self._command(language, "", memory_mb)
+            path = os.path.join(workdir, filename)
+            command[-1] = path
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(source)
+
+            if resource:
+                # V8 reserva mucho espacio virtual: en node el heap se limita con
+                # --max-old-space-size en lugar de RLIMIT_AS
+                command = sandbox_command(command, cpu, cpu + 1, memory_mb if language == "python" else None)
+
+            started = time.perf_counter()
+            proc = subprocess.Popen(
+                command,
+                cwd=workdir,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=sandbox_env(workdir),
+                start_new_session=True,
+            )
+            timed_out = False
+            try:
+                stdout, stderr = proc.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                self._kill(proc)
+                stdout, stderr = proc.communicate()
+
+        stderr = _truncate(stderr)
+        if timed_out:
+            stderr = "Tiempo de ejecución excedido"
+        elif proc.returncode < 0 and not stderr:
+            # SIGXCPU / SIGKILL por rlimit
+            stderr = f"Proceso terminado por señal {-proc.returncode} (límite de recursos)"
+
+        return {
+            "stdout": _truncate(stdout),
+            "stderr": stderr,
+            "exit_code": None if timed_out else proc.returncode,
+            "timed_out": timed_out,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    @staticmethod
+    def _kill(proc):
+        try:
+            os.killpg(proc.pid, 9)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            proc.kill()
+
+
+class PistonBackend(ExecutionBackend):
+    name = "piston"
+    LANGUAGES = {"python", "javascript", "java"}
+
+    def supports(self, language):
+        return language in self.LANGUAGES
+
+    def run(self, language, source, timeout=None, cpu_seconds=None, memory_mb=None):
+        import requests
+
+        timeout = timeout or settings.CODE_EXECUTION_TIMEOUT_SECONDS
+        memory_mb = memory_mb or settings.CODE_EXECUTION_MEMORY_MB
+
+        started = time.perf_counter()
+        try:
+            response = requests.post(
+                settings.PISTON_API_URL,
+                json={
+                    "language": language,
+                    "version": "*",
+                    "files": [{"content": source}],
+                    "run_memory_limit": memory_mb * 1024 * 1024,
+                },
+                timeout=timeout + 5,
+            )
+            run = response.json().get("run", {})
+        except requests.Timeout:
+            return {
+                "stdout": "", "stderr": "Tiempo de ejecución excedido", "exit_code": None,
+                "timed_out": True, "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            }
+        return {
+            "stdout": _truncate(run.get("output", "")),
+            "stderr": _truncate(run.get("stderr", "")),
+            "exit_code": run.get("code"),
+            "timed_out": run.get("signal") == "SIGKILL",
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+
+# warm_pool importa ExecutionBackend de este módulo
+from .warm_pool import WarmPythonPoolBackend  # noqa: E402
+
+BACKENDS = {
+    LocalSubprocessBackend.name: LocalSubprocessBackend,
+    WarmPythonPoolBackend.name: WarmPythonPoolBackend,
+    PistonBackend.name: PistonBackend,
+}
+
+
+def get_backend(language):
+    """
+    Backend configurado (CODE_EXECUTION_BACKEND) si soporta el lenguaje; si
+    no, el subproceso local (ej: JavaScript con el pool warm) y por último
+    Piston (ej: Java o JavaScript sin node instalado).
+    """
+    for backend in (BACKENDS[settings.CODE_EXECUTION_BACKEND](), LocalSubprocessBackend()):
+        if backend.supports(language):
+            return backend
+    return PistonBackend()
@@ -0,0 +1,161 @@
+"""
+Cache de resultados de ejecución.
+
+La salida de `solution(input)` para un mismo (lenguaje, código, input) no
+cambia entre corridas, así que los re-intentos del candidato y las
+re-evaluaciones de un admin sobre respuestas sin cambios no vuelven a
+ejecutar nada. Dos capas:
+
+  - memoria: LRU acotado por proceso (CODE_EXECUTION_CACHE_SIZE entradas),
+  - base de datos: ExecutionCacheEntry, compartida entre procesos, con
+    vencimiento (CODE_EXECUTION_CACHE_TTL_DAYS); ver prune_execution_cache.
+
+Solo se guardan casos que terminaron sin error: timeouts, límites de
+recursos o fallas del backend se vuelven a ejecutar. Para tests no
+deterministas: `"cache": false` en el test case, `use_cache: false` en el
+request o CODE_EXECUTION_CACHE_ENABLED=False.
+
+Las consultas a la base se hacen en el thread del request / comando, no en
+los workers del scheduler.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .runner import _result
+
+# Subir si cambia la forma de ejecutar (ej: el harness) para invalidar el cache
+CACHE_VERSION = 1
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def cache_key(code, language, test_input):
+    payload = json.dumps([CACHE_VERSION, language, code, test_input], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cacheable(test_case):
+    return test_case.get("cache", True) is not False
+
+
+def _memory_get(key):
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+        return entry
+
+
+def _memory_put(key, entry):
+    with _lock:
+        _memory[key] = entry
+        _memory.move_to_end(key)
+        while len(_memory) > settings.CODE_EXECUTION_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def lookup(code, language, test_cases):
+    """Lista paralela a test_cases: {"actual_output", "execution_time_ms"} o None si no está"""
+    from assessments.models import ExecutionCacheEntry
+
+    keys = [cache_key(code, language, tc.get("input", "")) if _cacheable(tc) else None for tc in test_cases]
+    found = {}
+    for key in keys:
+        if key and key not in found:
+            entry = _memory_get(key)
+            if entry is not None:
+                found[key] = entry
+
+    missing = {key for key in keys if key and key not in found}
+    if missing:
+        cutoff = timezone.now() - timedelta(days=settings.CODE_EXECUTION_CACHE_TTL_DAYS)
+        rows = ExecutionCacheEntry.objects.filter(key__in=missing, created_at__gte=cutoff)
+        hit_keys = []
+        for key, output, duration in rows.values_list("key", "actual_output", "execution_time_ms"):
+            entry = {"actual_output": output, "execution_time_ms": duration}
+            found[key] = entry
+            _memory_put(key, entry)
+            hit_keys.append(key)
+        if hit_keys:
+            ExecutionCacheEntry.objects.filter(key__in=hit_keys).update(last_used_at=timezone.now())
+
+    cached = [found.get(key) if key else None for key in keys]
+    hits = sum(1 for entry in cached if entry is not None)
+    with _lock:
+        _stats["hits"] += hits
+        _stats["misses"] += len(cached) - hits
+    return cached
+
+
+def store(code, language, test_cases, test_results):
+    """Guarda los casos ejecutados sin error"""
+    from assessments.models import ExecutionCacheEntry
+
+    entries = {}
+    for tc, result in zip(test_cases, test_results):
+        if result.get("error") or result.get("actual_output") is None or not _cacheable(tc):
+            continue
+        key = cache_key(code, language, tc.get("input", ""))
+        entry = {"actual_output": result["actual_output"], "execution_time_ms": result["execution_time_ms"]}
+        _memory_put(key, entry)
+        entries[key] = entry
+
+    if entries:
+        ExecutionCacheEntry.objects.bulk_create(
+            [ExecutionCacheEntry(key=key, language=language, **entry) for key, entry in entries.items()],
+            ignore_conflicts=True,
+        )
+
+
+def merge(test_cases, cached, fresh_results):
+    """
+    Combina los casos del cache con los recién ejecutados (en el orden de
+    los faltantes) y recalcula passed. Retorna (test_results, passed_tests).
+    """
+    fresh = iter(fresh_results)
+    test_results = []
+    for idx, (tc, entry) in enumerate(zip(test_cases, cached), 1):
+        if entry is not None:
+            result = _result(tc, idx, entry["actual_output"], None, entry["execution_time_ms"])
+        else:
+            run = next(fresh)
+            result = _result(tc, idx, run["actual_output"], run["error"], run["execution_time_ms"])
+        test_results.append(result)
+    return test_results, sum(1 for r in test_results if r["passed"])
+
+
+def run_cached(execute, code, language, test_cases, use_cache=True):
+    """
+    execute(test_cases) -> (test_results, passed) se llama solo con los
+    casos que no están en cache (o con todos si el cache está desactivado).
+    """
+    if not (use_cache and settings.CODE_EXECUTION_CACHE_ENABLED) or not test_cases:
+        return execute(test_cases)
+
+    language = (language or "python").lower()
+    cached = lookup(code, language, test_cases)
+    missing = [tc for tc, entry in zip(test_cases, cached) if entry is None]
+    fresh_results = []
+    if missing:
+        fresh_results, _ = execute(missing)
+        store(code, language, missing, fresh_results)
+    return merge(test_cases, cached, fresh_results)
+
+
+def cache_stats():
+    with _lock:
+        return {"memory_entries": len(_memory), **_stats}
+
+
+def clear_memory_cache():
+    with _lock:
+        _memory.clear()
+        _stats.update(hits=0, misses=0)
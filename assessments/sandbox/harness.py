@@ -0,0 +1,165 @@
+"""
+Harness de una sola ejecución por pregunta.
+
+En lugar de lanzar el intérprete una vez por test case, se genera un programa
+que carga el código del candidato una vez y llama a `solution(...)` para cada
+input. Cada caso se ejecuta aislado (captura su salida, excepción y tiempo,
+con timeout propio) y al final se imprime un JSON con los resultados,
+precedido por un marcador aleatorio para no confundirlo con la salida del
+candidato.
+"""
+import json
+import uuid
+
+HARNESS_LANGUAGES = {"python", "javascript"}
+
+PYTHON_TEMPLATE = '''import io as __io
+import json as __json
+import signal as __signal
+import sys as __sys
+import time as __time
+import traceback as __tb
+
+__CODE = {code!r}
+__INPUTS = [{inputs}]
+__CASE_TIMEOUT = {case_timeout}
+__MARKER = {marker!r}
+
+
+class __CaseTimeout(BaseException):
+    pass
+
+
+def __on_alarm(signum, frame):
+    raise __CaseTimeout()
+
+
+__has_alarm = hasattr(__signal, "setitimer")
+if __has_alarm:
+    __signal.signal(__signal.SIGALRM, __on_alarm)
+
+
+def __error(e):
+    return "".join(__tb.format_exception_only(type(e), e)).strip()
+
+
+def __capture(fn):
+    buffer = __io.StringIO()
+    __sys.stdout = buffer
+    started = __time.perf_counter()
+    error = None
+    try:
+        if __has_alarm:
+            __signal.setitimer(__signal.ITIMER_REAL, __CASE_TIMEOUT)
+        fn()
+    except __CaseTimeout:
+        error = "Tiempo de ejecución excedido"
+    except BaseException as e:
+        error = __error(e)
+    finally:
+        if __has_alarm:
+            __signal.setitimer(__signal.ITIMER_REAL, 0)
+        __sys.stdout = __sys.__stdout__
+    return buffer.getvalue(), error, round((__time.perf_counter() - started) * 1000, 2)
+
+
+__namespace = {{"__name__": "__main__"}}
+__module_output, __module_error, _ = __capture(
+    lambda: exec(compile(__CODE, "<solution>", "exec"), __namespace)
+)
+
+__results = []
+for __input in __INPUTS:
+    if __module_error:
+        __results.append({{"output": __module_output, "error": __module_error, "duration_ms": 0}})
+        continue
+    __output, __case_error, __duration = __capture(lambda: print(__namespace["solution"](__input)))
+    __results.append({{"output": __module_output + __output, "error": __case_error, "duration_ms": __duration}})
+
+__sys.__stdout__.write("\\n" + __MARKER + __json.dumps(__results) + "\\n")
+__sys.__stdout__.flush()
+'''
+
+JAVASCRIPT_TEMPLATE = '''const __vm = require("vm");
+const __util = require("util");
+
+const __CODE = {code};
+const __INPUTS = {inputs};
+const __CASE_TIMEOUT_MS = {case_timeout_ms};
+const __MARKER = {marker};
+
+let __buffer = [];
+const __write = (...args) => {{ __buffer.push(__util.format(...args)); }};
+const __console = {{ log: __write, info: __write, warn: __write, error: __write, debug: __write }};
+const __context = __vm.createContext({{
+  console: __console, require, module: {{ exports: {{}} }}, exports: {{}},
+  setTimeout, clearTimeout, setInterval, clearInterval,
+}});
+
+function __error(e) {{
+  if (e && e.code === "ERR_SCRIPT_EXECUTION_TIMEOUT") return "Tiempo de ejecución excedido";
+  return e && e.name ? `${{e.name}}: ${{e.message}}` : String(e);
+}}
+
+function __capture(fn) {{
+  __buffer = [];
+  const started = process.hrtime.bigint();
+  let error = null;
+  try {{ fn(); }} catch (e) {{ error = __error(e); }}
+  const output = __buffer.length ? __buffer.join("\\n") + "\\n" : "";
+  return [output, error, Number(process.hrtime.bigint() - started) / 1e6];
+}}
+
+const [__moduleOutput, __moduleError] = __capture(
+  () => __vm.runInContext(__CODE, __context, {{ filename: "solution.js", timeout: __CASE_TIMEOUT_MS }})
+);
+
+const __results = __INPUTS.map((input) => {{
+  if (__moduleError) return {{ output: __moduleOutput, error: __moduleError, duration_ms: 0 }};
+  __context.__input = input;
+  const [output, error, duration] = __capture(() => {{
+    const result = __vm.runInContext("solution(__input)", __context, {{ timeout: __CASE_TIMEOUT_MS }});
+    __write(result);
+  }});
+  return {{ output: __moduleOutput + output, error, duration_ms: Math.round(duration * 100) / 100 }};
+}});
+
+process.stdout.write("\\n" + __MARKER + JSON.stringify(__results) + "\\n");
+'''
+
+
+def new_marker():
+    return f"__SANDBOX_RESULTS_{uuid.uuid4().hex}__"
+
+
+def build_harness(code, language, inputs, case_timeout, marker):
+    """Programa que ejecuta todos los inputs en un solo proceso"""
+    if language == "python":
+        return PYTHON_TEMPLATE.format(
+            code=code,
+            inputs=", ".join(repr(i) for i in inputs),
+            case_timeout=float(case_timeout),
+            marker=marker,
+        )
+    if language == "javascript":
+        return JAVASCRIPT_TEMPLATE.format(
+            code=json.dumps(code),
+            inputs=json.dumps(inputs),
+            case_timeout_ms=int(case_timeout * 1000),
+            marker=json.dumps(marker),
+        )
+    raise ValueError(f"Harness no disponible para {language}")
+
+
+def parse_harness_output(stdout, marker, expected_cases):
+    """Lista de resultados por caso, o None si el proceso no llegó a reportarlos"""
+    for line in reversed(stdout.splitlines()):
+        if line.startswith(marker):
+            try:
+                results = json.loads(line[len(marker):])
+            except ValueError:
+                return None
+            if isinstance(results, list) and len(results) == expected_cases:
+                return results
+            return None
+    return None
@@ -0,0 +1,97 @@
+"""
+Cupos de ejecución compartidos por todos los procesos del host.
+
+Gunicorn corre varios procesos y cada uno tiene su propio ExecutionScheduler,
+así que los límites del scheduler (workers, cola por candidato) son por
+proceso. Estos cupos los comparten todos:
+
+  - CODE_EXECUTION_HOST_SLOTS corridas simultáneas en el host, sin importar
+    cuántos procesos las lancen.
+  - CODE_EXECUTION_MAX_PER_CANDIDATE corridas simultáneas por candidato,
+    aunque sus requests lleguen a procesos distintos.
+
+Cada cupo es un archivo en CODE_EXECUTION_SLOTS_DIR tomado con flock: si el
+proceso muere el kernel libera el lock, así que no quedan cupos tomados.
+Los cupos por candidato se reparten en CANDIDATE_BUCKETS grupos (por hash
+del id) para no crear un archivo por candidato.
+"""
+import os
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo aplican los límites de cada proceso
+    fcntl = None
+
+CANDIDATE_BUCKETS = 1024
+POLL_SECONDS = 0.05
+
+
+class SlotTimeout(RuntimeError):
+    """No se liberó un cupo dentro del tiempo de espera"""
+
+
+class HostSlots:
+    def __init__(self, directory=None, slots=None, per_owner=None):
+        self.directory = directory or settings.CODE_EXECUTION_SLOTS_DIR or os.path.join(
+            tempfile.gettempdir(), "code_execution_slots"
+        )
+        self.slots = slots or settings.CODE_EXECUTION_HOST_SLOTS
+        self.per_owner = per_owner or settings.CODE_EXECUTION_MAX_PER_CANDIDATE
+        if fcntl is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _try_lock(self, name):
+        """Retorna el archivo con el lock tomado, o None si otro proceso lo tiene"""
+        handle = open(os.path.join(self.directory, f"{name}.lock"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            return None
+        return handle
+
+    def _take(self, prefix, count, deadline):
+        while True:
+            for i in range(count):
+                handle = self._try_lock(f"{prefix}-{i}")
+                if handle is not None:
+                    return handle
+            if time.monotonic() >= deadline:
+                raise SlotTimeout(f"Sin cupos libres ({prefix})")
+            time.sleep(POLL_SECONDS)
+
+    @contextmanager
+    def acquire(self, owner, timeout):
+        """Toma un cupo del candidato y uno del host (en ese orden) durante el bloque"""
+        if fcntl is None:
+            yield
+            return
+        deadline = time.monotonic() + max(timeout, 0)
+        bucket = zlib.crc32(str(owner).encode("utf-8")) % CANDIDATE_BUCKETS
+        # Primero el del candidato: esperando su propio turno no ocupa un cupo del host
+        handles = [self._take(f"candidate-{bucket}", self.per_owner, deadline)]
+        try:
+            handles.append(self._take("host", self.slots, deadline))
+            yield
+        finally:
+            for handle in reversed(handles):
+                handle.close()  # cerrar libera el flock
+
+    def in_use(self):
+        """Cupos del host tomados en este momento (por cualquier proceso)"""
+        if fcntl is None:
+            return None
+        used = 0
+        for i in range(self.slots):
+            handle = self._try_lock(f"host-{i}")
+            if handle is None:
+                used += 1
+            else:
+                handle.close()
+        return used
@@ -0,0 +1,145 @@
+"""
+Wrapper de ejecución del sandbox local (ver backends.py).
+
+Se ejecuta como script, sin Django:
+
+    python -I -S launcher.py '<config json>' <comando> [args...]
+
+Aplica los límites y el aislamiento en el proceso hijo y después hace exec
+del comando. Reemplaza a preexec_fn, que no es seguro en procesos con
+threads (el scheduler y el pool warm lanzan procesos desde sus threads).
+
+  - rlimits: CPU, memoria (RLIMIT_AS), tamaño de archivos y core dumps.
+  - Con root: namespaces de red (sin interfaces) y de mounts propios. Las
+    rutas de `hide` (el proyecto con su .env, los CVs de media) quedan
+    tapadas, /tmp solo muestra el directorio de trabajo, y el proceso baja
+    a `user` con RLIMIT_NPROC contra fork bombs.
+  - Si no puede aislar y `require_isolation` es true no ejecuta nada:
+    termina con código 126 y el motivo en stderr.
+"""
+import ctypes
+import json
+import os
+import pwd
+import resource
+import sys
+
+CLONE_NEWNS = 0x00020000
+CLONE_NEWNET = 0x40000000
+MS_RDONLY = 1
+MS_NOSUID = 2
+MS_NODEV = 4
+MS_BIND = 4096
+MS_REC = 16384
+MS_PRIVATE = 1 << 18
+
+EXIT_NOT_ISOLATED = 126
+
+_libc = ctypes.CDLL(None, use_errno=True)
+
+
+class IsolationError(RuntimeError):
+    pass
+
+
+def _call(result, what):
+    if result != 0:
+        errno = ctypes.get_errno()
+        raise IsolationError(f"{what}: {os.strerror(errno)}")
+
+
+def _mount(source, target, fstype=None, flags=0, data=None):
+    encode = lambda value: value.encode() if value else None  # noqa: E731
+    _call(_libc.mount(encode(source), encode(target), encode(fstype), flags, encode(data)), f"mount {target}")
+
+
+def _inside(path, parent):
+    return path == parent or path.startswith(parent.rstrip(os.sep) + os.sep)
+
+
+def _hide(path, keep):
+    """Tapa `path` (tmpfs vacío o /dev/null) salvo las partes que contienen rutas de `keep`"""
+    path = os.path.realpath(path)
+    if not os.path.lexists(path) or path in keep:
+        return
+    if any(_inside(kept, path) for kept in keep):
+        # Ej: un virtualenv dentro del proyecto: se tapa todo lo demás
+        if os.path.isdir(path):
+            for entry in os.listdir(path):
+                _hide(os.path.join(path, entry), keep)
+        return
+    if os.path.isdir(path):
+        _mount("tmpfs", path, "tmpfs", MS_NOSUID | MS_NODEV | MS_RDONLY, "size=16k,mode=755")
+    else:
+        _mount(os.devnull, path, flags=MS_BIND)
+
+
+def _private_tmp(tmp):
+    """/tmp nuevo con solo el directorio de trabajo (no se ven las corridas de otros)"""
+    workdir = os.getcwd()
+    tmp = os.path.realpath(tmp)
+    if not _inside(workdir, tmp) or workdir == tmp:
+        return
+    fd = os.open(workdir, os.O_RDONLY | os.O_DIRECTORY)
+    _mount("tmpfs", tmp, "tmpfs", MS_NOSUID | MS_NODEV, "size=1m,mode=1777")
+    os.makedirs(workdir, exist_ok=True)
+    _mount(f"/proc/self/fd/{fd}", workdir, flags=MS_BIND)
+    os.close(fd)
+    os.chdir(workdir)
+
+
+def _isolate(config):
+    """Namespaces de red y mounts, rutas ocultas y usuario sin privilegios (requiere root)"""
+    if os.geteuid() != 0:
+        raise IsolationError("se necesita root para crear los namespaces y cambiar de usuario")
+
+    _call(_libc.unshare(CLONE_NEWNS | CLONE_NEWNET), "unshare")
+    _mount(None, "/", flags=MS_REC | MS_PRIVATE)
+    keep = {os.path.realpath(p) for p in (sys.prefix, sys.base_prefix, os.getcwd(), os.path.dirname(config["command"]))}
+    for path in config["hide"]:
+        _hide(path, keep)
+    if config.get("tmp"):
+        _private_tmp(config["tmp"])
+
+    if not config["user"]:
+        raise IsolationError("CODE_EXECUTION_SANDBOX_USER no está configurado")
+    try:
+        user = pwd.getpwnam(config["user"])
+    except KeyError:
+        raise IsolationError(f"no existe el usuario {config['user']}")
+    os.chown(os.getcwd(), user.pw_uid, user.pw_gid)
+    os.setgroups([])
+    os.setgid(user.pw_gid)
+    os.setuid(user.pw_uid)
+    # Cuenta todos los procesos del usuario del sandbox
+    resource.setrlimit(resource.RLIMIT_NPROC, (config["nproc"], config["nproc"]))
+
+
+def main():
+    config = json.loads(sys.argv[1])
+    command = sys.argv[2:]
+    config["command"] = command[0]
+
+    resource.setrlimit(resource.RLIMIT_CPU, (config["cpu"], config["cpu_hard"]))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (1024 * 1024, 1024 * 1024))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+    try:
+        _isolate(config)
+    except (IsolationError, OSError) as e:
+        if config["require_isolation"]:
+            sys.stderr.write(f"Sandbox sin aislamiento, no se ejecuta el código: {e}\n")
+            sys.exit(EXIT_NOT_ISOLATED)
+
+    # Al final: el aislamiento puede necesitar más memoria virtual que el límite
+    if config.get("memory"):
+        resource.setrlimit(resource.RLIMIT_AS, (config["memory"], config["memory"]))
+    try:
+        os.execv(command[0], command)
+    except OSError as e:
+        sys.stderr.write(f"No se pudo ejecutar {command[0]}: {e.strerror}\n")
+        sys.exit(EXIT_NOT_ISOLATED)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Ejecución de los test_cases de una pregunta CODE.
+
+Para Python y JavaScript todos los casos corren en un solo proceso (ver
+harness.py). Para el resto, cada test arma un programa con el código del
+candidato seguido de la llamada `solution(<input>)`. En ambos casos el
+resultado mantiene el formato de test_results que usa evaluate_code_sandbox.
+"""
+import ast
+import json
+import logging
+import time
+
+from django.conf import settings
+
+from .backends import get_backend
+from .harness import HARNESS_LANGUAGES, build_harness, new_marker, parse_harness_output
+
+logger = logging.getLogger(__name__)
+
+
+def parse_test_input(test_input):
+    """
+    El input puede venir como array ["value"] o valor directo.
+    Una lista de un solo elemento se desempaqueta; si no se puede
+    parsear se usa tal cual.
+    """
+    try:
+        parsed = ast.literal_eval(test_input)
+    except Exception:
+        return test_input
+    if isinstance(parsed, list) and len(parsed) == 1:
+        return parsed[0]
+    return parsed
+
+
+def build_program(code, language, actual_input, idx):
+    if language == "python":
+        return f"""{code}
+
+# Test case {idx}
+result = solution({actual_input!r})
+print(result)
+"""
+    if language == "javascript":
+        return f"""{code}
+
+// Test case {idx}
+const result = solution({json.dumps(actual_input)});
+console.log(result);
+"""
+    return code
+
+
+def normalize_output(value):
+    """null / None / undefined se comparan como el mismo valor"""
+    text = str(value).strip().strip('"')
+    if text.lower() in ["null", "none", "undefined"]:
+        return "null"
+    return text
+
+
+def _result(test_case, idx, actual_output, error, execution_time_ms):
+    expected_output = test_case.get("expected_output", "")
+    passed = not error and normalize_output(actual_output) == normalize_output(expected_output)
+    return {
+        "test_case": test_case.get("description", f"Test {idx}"),
+        "input": test_case.get("input", ""),
+        "expected_output": expected_output,
+        "actual_output": actual_output if not error else None,
+        "passed": passed,
+        "execution_time_ms": execution_time_ms,
+        "error": error if error else None,
+    }
+
+
+def _run_kwargs(budget):
+    """Argumentos de backend.run a partir del presupuesto (cpu_seconds, memory_mb)"""
+    budget = budget or {}
+    return {"cpu_seconds": budget.get("cpu_seconds"), "memory_mb": budget.get("memory_mb")}
+
+
+def _run_single_launch(code, language, test_cases, backend, budget):
+    """Todos los casos en una ejecución; si el proceso muere, todos fallan con su error"""
+    case_timeout = settings.CODE_EXECUTION_CASE_TIMEOUT_SECONDS
+    marker = new_marker()
+    inputs = [parse_test_input(tc.get("input", "")) for tc in test_cases]
+    program = build_harness(code, language, inputs, case_timeout, marker)
+
+    # Tiempo total: un timeout por caso más el arranque del intérprete
+    timeout = case_timeout * len(test_cases) + 2
+    if budget and budget.get("time_seconds"):
+        timeout = min(timeout, budget["time_seconds"])
+    run = backend.run(language, program, timeout=timeout, **_run_kwargs(budget))
+    cases = parse_harness_output(run["stdout"], marker, len(test_cases))
+    if cases is None:
+        error = run["stderr"] or "La ejecución terminó sin reportar resultados"
+        return [_result(tc, idx, None, error, 0) for idx, tc in enumerate(test_cases, 1)]
+
+    return [
+        _result(tc, idx, (case["output"] or "").strip(), case["error"], case["duration_ms"])
+        for idx, (tc, case) in enumerate(zip(test_cases, cases), 1)
+    ]
+
+
+def _run_per_test(code, language, test_cases, backend, budget):
+    time_budget = (budget or {}).get("time_seconds")
+    started = time.perf_counter()
+    results = []
+    for idx, test_case in enumerate(test_cases, 1):
+        remaining = time_budget - (time.perf_counter() - started) if time_budget else None
+        if remaining is not None and remaining <= 0:
+            results.append(_result(test_case, idx, None, "Presupuesto de tiempo agotado", 0))
+            continue
+        try:
+            program = build_program(code, language, parse_test_input(test_case.get("input", "")), idx)
+            timeout = min(remaining, settings.CODE_EXECUTION_TIMEOUT_SECONDS) if remaining else None
+            run = backend.run(language, program, timeout=timeout, **_run_kwargs(budget))
+            results.append(_result(test_case, idx, run["stdout"].strip(), run["stderr"], run["duration_ms"]))
+        except Exception as e:
+            logger.error(f"❌ Error ejecutando test {idx} en {backend.name}: {e}")
+            results.append(_result(test_case, idx, None, str(e), 0))
+    return results
+
+
+def run_test_cases(code, language, test_cases, backend=None, budget=None):
+    """
+    Retorna (test_results, passed_tests).
+    budget: dict opcional con time_seconds (pared, toda la corrida),
+    memory_mb y cpu_seconds (sin él, el backend lo escala con el tiempo de
+    la corrida); lo arma el ExecutionScheduler.
+    """
+    language = (language or "python").lower()
+    backend = backend or get_backend(language)
+    if not test_cases:
+        return [], 0
+
+    if language in HARNESS_LANGUAGES and settings.CODE_EXECUTION_SINGLE_LAUNCH:
+        try:
+            test_results = _run_single_launch(code, language, test_cases, backend, budget)
+        except Exception as e:
+            logger.error(f"❌ Error ejecutando harness en {backend.name}: {e}")
+            test_results = [_result(tc, idx, None, str(e), 0) for idx, tc in enumerate(test_cases, 1)]
+    else:
+        test_results = _run_per_test(code, language, test_cases, backend, budget)
+
+    passed_tests = sum(1 for r in test_results if r["passed"])
+    logger.info(f"📊 {backend.name}: {passed_tests}/{len(test_cases)} tests pasados")
+    return test_results, passed_tests
@@ -0,0 +1,223 @@
+"""
+Scheduler de ejecuciones de código.
+
+Cuando muchos candidatos envían su código al mismo tiempo (ej: al cierre de
+una evaluación), las ejecuciones no se lanzan directamente desde el request:
+pasan por una cola con un pool acotado de workers para no saturar el host.
+
+  - Cola justa: una cola por candidato, atendidas en round-robin, y como
+    máximo CODE_EXECUTION_MAX_PER_CANDIDATE ejecuciones simultáneas por
+    candidato. Un candidato que envía muchas corridas no bloquea al resto.
+  - Presupuesto por corrida: tiempo de pared total y memoria. El límite de
+    CPU lo calcula el backend a partir del tiempo de la corrida, que crece
+    con la cantidad de test cases (ver runner._run_single_launch).
+  - Métricas: profundidad de la cola, corridas activas y latencias de
+    espera / ejecución (p50, p95).
+
+Hay un scheduler por proceso (gunicorn corre varios): su cola, sus workers y
+sus métricas son de ese proceso. Con workers sync cada proceso atiende un
+request a la vez, así que la cola justa solo ordena las corridas que se
+encolan juntas (ej: run_code_tests). El límite del host y el de cada
+candidato entre procesos los ponen los cupos de host_slots.py: una corrida
+toma su cupo antes de ejecutarse, y si no lo consigue dentro de
+CODE_EXECUTION_QUEUE_TIMEOUT_SECONDS falla con SchedulerBusyError.
+
+Uso:
+    from assessments.sandbox import get_scheduler
+    test_results, passed = get_scheduler().run(candidate.id, code, "python", test_cases)
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+
+from .host_slots import HostSlots, SlotTimeout
+from .runner import run_test_cases
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerBusyError(RuntimeError):
+    """La cola de ejecuciones está llena o la corrida no empezó a tiempo"""
+
+
+def default_budget():
+    # Sin cpu_seconds: un tope fijo cortaría el harness que corre N casos en un proceso
+    return {
+        "time_seconds": settings.CODE_EXECUTION_RUN_BUDGET_SECONDS,
+        "memory_mb": settings.CODE_EXECUTION_MEMORY_MB,
+    }
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class _Task:
+    __slots__ = ("owner", "args", "budget", "future", "enqueued_at")
+
+    def __init__(self, owner, args, budget):
+        self.owner = owner
+        self.args = args
+        self.budget = budget
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class ExecutionScheduler:
+    def __init__(self, workers=None, max_queue=None, max_per_owner=None, host_slots=None):
+        self.workers = workers or settings.CODE_EXECUTION_WORKERS
+        self.max_queue = max_queue or settings.CODE_EXECUTION_MAX_QUEUE
+        self.max_per_owner = max_per_owner or settings.CODE_EXECUTION_MAX_PER_CANDIDATE
+        self.host_slots = host_slots or HostSlots(per_owner=self.max_per_owner)
+        self.slot_timeout = settings.CODE_EXECUTION_QUEUE_TIMEOUT_SECONDS
+
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()  # owner -> deque[_Task], en orden de turno
+        self._running = {}  # owner -> corridas en curso
+        self._depth = 0
+        self._threads = []
+        self._recent = deque(maxlen=500)
+        self._totals = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"code-exec-{len(self._threads) + 1}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, owner, code, language, test_cases, budget=None):
+        """Encola una corrida de run_test_cases; retorna un Future con (test_results, passed)"""
+        task = _Task(owner, (code, language, test_cases), budget or default_budget())
+        with self._cond:
+            if self._depth >= self.max_queue:
+                self._totals["rejected"] += 1
+                raise SchedulerBusyError(f"Cola de ejecución llena ({self._depth} en espera)")
+            self._queues.setdefault(owner, deque()).append(task)
+            self._depth += 1
+            self._totals["submitted"] += 1
+            self._start_workers()
+            self._cond.notify()
+        return task.future
+
+    def run(self, owner, code, language, test_cases, budget=None, wait_timeout=None):
+        """submit + esperar el resultado. Si no empieza a tiempo se cancela y lanza SchedulerBusyError."""
+        budget = budget or default_budget()
+        wait_timeout = wait_timeout or settings.CODE_EXECUTION_QUEUE_TIMEOUT_SECONDS
+        future = self.submit(owner, code, language, test_cases, budget)
+        try:
+            # Espera en cola + el presupuesto de la corrida
+            return future.result(timeout=wait_timeout + budget["time_seconds"])
+        except FutureTimeoutError:
+            future.cancel()
+            raise SchedulerBusyError("La ejecución no terminó dentro del tiempo de espera")
+
+    def _next_task(self):
+        """Round-robin: primer candidato con trabajo y cupo; pasa al final del turno"""
+        for owner, queue in self._queues.items():
+            if self._running.get(owner, 0) < self.max_per_owner:
+                task = queue.popleft()
+                if queue:
+                    self._queues.move_to_end(owner)
+                else:
+                    del self._queues[owner]
+                self._depth -= 1
+                self._running[owner] = self._running.get(owner, 0) + 1
+                return task
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    self._cond.wait()
+                    task = self._next_task()
+
+            started = time.perf_counter()
+            outcome = "ok"
+            result = error = None
+            try:
+                if task.future.set_running_or_notify_cancel():
+                    # El tiempo en la cola de este proceso cuenta para la espera del cupo
+                    wait = self.slot_timeout - (time.perf_counter() - task.enqueued_at)
+                    with self.host_slots.acquire(task.owner, wait):
+                        started = time.perf_counter()
+                        result = run_test_cases(*task.args, budget=task.budget)
+                else:
+                    outcome = "cancelled"
+            except SlotTimeout as e:
+                outcome = "host_busy"
+                logger.warning(f"⚠️ Ejecución de {task.owner} sin cupo en el host: {e}")
+                error = SchedulerBusyError(str(e))
+            except Exception as e:
+                outcome = type(e).__name__
+                logger.error(f"❌ Ejecución de {task.owner} falló en el scheduler: {e}")
+                error = e
+            finally:
+                self._finish(task, started, outcome)
+            # Después de _finish: quien recibe el resultado ya ve la corrida en las métricas
+            if error is not None:
+                task.future.set_exception(error)
+            elif outcome == "ok":
+                task.future.set_result(result)
+
+    def _finish(self, task, started, outcome):
+        finished = time.perf_counter()
+        with self._cond:
+            self._running[task.owner] -= 1
+            if not self._running[task.owner]:
+                del self._running[task.owner]
+            self._totals["completed" if outcome == "ok" else "failed"] += 1
+            self._recent.append({
+                "wait_ms": round((started - task.enqueued_at) * 1000, 1),
+                "run_ms": round((finished - started) * 1000, 1),
+                "outcome": outcome,
+            })
+            # Se liberó cupo del candidato: puede haber trabajo que antes no se podía tomar
+            self._cond.notify_all()
+
+    def metrics_snapshot(self):
+        with self._cond:
+            recent = list(self._recent)
+            snapshot = {
+                "pid": os.getpid(),  # métricas de este proceso, salvo host_slots
+                "workers": self.workers,
+                "queue_depth": self._depth,
+                "queued_candidates": len(self._queues),
+                "running": sum(self._running.values()),
+                "totals": dict(self._totals),
+            }
+        waits = [r["wait_ms"] for r in recent]
+        runs = [r["run_ms"] for r in recent]
+        snapshot["host_slots"] = {"slots": self.host_slots.slots, "in_use": self.host_slots.in_use()}
+        snapshot["latency_ms"] = {
+            "wait_p50": _percentile(waits, 50),
+            "wait_p95": _percentile(waits, 95),
+            "run_p50": _percentile(runs, 50),
+            "run_p95": _percentile(runs, 95),
+        }
+        return snapshot
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Scheduler único del proceso (se crea en el primer uso)"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ExecutionScheduler()
+    return _scheduler
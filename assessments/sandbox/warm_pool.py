@@ -0,0 +1,264 @@
+"""
+Pool de intérpretes Python pre-iniciados.
+
+Lanzar `python` por cada corrida cuesta decenas de milisegundos antes de
+ejecutar una sola línea del candidato. El pool mantiene procesos
+warm_worker.py ya iniciados (con los mismos límites y aislamiento que
+LocalSubprocessBackend, a través de launcher.py)
+que reciben el programa por un pipe y devuelven la salida.
+
+Cada worker atiende una sola corrida (CODE_EXECUTION_WARM_MAX_RUNS=1) y
+se descarta: el código de un candidato puede modificar cualquier módulo
+(io, os, threading...) y la comparación de estado de warm_worker.py no
+detecta todo. Lo que se ahorra es el arranque del intérprete: el pool
+mantiene workers listos y cada reemplazo se inicia en segundo plano.
+
+Con MAX_RUNS > 1 (solo para código confiable) un worker también se descarta:
+  - después de CODE_EXECUTION_WARM_MAX_RUNS corridas,
+  - si la corrida dejó estado modificado (módulos, builtins, threads, archivos...),
+  - si excede el tiempo de pared (se mata su grupo de procesos) o muere
+    por un límite de recursos.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import select
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from .backends import EXIT_NOT_ISOLATED, ExecutionBackend, resource, sandbox_command, sandbox_env
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "warm_worker.py")
+STARTUP_TIMEOUT_SECONDS = 10
+
+
+class WorkerUnavailable(RuntimeError):
+    """El worker murió o no respondió a tiempo"""
+
+
+class _WarmWorker:
+    def __init__(self, cpu_hard, memory_mb):
+        self.runs = 0
+        self.workdir = tempfile.mkdtemp(prefix="sandbox_warm_")
+        # Copia en el directorio de trabajo: el proyecto no es visible desde el sandbox
+        script = shutil.copy(WORKER_SCRIPT, self.workdir)
+        # El límite blando de CPU lo ajusta el worker antes de cada corrida
+        command = sandbox_command([sys.executable, "-I", script, str(cpu_hard)], cpu_hard, cpu_hard, memory_mb)
+        self.proc = subprocess.Popen(
+            command,
+            cwd=self.workdir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=sandbox_env(self.workdir),
+            start_new_session=True,
+        )
+        self._buffer = b""
+        if not self._read_line(STARTUP_TIMEOUT_SECONDS).get("ready"):
+            self.kill()
+            raise WorkerUnavailable("El worker no inició")
+
+    def _read_line(self, timeout):
+        deadline = time.monotonic() + timeout
+        fd = self.proc.stdout.fileno()
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError()
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                raise TimeoutError()
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise WorkerUnavailable(self._exit_message())
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        try:
+            return json.loads(line)
+        except ValueError:
+            raise WorkerUnavailable("Respuesta inválida del worker")
+
+    def _exit_message(self):
+        try:
+            code = self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            return "El worker cerró el pipe"
+        if code < 0:
+            return f"Proceso terminado por señal {-code} (límite de recursos)"
+        if code == EXIT_NOT_ISOLATED:
+            # launcher.py no pudo aislar el proceso: el motivo está en stderr
+            return self.proc.stderr.read().decode("utf-8", errors="replace").strip()
+        return f"El worker terminó con código {code}"
+
+    def execute(self, program, timeout, cpu_seconds):
+        self.runs += 1
+        try:
+            self.proc.stdin.write((json.dumps({"program": program, "cpu_seconds": cpu_seconds}) + "\n").encode("utf-8"))
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            raise WorkerUnavailable(self._exit_message())
+        return self._read_line(timeout)
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def kill(self):
+        try:
+            os.killpg(self.proc.pid, 9)
+        except (ProcessLookupError, PermissionError):
+            pass
+        self.proc.wait()
+        for stream in (self.proc.stdin, self.proc.stdout, self.proc.stderr):
+            stream.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class WarmPool:
+    def __init__(self, size=None, max_runs=None):
+        self.size = size or settings.CODE_EXECUTION_WARM_POOL_SIZE
+        self.max_runs = max_runs or settings.CODE_EXECUTION_WARM_MAX_RUNS
+        self.memory_mb = settings.CODE_EXECUTION_MEMORY_MB
+        # Tope de CPU de toda la vida del worker; por corrida se usa el presupuesto
+        self.cpu_hard = settings.CODE_EXECUTION_RUN_BUDGET_SECONDS * self.max_runs + 10
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._starting = 0  # workers iniciándose en segundo plano
+        self._closed = False
+        self.recycled = 0
+
+    def _spawn(self):
+        return _WarmWorker(self.cpu_hard, self.memory_mb)
+
+    def warm_up(self):
+        """Inicia en segundo plano los workers que faltan para tener `size` listos"""
+        with self._lock:
+            missing = self.size - self._idle.qsize() - self._starting
+            if self._closed or missing <= 0:
+                return
+            self._starting += missing
+        for _ in range(missing):
+            threading.Thread(target=self._start_idle, name="warm-pool-fill", daemon=True).start()
+
+    def wait_ready(self, timeout=STARTUP_TIMEOUT_SECONDS):
+        """Espera a que los `size` workers estén listos (benchmark y tests)"""
+        deadline = time.monotonic() + timeout
+        while self._idle.qsize() < self.size:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _start_idle(self):
+        try:
+            worker = self._spawn()
+        except Exception as e:
+            logger.error(f"❌ No se pudo iniciar un worker warm: {e}")
+            worker = None
+        with self._lock:
+            self._starting -= 1
+            if worker is not None and not self._closed:
+                self._idle.put(worker)
+                return
+        if worker is not None:
+            worker.kill()
+
+    def _acquire(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                # Sin workers listos: se inicia uno en este request (arranque en frío)
+                return self._spawn()
+            if worker.alive():
+                return worker
+            worker.kill()
+
+    def _release(self, worker, reason=None):
+        if reason is None and worker.runs < self.max_runs and not self._closed:
+            self._idle.put(worker)
+            return
+        self.recycled += 1
+        if reason:
+            logger.info(f"♻️ Worker warm reciclado tras {worker.runs} corridas: {reason}")
+        worker.kill()
+        self.warm_up()
+
+    def execute(self, program, timeout, cpu_seconds):
+        """Retorna el mismo dict que LocalSubprocessBackend.run"""
+        with self._slots:
+            worker = self._acquire()
+            started = time.perf_counter()
+            reason = None
+            try:
+                response = worker.execute(program, timeout, cpu_seconds)
+                if response.get("leaked"):
+                    reason = f"estado modificado ({', '.join(response['leaked'])})"
+                result = {
+                    "stdout": response["stdout"],
+                    "stderr": response["stderr"],
+                    "exit_code": response["exit_code"],
+                    "timed_out": False,
+                }
+            except TimeoutError:
+                reason = "tiempo excedido"
+                result = {"stdout": "", "stderr": "Tiempo de ejecución excedido", "exit_code": None, "timed_out": True}
+            except WorkerUnavailable as e:
+                reason = str(e)
+                result = {"stdout": "", "stderr": str(e), "exit_code": None, "timed_out": False}
+            finally:
+                duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            self._release(worker, reason)
+        result["duration_ms"] = duration_ms
+        return result
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_warm_pool():
+    """Pool único del proceso; se llena en segundo plano en el primer uso"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WarmPool()
+                _pool.warm_up()
+                atexit.register(_pool.close)
+    return _pool
+
+
+class WarmPythonPoolBackend(ExecutionBackend):
+    name = "warm"
+
+    def __init__(self, pool=None):
+        self.pool = pool  # None: el pool compartido del proceso
+
+    def supports(self, language):
+        return language == "python" and resource is not None
+
+    def run(self, language, source, timeout=None, cpu_seconds=None, memory_mb=None):
+        # memory_mb no aplica: el límite de memoria se fija al iniciar cada worker
+        timeout = timeout or settings.CODE_EXECUTION_TIMEOUT_SECONDS
+        cpu = cpu_seconds or max(settings.CODE_EXECUTION_CPU_SECONDS, int(timeout) - 1)
+        return (self.pool or get_warm_pool()).execute(source, timeout, cpu)
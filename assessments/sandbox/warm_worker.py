@@ -0,0 +1,122 @@
+"""
+Intérprete Python pre-iniciado del pool warm (ver warm_pool.py).
+
+Se ejecuta como script (`python -I warm_worker.py <cpu_hard_limit>`), sin
+Django. Lee pedidos JSON por línea desde el pipe de entrada, ejecuta el
+programa (el harness de la pregunta) en un namespace nuevo con stdout /
+stderr capturados y responde una línea JSON por el pipe de salida.
+
+Después de cada corrida compara el estado del intérprete con el inicial
+(módulos cargados, builtins, módulos pre-cargados, sys.path, cwd, entorno,
+threads, archivos en el directorio de trabajo). Si algo cambió lo informa
+en `leaked` y el pool descarta este proceso. Es solo una red de seguridad
+para CODE_EXECUTION_WARM_MAX_RUNS > 1: por defecto cada proceso atiende una
+sola corrida.
+"""
+import gc
+import io
+import json
+import math
+import os
+import resource
+import signal
+import sys
+import threading
+import traceback
+
+# Módulos que el código de los candidatos suele importar: se cargan antes de
+# tomar la foto del estado para que importarlos no cuente como fuga
+PRELOADED = [
+    "bisect", "collections", "copy", "datetime", "decimal", "fractions", "functools",
+    "heapq", "itertools", "math", "operator", "random", "re", "statistics", "string",
+    "typing", "json", "signal", "time", "traceback",
+]
+for _name in PRELOADED:
+    __import__(_name)
+
+MAX_OUTPUT_CHARS = 64 * 1024
+
+
+def _attrs(namespace):
+    return {key: id(value) for key, value in namespace.items()}
+
+
+def snapshot():
+    return {
+        "modules": set(sys.modules),
+        "builtins": _attrs(vars(__builtins__) if not isinstance(__builtins__, dict) else __builtins__),
+        "preloaded": {name: _attrs(vars(sys.modules[name])) for name in PRELOADED},
+        "path": list(sys.path),
+        "cwd": os.getcwd(),
+        "files": sorted(os.listdir(os.getcwd())),
+        "environ": dict(os.environ),
+        "recursion": sys.getrecursionlimit(),
+    }
+
+
+def leaks(baseline):
+    """Lista de cambios de estado respecto de la foto inicial"""
+    current = snapshot()
+    found = [key for key in baseline if current[key] != baseline[key]]
+    if threading.active_count() > 1:
+        found.append("threads")
+    return found
+
+
+def _truncate(text):
+    if len(text) > MAX_OUTPUT_CHARS:
+        return text[:MAX_OUTPUT_CHARS] + "\n... (salida truncada)"
+    return text
+
+
+def run(program, cpu_seconds, cpu_hard):
+    used = resource.getrusage(resource.RUSAGE_SELF)
+    soft = min(math.ceil(used.ru_utime + used.ru_stime) + cpu_seconds, cpu_hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, cpu_hard))
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    sys.stdout = sys.__stdout__ = stdout
+    sys.stderr = sys.__stderr__ = stderr
+    sys.stdin = sys.__stdin__ = io.StringIO()
+    exit_code = 0
+    try:
+        exec(compile(program, "<harness>", "exec"), {"__name__": "__main__"})
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 1
+    except BaseException as e:
+        # Sin el frame de este archivo, igual que un traceback de `python solution.py`
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next, file=stderr)
+        exit_code = 1
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, signal.SIG_DFL)
+        sys.stdout = sys.__stdout__ = sys.stderr = sys.__stderr__ = sys.stdin = sys.__stdin__ = None
+        gc.collect()
+    return {"stdout": _truncate(stdout.getvalue()), "stderr": _truncate(stderr.getvalue()), "exit_code": exit_code}
+
+
+def main():
+    cpu_hard = int(sys.argv[1])
+    # El protocolo usa copias privadas de stdin / stdout; los fd 0, 1 y 2
+    # quedan en /dev/null para que el código del candidato no lo corrompa
+    requests = os.fdopen(os.dup(0), "r", encoding="utf-8")
+    responses = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    sys.stdout = sys.__stdout__ = sys.stderr = sys.__stderr__ = sys.stdin = sys.__stdin__ = None
+
+    baseline = snapshot()
+    responses.write(json.dumps({"ready": True}) + "\n")
+    responses.flush()
+
+    for line in requests:
+        request = json.loads(line)
+        result = run(request["program"], request["cpu_seconds"], cpu_hard)
+        result["leaked"] = leaks(baseline)
+        responses.write(json.dumps(result) + "\n")
+        responses.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -61,23 +61,30 @@ class CandidateAnswerSerializer(serializers.ModelSerializer):
         return 0.0
 
 
+class CandidateAnswerSideloadSerializer(CandidateAnswerSerializer):
+    """Respuesta con solo question_id: la pregunta va una vez en el mapa `questions` del listado"""
+    question = None
+    question_id = serializers.IntegerField(read_only=True)
+
+    class Meta(CandidateAnswerSerializer.Meta):
+        fields = [f for f in CandidateAnswerSerializer.Meta.fields if f != 'question']
+
 class AssessmentListSerializer(serializers.ModelSerializer):
     """Serializer ligero para listar pruebas"""
     candidate_username = serializers.ReadOnlyField(source='candidate.username')
     project_title = serializers.ReadOnlyField(source='project.title')
-    question_count = serializers.SerializerMethodField()
+    # Anotado en AssessmentViewSet.get_queryset (Count en SQL)
+    question_count = serializers.IntegerField(read_only=True)
+    total_points = serializers.FloatField(read_only=True)
     
     class Meta:
         model = Assessment
         fields = [
             'id', 'candidate', 'candidate_username', 'project', 'project_title',
             'assessment_type', 'difficulty', 'title', 'status', 'score',
-            'time_limit_minutes', 'passing_score', 'question_count',
+            'time_limit_minutes', 'passing_score', 'question_count', 'total_points',
             'started_at', 'completed_at', 'created_at'
         ]
-        
-    def get_question_count(self, obj):
-        return obj.questions.count()
 
 
 class AssessmentDetailSerializer(serializers.ModelSerializer):
@@ -86,7 +93,8 @@ class AssessmentDetailSerializer(serializers.ModelSerializer):
     candidate_email = serializers.ReadOnlyField(source='candidate.email')
     project_title = serializers.ReadOnlyField(source='project.title')
     questions = QuestionSerializer(many=True, read_only=True)
-    total_points = serializers.SerializerMethodField()
+    total_points = serializers.FloatField(read_only=True)
+    question_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Assessment
@@ -95,12 +103,14 @@ class AssessmentDetailSerializer(serializers.ModelSerializer):
             'project', 'project_title', 'assessment_type', 'difficulty',
             'title', 'description', 'status', 'score', 'time_limit_minutes',
             'passing_score', 'started_at', 'completed_at', 'created_at',
-            'updated_at', 'questions', 'total_points'
+            'updated_at', 'questions', 'total_points', 'question_count'
         ]
         read_only_fields = ['score', 'started_at', 'completed_at']
-        
-    def get_total_points(self, obj):
-        return sum(q.points for q in obj.questions.all())
+
+    def get_question_count(self, obj):
+        # Anotado en retrieve; las acciones (start, submit...) usan las preguntas ya prefetcheadas
+        count = getattr(obj, 'question_count', None)
+        return count if count is not None else len(obj.questions.all())
 
 
 class AssessmentCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,170 @@
+"""
+Detección de preguntas casi duplicadas con MinHash + LSH.
+
+Cada pregunta (question_text + code_snippet) se convierte en un conjunto de
+shingles (3-gramas de palabras / tokens de código) y luego en una firma
+MinHash de NUM_PERM enteros; la fracción de posiciones iguales entre dos
+firmas estima la similitud de Jaccard. Para no comparar todos los pares, la
+firma se parte en BANDS bandas: dos preguntas son candidatas solo si
+coinciden en al menos una banda completa (umbral efectivo ~0.77). Las
+candidatas se confirman con QUESTION_SIMILARITY_THRESHOLD.
+
+MinHashIndex es el índice en memoria (un lote generado, las preguntas de una
+evaluación o el reporte de find_duplicate_questions). En el banco las bandas
+se guardan en BankQuestionBand para buscar con un filtro indexado.
+"""
+import hashlib
+import random
+import re
+import unicodedata
+
+from django.conf import settings
+
+NUM_PERM = 64
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240607)  # fijo: las firmas guardadas deben seguir siendo comparables
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _tokens(text):
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return TOKEN_RE.findall(text)
+
+
+def _ngrams(tokens, prefix):
+    if len(tokens) < SHINGLE_SIZE:
+        return {prefix + " ".join(tokens)} if tokens else set()
+    return {prefix + " ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def shingles(question_text, code_snippet=""):
+    """3-gramas de palabras del enunciado (sin puntuación) y de tokens del código"""
+    words = [t for t in _tokens(question_text) if t[0].isalnum() or t[0] == "_"]
+    return _ngrams(words, "t:") | _ngrams(_tokens(code_snippet), "c:")
+
+
+def signature(question_text, code_snippet=""):
+    """Firma MinHash (lista de NUM_PERM enteros de 32 bits)"""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles(question_text, code_snippet)
+    ]
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERM
+    return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(sig_a, sig_b):
+    """Jaccard estimado entre dos firmas"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def band_keys(sig):
+    """Una clave corta por banda: 'b<índice>:<hash de las filas>'"""
+    keys = []
+    for band in range(BANDS):
+        rows = ",".join(str(v) for v in sig[band * ROWS:(band + 1) * ROWS])
+        keys.append(f"b{band}:{hashlib.blake2b(rows.encode('ascii'), digest_size=8).hexdigest()}")
+    return keys
+
+
+def default_threshold():
+    return settings.QUESTION_SIMILARITY_THRESHOLD
+
+
+class MinHashIndex:
+    """Índice LSH en memoria: key -> firma, con buckets por banda"""
+
+    def __init__(self, threshold=None):
+        self.threshold = default_threshold() if threshold is None else threshold
+        self.signatures = {}
+        self._buckets = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def add(self, key, sig):
+        self.signatures[key] = sig
+        for band in band_keys(sig):
+            self._buckets.setdefault(band, []).append(key)
+
+    def query(self, sig):
+        """[(key, similitud)] de las firmas sobre el umbral, más similar primero"""
+        candidates = set()
+        for band in band_keys(sig):
+            candidates.update(self._buckets.get(band, ()))
+        matches = [(key, similarity(sig, self.signatures[key])) for key in candidates]
+        return sorted(
+            [(key, score) for key, score in matches if score >= self.threshold],
+            key=lambda match: -match[1],
+        )
+
+    def add_unique(self, key, sig):
+        """Agrega la firma si no hay casi duplicados; si los hay retorna el más parecido"""
+        matches = self.query(sig)
+        if matches:
+            return matches[0]
+        self.add(key, sig)
+        return None
+
+
+def question_signature(data):
+    """Firma de un dict generado por IA o de una instancia Question/BankQuestion"""
+    if isinstance(data, dict):
+        return signature(data.get("question_text", ""), data.get("code_snippet") or "")
+    return signature(data.question_text, data.code_snippet or "")
+
+
+def drop_near_duplicates(items, existing=(), threshold=None):
+    """
+    Filtra `items` (dicts o instancias) quitando los casi duplicados entre sí
+    y respecto de `existing`. Retorna (únicos, descartados).
+    """
+    index = MinHashIndex(threshold)
+    for i, item in enumerate(existing):
+        index.add(("existing", i), question_signature(item))
+    unique, dropped = [], []
+    for i, item in enumerate(items):
+        if index.add_unique(("new", i), question_signature(item)) is None:
+            unique.append(item)
+        else:
+            dropped.append(item)
+    return unique, dropped
+
+
+def find_clusters(rows, threshold=None):
+    """
+    Agrupa casi duplicados. `rows` es un iterable de (id, question_text,
+    code_snippet); retorna listas de ids (solo grupos de 2 o más), cada
+    pregunta se compara solo con las candidatas de sus bandas.
+    """
+    index = MinHashIndex(threshold)
+    parent = {}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for row_id, text, code in rows:
+        sig = signature(text, code or "")
+        parent[row_id] = row_id
+        for other, _ in index.query(sig):
+            root_a, root_b = find(row_id), find(other)
+            if root_a != root_b:
+                parent[root_b] = root_a
+        index.add(row_id, sig)
+
+    clusters = {}
+    for row_id in parent:
+        clusters.setdefault(find(row_id), []).append(row_id)
+    return sorted((sorted(ids) for ids in clusters.values() if len(ids) > 1), key=lambda ids: (-len(ids), ids[0]))
@@ -1,21 +1,45 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.contrib.auth.models import User
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from unittest.mock import patch, MagicMock
-from unittest import skip
+from unittest import skip, skipUnless
 import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
 
-from .models import Assessment, Question, CandidateAnswer
+from .models import Assessment, Question, CandidateAnswer, ExecutionCacheEntry, BankQuestion, QuestionBankRefill
 from .openai_service import OpenAIAssessmentService
+from .question_bank import add_to_bank, enqueue_refill, pool_for, process_pending_refills
+from .similarity import MinHashIndex, find_clusters, signature
+from .sandbox import (
+    ExecutionScheduler, HostSlots, LocalSubprocessBackend, SchedulerBusyError, WarmPool, WarmPythonPoolBackend,
+    run_cached, run_test_cases,
+)
+from .sandbox.cache import clear_memory_cache
 from .views import AssessmentViewSet
 from projects.models import Project
 
+# Los tests de ejecución no dependen de que el usuario sin privilegios pueda
+# ejecutar el intérprete del entorno (ej: un pyenv bajo /root). El aislamiento
+# se prueba en SandboxIsolationTestCase.
+UNISOLATED_EXECUTION = {"CODE_EXECUTION_SANDBOX_USER": "", "CODE_EXECUTION_REQUIRE_ISOLATION": False}
 
+
+@override_settings(OPENAI_API_KEY='test')
 class OpenAIAssessmentServiceTestCase(TestCase):
     """Tests para el servicio de generación de preguntas con IA"""
 
-    @patch('assessments.openai_service.OpenAI')
+    @patch('core.openai_client.get_client')
     def test_generate_quiz_questions_success(self, mock_openai):
         """Test: Generación exitosa de preguntas de cuestionario"""
         # Mock de la respuesta de OpenAI
@@ -51,7 +75,7 @@ class OpenAIAssessmentServiceTestCase(TestCase):
         self.assertEqual(len(questions[0]["options"]), 4)
         self.assertEqual(questions[0]["correct_answer"], "0")
 
-    @patch('assessments.openai_service.OpenAI')
+    @patch('core.openai_client.get_client')
     def test_generate_coding_challenges_with_test_cases(self, mock_openai):
         """Test: Generación de desafíos de código con test_cases"""
         mock_response = MagicMock()
@@ -93,6 +117,48 @@ class OpenAIAssessmentServiceTestCase(TestCase):
         self.assertIn("test_cases", challenges[0])
         self.assertGreater(len(challenges[0]["test_cases"]), 0)
 
+    @override_settings(QUIZ_GENERATION_CHUNK_SIZE=4, QUIZ_GENERATION_MAX_PARALLEL=2, QUIZ_GENERATION_TOPUP_ROUNDS=2)
+    @patch('assessments.openai_service.chat_completion')
+    def test_generate_quiz_in_chunks_dedupes_and_tops_up(self, mock_completion):
+        """Test: 10 preguntas se piden en tandas de 4, sin duplicados y completando faltantes"""
+        lock = threading.Lock()
+        counter = iter(range(1000))
+        requested = []
+
+        def fake_completion(task, **kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            count = int(prompt.split("Genera EXACTAMENTE ")[1].split()[0])
+            with lock:
+                requested.append(count)
+                ids = [next(counter) for _ in range(count)]
+            # La primera pregunta de cada tanda en paralelo se repite entre tandas
+            texts = [f"Pregunta única número {i}" for i in ids]
+            if "YA EXISTEN ESTAS PREGUNTAS" not in prompt:
+                texts[0] = "¿Qué es un decorador en Python?"
+            response = MagicMock()
+            response.choices[0].message.content = json.dumps({
+                "questions": [{"question_text": text, "options": ["a", "b", "c", "d"], "correct_answer": "0"} for text in texts]
+            })
+            return response
+
+        mock_completion.side_effect = fake_completion
+        questions = OpenAIAssessmentService().generate_quiz_questions("Python", num_questions=10)
+
+        self.assertEqual(sorted(requested[:3]), [2, 4, 4])
+        self.assertGreater(len(requested), 3)  # hubo al menos una ronda para completar
+        self.assertEqual(len(questions), 10)
+        texts = [q["question_text"] for q in questions]
+        self.assertEqual(len(set(texts)), 10)
+        self.assertIn("YA EXISTEN ESTAS PREGUNTAS", mock_completion.call_args_list[3].kwargs["messages"][1]["content"])
+
+    @override_settings(QUIZ_GENERATION_CHUNK_SIZE=5)
+    @patch('assessments.openai_service.chat_completion')
+    def test_generate_quiz_in_chunks_all_failed_raises(self, mock_completion):
+        """Test: Si todas las tandas fallan se propaga el error"""
+        mock_completion.side_effect = RuntimeError("sin conexión")
+        with self.assertRaisesMessage(Exception, "Error al generar preguntas con OpenAI"):
+            OpenAIAssessmentService().generate_quiz_questions("Python", num_questions=8)
+
 
 class SandboxEvaluationTestCase(APITestCase):
     """Tests para la evaluación de código con sandbox"""
@@ -420,6 +486,34 @@ class QuizEvaluationTestCase(APITestCase):
         self.assertEqual(data['total_points'], 20)
         self.assertEqual(data['score_percentage'], 100.0)
 
+    def _evaluate_with_extra_questions(self, extra):
+        for i in range(extra):
+            question = Question.objects.create(
+                assessment=self.assessment, question_type="TRUE_FALSE", question_text=f"Afirmación {i}",
+                correct_answer="true", points=5, order=i + 2
+            )
+            CandidateAnswer.objects.create(
+                question=question, candidate=self.candidate, answer_text="True" if i % 2 else "false"
+            )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(f'/api/assessments/assessments/{self.assessment.id}/evaluate_quiz/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json(), len(queries)
+
+    def test_evaluate_quiz_constant_queries(self):
+        """Test: La cantidad de consultas no depende del número de preguntas"""
+        CandidateAnswer.objects.create(question=self.q1, candidate=self.candidate, selected_option_index=0)
+        _, few_queries = self._evaluate_with_extra_questions(3)
+        data, many_queries = self._evaluate_with_extra_questions(40)
+
+        self.assertEqual(many_queries, few_queries)
+        self.assertEqual(data['total_questions'], 45)
+        self.assertEqual(data['evaluated_answers'], 44)
+        self.assertEqual(data['total_points'], 10 + 5 * 21)
+        self.assertEqual(
+            CandidateAnswer.objects.filter(question__assessment=self.assessment, is_correct=True).count(), 22
+        )
+
     @skip("TransactionManagementError - DB transaction conflicts with previous test")
     def test_evaluate_quiz_partial_correct(self):
         """Test: Evaluación de quiz con respuestas parciales"""
@@ -485,6 +579,70 @@ class QuizEvaluationTestCase(APITestCase):
         self.assertEqual(data['score_percentage'], 50.0)
 
 
+class AssessmentPointsTestCase(APITestCase):
+    """Tests para los agregados total_points / earned_points de Assessment"""
+
+    def setUp(self):
+        self.candidate = User.objects.create_user(username='points_candidate', password='test123')
+        self.assessment = Assessment.objects.create(
+            candidate=self.candidate, project=Project.objects.create(title="Proyecto Puntos"),
+            assessment_type="QUIZ", title="Puntos"
+        )
+        self.q1 = Question.objects.create(
+            assessment=self.assessment, question_type="TRUE_FALSE", question_text="A", correct_answer="true", points=10
+        )
+        self.q2 = Question.objects.create(
+            assessment=self.assessment, question_type="TRUE_FALSE", question_text="B", correct_answer="true", points=20
+        )
+
+    def test_aggregates_follow_questions_and_answers(self):
+        """Test: Crear, editar y borrar preguntas / respuestas mantiene los agregados"""
+        stale = Assessment.objects.get(id=self.assessment.id)
+        answer = CandidateAnswer.objects.create(question=self.q2, candidate=self.candidate, points_earned=20)
+        CandidateAnswer.objects.create(question=self.q1, candidate=self.candidate, points_earned=10)
+        # Respuesta de otro usuario: no cuenta para el candidato de la evaluación
+        other = User.objects.create_user(username='points_other', password='test123')
+        CandidateAnswer.objects.create(question=self.q1, candidate=other, points_earned=10)
+
+        question = Question.objects.get(id=self.q1.id)
+        question.points = 15
+        question.save()
+        answer.points_earned = 5
+        answer.save()
+        # Guardar una instancia vieja no pisa los agregados
+        stale.title = "Puntos (editada)"
+        stale.save()
+
+        self.assessment.refresh_from_db()
+        self.assertEqual((self.assessment.total_points, self.assessment.earned_points), (35, 15))
+
+        Question.objects.get(id=self.q2.id).delete()
+        self.assessment.refresh_from_db()
+        self.assertEqual((self.assessment.total_points, self.assessment.earned_points), (15, 10))
+        self.assertEqual(self.assessment.title, "Puntos (editada)")
+
+    def test_submit_uses_aggregates(self):
+        """Test: submit calcula el score con los agregados mantenidos"""
+        CandidateAnswer.objects.create(question=self.q2, candidate=self.candidate, points_earned=20)
+        self.client.force_authenticate(user=self.candidate)
+        with patch('assessments.email_service.notify_assessment_completed'):
+            response = self.client.post(f'/api/assessments/assessments/{self.assessment.id}/submit/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertAlmostEqual(response.json()['score'], 20 / 30 * 100)
+        self.assertEqual(response.json()['total_points'], 30)
+
+    def test_check_command_fixes_drift(self):
+        """Test: check_assessment_points --fix corrige agregados desactualizados"""
+        Assessment.objects.filter(id=self.assessment.id).update(total_points=999, earned_points=-1)
+        out = StringIO()
+        call_command('check_assessment_points', '--fix', stdout=out)
+
+        self.assertIn("1 corregidas", out.getvalue())
+        self.assessment.refresh_from_db()
+        self.assertEqual((self.assessment.total_points, self.assessment.earned_points), (30, 0))
+
+
 class CodeSnippetGenerationTestCase(TestCase):
     """Tests para la generación de preguntas con fragmentos de código"""
 
@@ -580,3 +738,738 @@ print(x + y)
                 f"No debería detectar código en: {text}"
             )
 
+
+
+# Los textos de prueba son casi iguales entre sí: sin filtro de casi duplicados
+@override_settings(QUESTION_SIMILARITY_THRESHOLD=1.1)
+class GenerateQuestionsTestCase(APITestCase):
+    """Tests para el guardado en lote de preguntas generadas"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='gen_admin', password='test123', email='gen@test.com')
+        self.assessment = Assessment.objects.create(
+            candidate=self.admin, project=Project.objects.create(title="Proyecto Generación"),
+            assessment_type="QUIZ", title="Generada"
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def _generate(self, count):
+        questions = [
+            {
+                "question_text": f"¿Qué imprime el siguiente código? `print(sorted([3, 1, 2])[{i % 3}])`",
+                "options": ["1", "2", "3"],
+                "correct_answer": i % 3,
+                "points": 5,
+            }
+            for i in range(count)
+        ]
+        with patch('assessments.views.OpenAIAssessmentService') as mock_service:
+            mock_service.return_value.generate_quiz_questions.return_value = questions
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    f'/api/assessments/assessments/{self.assessment.id}/generate_questions/',
+                    {"topic": "Python", "use_bank": False}, format='json'
+                )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()['questions'], len(queries)
+
+    def test_bulk_create_with_constant_queries(self):
+        """Test: Guardar 3 o 30 preguntas usa las mismas consultas y el serializer recibe los ids"""
+        few, few_queries = self._generate(3)
+        many, many_queries = self._generate(30)
+
+        self.assertEqual(few_queries, many_queries)
+        self.assertEqual(len(many), 30)
+        self.assertEqual(
+            [q['id'] for q in many],
+            list(Question.objects.filter(assessment=self.assessment).order_by('id').values_list('id', flat=True))[3:]
+        )
+        self.assertEqual(many[0]['code_snippet'], "print(sorted([3, 1, 2])[0])")
+        self.assertEqual(many[1]['correct_answer'], "1")
+        self.assessment.refresh_from_db()
+        self.assertEqual(self.assessment.total_points, 33 * 5)
+
+
+@override_settings(QUESTION_BANK_MIN_AVAILABLE=2, QUESTION_BANK_REFILL_SIZE=4)
+class QuestionBankTestCase(APITestCase):
+    """Tests para el banco de preguntas pre-generadas"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='bank_admin', password='test123', email='bank@test.com')
+        self.candidate = User.objects.create_user(username='bank_candidate', password='test123')
+        self.project = Project.objects.create(title="Proyecto Banco")
+        self.pool = pool_for("Python Avanzado", "MEDIUM", "QUIZ")
+        add_to_bank("Python avanzado", self.pool, [
+            {"question_text": f"Pregunta del banco {i}", "options": ["a", "b", "c", "d"], "correct_answer": "1", "points": 5}
+            for i in range(5)
+        ])
+        self.client.force_authenticate(user=self.admin)
+
+    def _generate(self, num_questions):
+        assessment = Assessment.objects.create(
+            candidate=self.candidate, project=self.project, assessment_type="QUIZ", title="Banco"
+        )
+        with patch('assessments.views.OpenAIAssessmentService') as mock_service:
+            mock_service.return_value.generate_quiz_questions.side_effect = lambda **kwargs: [
+                {"question_text": f"Pregunta nueva {i}", "options": ["a", "b"], "correct_answer": "0"}
+                for i in range(kwargs["num_questions"])
+            ]
+            response = self.client.post(
+                f'/api/assessments/assessments/{assessment.id}/generate_questions/',
+                {"topic": "  python avanzado ", "num_questions": num_questions}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json(), mock_service.return_value.generate_quiz_questions
+
+    def test_draws_from_bank_without_repeats_per_candidate(self):
+        """Test: Se toma del banco, no se repite al mismo candidato y OpenAI solo completa lo que falta"""
+        first, generate = self._generate(3)
+        self.assertEqual(first['from_bank'], 3)
+        generate.assert_not_called()
+        self.assertEqual(QuestionBankRefill.objects.count(), 0)
+
+        second, generate = self._generate(3)
+        self.assertEqual(second['from_bank'], 2)
+        self.assertEqual(generate.call_args.kwargs['num_questions'], 1)
+        texts = {q['question_text'] for q in first['questions']} & {q['question_text'] for q in second['questions']}
+        self.assertEqual(texts, set())
+        self.assertEqual(Question.objects.filter(bank_question__isnull=False).count(), 5)
+        # El pool quedó vacío para este candidato: refill encolado una sola vez
+        self.assertEqual(QuestionBankRefill.objects.filter(status="PENDING", **self.pool).count(), 1)
+
+    @patch('assessments.question_bank.OpenAIAssessmentService')
+    def test_refill_adds_new_questions_to_pool(self, mock_service):
+        """Test: El worker genera el refill y agrega al pool solo preguntas nuevas"""
+        enqueue_refill("Python avanzado", self.pool)
+        mock_service.return_value.generate_quiz_questions.return_value = [
+            {"question_text": "Pregunta del banco 0", "options": ["a"], "correct_answer": "0"},
+            {"question_text": "¿Qué hace functools.lru_cache?", "options": ["a", "b"], "correct_answer": "1"},
+        ]
+
+        self.assertEqual(process_pending_refills(), 1)
+
+        self.assertEqual(mock_service.return_value.generate_quiz_questions.call_args.kwargs['num_questions'], 4)
+        self.assertEqual(BankQuestion.objects.filter(**self.pool).count(), 6)
+        job = QuestionBankRefill.objects.get()
+        self.assertEqual((job.status, job.generated), ("DONE", 1))
+        self.assertEqual(process_pending_refills(), 0)
+
+    @override_settings(QUESTION_BANK_REFILL_LOCK_TIMEOUT_SECONDS=60)
+    @patch('assessments.question_bank.OpenAIAssessmentService')
+    def test_abandoned_refill_is_reclaimed(self, mock_service):
+        """Test: Un refill RUNNING de un worker muerto se retoma; uno en curso no"""
+        mock_service.return_value.generate_quiz_questions.return_value = []
+        abandoned = enqueue_refill("Python avanzado", self.pool)
+        QuestionBankRefill.objects.filter(id=abandoned.id).update(
+            status="RUNNING", locked_at=timezone.now() - timedelta(minutes=5)
+        )
+        other_pool = {**self.pool, "difficulty": "HARD"}
+        running = QuestionBankRefill.objects.create(
+            topic="Python avanzado", count=4, status="RUNNING", locked_at=timezone.now(), **other_pool
+        )
+        QuestionBankRefill.objects.create(topic="Python avanzado", count=4, **{**self.pool, "difficulty": "EASY"})
+
+        # El abandonado sigue contando como refill del pool: no se duplica
+        self.assertEqual(enqueue_refill("Python avanzado", self.pool).id, abandoned.id)
+        self.assertEqual(process_pending_refills(max_jobs=1), 1)
+        abandoned.refresh_from_db()
+        self.assertEqual(abandoned.status, "DONE")
+        self.assertEqual(QuestionBankRefill.objects.filter(status="PENDING").count(), 1)
+
+        self.assertEqual(process_pending_refills(), 1)
+        running.refresh_from_db()
+        self.assertEqual(running.status, "RUNNING")
+
+
+class QuestionSimilarityTestCase(APITestCase):
+    """Tests para la detección de preguntas casi duplicadas (MinHash/LSH)"""
+
+    ORIGINAL = "¿Cuál es la complejidad temporal de buscar un elemento en un diccionario de Python en el caso promedio?"
+    REWORDED = "¿Cuál es la complejidad temporal de buscar un elemento en un diccionario de Python, en el caso promedio?"
+    VARIANT = "¿Cuál es la complejidad temporal de buscar un elemento en un diccionario de Python en el caso promedio esperado?"
+    OTHER = "¿Qué diferencia hay entre un proceso y un thread en un sistema operativo moderno?"
+
+    def test_index_flags_near_duplicates_only(self):
+        """Test: El índice encuentra reformulaciones y no preguntas distintas"""
+        index = MinHashIndex(threshold=0.8)
+        index.add("original", signature(self.ORIGINAL))
+
+        self.assertEqual(index.query(signature(self.REWORDED))[0][0], "original")
+        self.assertEqual(index.query(signature(self.VARIANT))[0][0], "original")
+        self.assertEqual(index.query(signature(self.OTHER)), [])
+        # Mismo enunciado con otro código no es duplicado
+        self.assertEqual(index.query(signature(self.ORIGINAL, "for i in range(10):\n    print(i * i)")), [])
+
+    def test_generate_questions_drops_duplicates_and_command_reports_clusters(self):
+        """Test: generate_questions descarta casi duplicados y el comando agrupa los existentes"""
+        admin = User.objects.create_superuser(username='sim_admin', password='test123', email='sim@test.com')
+        assessment = Assessment.objects.create(
+            candidate=admin, project=Project.objects.create(title="Proyecto Similitud"),
+            assessment_type="QUIZ", title="Similitud"
+        )
+        Question.objects.create(assessment=assessment, question_type="MULTIPLE_CHOICE", question_text=self.ORIGINAL)
+        self.client.force_authenticate(user=admin)
+        with patch('assessments.views.OpenAIAssessmentService') as mock_service:
+            mock_service.return_value.generate_quiz_questions.return_value = [
+                {"question_text": text, "options": ["a", "b"], "correct_answer": "0"}
+                for text in [self.ORIGINAL, self.OTHER, self.OTHER + " "]
+            ]
+            response = self.client.post(
+                f'/api/assessments/assessments/{assessment.id}/generate_questions/',
+                {"topic": "Python", "num_questions": 3, "use_bank": False}, format='json'
+            )
+        self.assertEqual(response.json()['duplicates_dropped'], 2)
+        self.assertEqual(assessment.questions.count(), 2)
+
+        Question.objects.create(assessment=assessment, question_type="MULTIPLE_CHOICE", question_text=self.REWORDED)
+        rows = assessment.questions.values_list("id", "question_text", "code_snippet")
+        self.assertEqual([len(ids) for ids in find_clusters(rows, threshold=0.6)], [2])
+
+        out = StringIO()
+        call_command("find_duplicate_questions", "--assessment", assessment.id, "--threshold", "0.6", stdout=out)
+        self.assertIn("3 preguntas analizadas: 1 grupos", out.getvalue())
+
+
+class AssessmentListQueriesTestCase(APITestCase):
+    """Tests para question_count / total_points anotados en el listado"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='list_admin', password='test123', email='list@test.com')
+        self.project = Project.objects.create(title="Proyecto Listado")
+        self.client.force_authenticate(user=self.admin)
+
+    def _create(self, count):
+        for i in range(count):
+            assessment = Assessment.objects.create(
+                candidate=self.admin, project=self.project, assessment_type="QUIZ", title=f"Listado {i}"
+            )
+            for n in range(i % 4):
+                Question.objects.create(assessment=assessment, question_type="SHORT_ANSWER", question_text=f"P{n}", points=5)
+
+    def test_list_queries_do_not_grow_with_assessments(self):
+        """Test: El listado usa las mismas consultas con 3 o 12 pruebas y cuenta bien las preguntas"""
+        self._create(3)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get('/api/assessments/assessments/')
+        self._create(9)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get('/api/assessments/assessments/')
+
+        self.assertEqual(len(few), len(many))
+        rows = {row['id']: row for row in response.json()}
+        self.assertEqual(len(rows), 12)
+        for assessment in Assessment.objects.all():
+            self.assertEqual(rows[assessment.id]['question_count'], assessment.questions.count())
+            self.assertEqual(rows[assessment.id]['total_points'], assessment.questions.count() * 5)
+
+        detail = self.client.get(f'/api/assessments/assessments/{assessment.id}/').json()
+        self.assertEqual(detail['question_count'], len(detail['questions']))
+
+
+class CandidateAnswerSideloadTestCase(APITestCase):
+    """Tests para el listado de respuestas con ?sideload=questions"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='side_admin', password='test123', email='side@test.com')
+        self.project = Project.objects.create(title="Proyecto Sideload")
+        assessment = Assessment.objects.create(
+            candidate=self.admin, project=self.project, assessment_type="QUIZ", title="Quiz compartido"
+        )
+        self.questions = [
+            Question.objects.create(
+                assessment=assessment, question_type="SHORT_ANSWER", question_text=f"Pregunta larga {n} " * 40,
+                code_snippet="print('hola')\n" * 20, points=10, order=n
+            )
+            for n in range(5)
+        ]
+        # Varios candidatos respondiendo las mismas preguntas (pantalla de revisión)
+        for c in range(6):
+            candidate = User.objects.create_user(username=f'side_cand{c}', password='test123', email=f'side{c}@test.com')
+            for question in self.questions:
+                CandidateAnswer.objects.create(question=question, candidate=candidate, answer_text="resp", points_earned=5)
+        self.client.force_authenticate(user=self.admin)
+
+    def test_sideloaded_shape_and_size(self):
+        """Test: Cada pregunta va una vez en el mapa y la respuesta pesa menos que la anidada"""
+        nested = self.client.get('/api/assessments/answers/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/assessments/answers/?sideload=questions')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['results']), len(nested.json()))
+        self.assertEqual(set(data['questions']), {str(q.id) for q in self.questions})
+        for answer in data['results']:
+            self.assertNotIn('question', answer)
+            self.assertIn(str(answer['question_id']), data['questions'])
+            self.assertEqual(answer['score_percentage'], 50.0)
+        self.assertLess(len(queries), 5)
+        self.assertLess(len(response.content), len(nested.content) / 2)
+
+    def test_sideloaded_with_cursor_pagination(self):
+        """Test: Con page_size el mapa solo trae las preguntas de la página"""
+        response = self.client.get('/api/assessments/answers/?sideload=questions&page_size=6')
+        data = response.json()
+
+        self.assertEqual(len(data['results']), 6)
+        self.assertIsNotNone(data['next'])
+        self.assertEqual(set(data['questions']), {str(a['question_id']) for a in data['results']})
+
+@override_settings(**UNISOLATED_EXECUTION)
+class LocalCodeExecutionTestCase(TestCase):
+    """Tests para el backend local de ejecución de código"""
+
+    def setUp(self):
+        self.backend = LocalSubprocessBackend()
+        self.test_cases = [
+            {"description": "Mixtos", "input": "[[1,2,3,4,5,6]]", "expected_output": "12"},
+            {"description": "Vacío", "input": "[[]]", "expected_output": "0"},
+        ]
+
+    def test_python_test_cases(self):
+        """Test: Ejecuta Python localmente con el formato de test_results"""
+        code = "def solution(arr):\n    return sum(x for x in arr if x % 2 == 0)"
+        results, passed = run_test_cases(code, "python", self.test_cases, backend=self.backend)
+
+        self.assertEqual(passed, 2)
+        self.assertEqual(results[0]["actual_output"], "12")
+        self.assertIsNone(results[0]["error"])
+        self.assertEqual(
+            set(results[0]),
+            {"test_case", "input", "expected_output", "actual_output", "passed", "execution_time_ms", "error"}
+        )
+
+    @override_settings(CODE_EXECUTION_TIMEOUT_SECONDS=2, CODE_EXECUTION_CPU_SECONDS=1)
+    def test_infinite_loop_is_stopped(self):
+        """Test: Un loop infinito se corta por CPU / tiempo de pared"""
+        results, passed = run_test_cases(
+            "def solution(arr):\n    while True:\n        pass", "python", self.test_cases[:1], backend=self.backend
+        )
+        self.assertEqual(passed, 0)
+        self.assertFalse(results[0]["passed"])
+        self.assertIsNotNone(results[0]["error"])
+
+    @override_settings(CODE_EXECUTION_MEMORY_MB=64)
+    def test_memory_limit(self):
+        """Test: Reservar más memoria que el límite falla"""
+        run = self.backend.run("python", "x = bytearray(512 * 1024 * 1024)\nprint('ok')")
+        self.assertNotEqual(run["exit_code"], 0)
+        self.assertIn("MemoryError", run["stderr"])
+
+    def test_javascript_when_node_available(self):
+        """Test: JavaScript se ejecuta localmente si hay node"""
+        if not self.backend.supports("javascript"):
+            self.skipTest("node no está instalado")
+        code = "function solution(arr) { return arr.filter(x => x % 2 === 0).reduce((a, b) => a + b, 0); }"
+        results, passed = run_test_cases(code, "javascript", self.test_cases, backend=self.backend)
+        self.assertEqual(passed, 2)
+
+
+def _sandbox_user_can_run():
+    """Con root y un usuario del sandbox que puede ejecutar el intérprete (ej: Docker)"""
+    if not hasattr(os, "geteuid") or os.geteuid() != 0:
+        return False
+    return LocalSubprocessBackend().run("python", "print('ok')")["stdout"].strip() == "ok"
+
+
+class SandboxIsolationTestCase(TestCase):
+    """Tests para el aislamiento de launcher.py"""
+
+    def setUp(self):
+        self.backend = LocalSubprocessBackend()
+
+    @override_settings(CODE_EXECUTION_SANDBOX_USER="", CODE_EXECUTION_REQUIRE_ISOLATION=True)
+    def test_refuses_to_run_without_isolation(self):
+        """Test: Si no puede aislar el proceso no ejecuta el código"""
+        run = self.backend.run("python", "print('ejecutado')")
+
+        self.assertEqual(run["exit_code"], 126)
+        self.assertEqual(run["stdout"], "")
+        self.assertIn("Sandbox sin aislamiento", run["stderr"])
+
+    @skipUnless(hasattr(os, "geteuid") and os.geteuid() == 0, "se necesita root para los namespaces")
+    @override_settings(**UNISOLATED_EXECUTION)
+    def test_no_network_no_project_files_private_tmp(self):
+        """Test: Sin red, sin ver el proyecto y con un /tmp que solo tiene su directorio"""
+        code = (
+            "import os, socket\n"
+            f"print(os.path.exists({str(settings.BASE_DIR / 'manage.py')!r}))\n"
+            "print(len(os.listdir('/tmp')))\n"
+            "try:\n"
+            "    socket.create_connection(('1.1.1.1', 53), timeout=2)\n"
+            "    print('red')\n"
+            "except OSError:\n"
+            "    print('sin red')"
+        )
+        run = self.backend.run("python", code)
+
+        self.assertEqual(run["exit_code"], 0, run["stderr"])
+        self.assertEqual(run["stdout"].split(), ["False", "1", "sin", "red"])
+
+    def test_unprivileged_user_and_process_limit(self):
+        """Test: Corre como usuario sin privilegios y una fork bomb choca con RLIMIT_NPROC"""
+        if not _sandbox_user_can_run():
+            self.skipTest("el usuario del sandbox no puede ejecutar el intérprete en este entorno")
+        code = (
+            "import os, time\n"
+            "print(os.getuid())\n"
+            "forks = 0\n"
+            "try:\n"
+            "    for _ in range(500):\n"
+            "        if os.fork() == 0:\n"
+            "            time.sleep(2)\n"
+            "            os._exit(0)\n"
+            "        forks += 1\n"
+            "except OSError:\n"
+            "    pass\n"
+            "print(forks)"
+        )
+        run = self.backend.run("python", code)
+
+        uid, forks = run["stdout"].split()
+        self.assertNotEqual(uid, "0")
+        self.assertLess(int(forks), settings.CODE_EXECUTION_MAX_PROCESSES)
+
+
+@override_settings(**UNISOLATED_EXECUTION)
+class SingleLaunchHarnessTestCase(TestCase):
+    """Tests para el harness que corre todos los test cases en una ejecución"""
+
+    def setUp(self):
+        self.backend = LocalSubprocessBackend()
+        self.test_cases = [
+            {"description": "Positivo", "input": "[3]", "expected_output": "9"},
+            {"description": "Cero", "input": "[0]", "expected_output": "0"},
+            {"description": "Negativo", "input": "[-2]", "expected_output": "4"},
+        ]
+
+    def test_single_launch_isolates_failures(self):
+        """Test: Un solo proceso para todos los casos y una excepción no afecta a los demás"""
+        code = "def solution(n):\n    if n == 0:\n        raise ValueError('cero')\n    return n * n"
+        with patch.object(self.backend, 'run', wraps=self.backend.run) as spy:
+            results, passed = run_test_cases(code, "python", self.test_cases, backend=self.backend)
+
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(passed, 2)
+        self.assertEqual([r["passed"] for r in results], [True, False, True])
+        self.assertIsNone(results[1]["actual_output"])
+        self.assertIn("ValueError: cero", results[1]["error"])
+        self.assertEqual(results[2]["actual_output"], "4")
+
+    @override_settings(CODE_EXECUTION_CASE_TIMEOUT_SECONDS=0.5)
+    def test_case_timeout_does_not_stop_other_cases(self):
+        """Test: Un caso que no termina se corta solo y el resto se evalúa"""
+        code = "def solution(n):\n    while n < 0:\n        pass\n    return n * n"
+        results, passed = run_test_cases(code, "python", self.test_cases, backend=self.backend)
+
+        self.assertEqual(passed, 2)
+        self.assertEqual(results[2]["error"], "Tiempo de ejecución excedido")
+
+    def test_syntax_error_fails_every_case(self):
+        """Test: Si el código no compila, todos los casos reportan el error"""
+        results, passed = run_test_cases("def solution(:", "python", self.test_cases, backend=self.backend)
+
+        self.assertEqual(passed, 0)
+        self.assertTrue(all("SyntaxError" in r["error"] for r in results))
+
+
+class ExecutionSchedulerTestCase(TestCase):
+    """Tests para la cola justa y el pool acotado del scheduler de ejecución"""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.order = []
+        self.blocking = {"A1"}
+        slots_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, slots_dir, ignore_errors=True)
+        self.host_slots = lambda slots=4: HostSlots(slots_dir, slots=slots, per_owner=1)
+
+    def fake_run(self, code, language, test_cases, budget=None):
+        self.order.append(code)
+        if code in self.blocking:
+            self.started.set()
+            self.release.wait(5)
+        return [], 0
+
+    def test_other_candidates_are_not_blocked(self):
+        """Test: Con un candidato ocupando su cupo, los demás se ejecutan antes que su cola"""
+        scheduler = ExecutionScheduler(workers=2, max_queue=10, max_per_owner=1, host_slots=self.host_slots())
+        with patch('assessments.sandbox.scheduler.run_test_cases', side_effect=self.fake_run):
+            first = scheduler.submit("A", "A1", "python", [])
+            self.assertTrue(self.started.wait(5))
+            queued_a = [scheduler.submit("A", code, "python", []) for code in ("A2", "A3")]
+            other = scheduler.submit("B", "B1", "python", [])
+
+            # B corre aunque A1 siga bloqueado y A tenga trabajo en cola
+            other.result(timeout=5)
+            self.assertEqual(self.order, ["A1", "B1"])
+            self.assertEqual(scheduler.metrics_snapshot()["queue_depth"], 2)
+
+            self.release.set()
+            for future in [first] + queued_a:
+                future.result(timeout=5)
+
+        metrics = scheduler.metrics_snapshot()
+        self.assertEqual(self.order, ["A1", "B1", "A2", "A3"])
+        self.assertEqual(metrics["totals"]["completed"], 4)
+        self.assertEqual(metrics["queue_depth"], 0)
+
+    def test_full_queue_is_rejected(self):
+        """Test: Con la cola llena se rechaza la corrida en lugar de acumularla"""
+        scheduler = ExecutionScheduler(workers=1, max_queue=1, max_per_owner=1, host_slots=self.host_slots())
+        with patch('assessments.sandbox.scheduler.run_test_cases', side_effect=self.fake_run):
+            first = scheduler.submit("A", "A1", "python", [])
+            self.assertTrue(self.started.wait(5))
+            scheduler.submit("B", "B1", "python", [])
+            with self.assertRaises(SchedulerBusyError):
+                scheduler.submit("C", "C1", "python", [])
+            self.release.set()
+            first.result(timeout=5)
+
+        self.assertEqual(scheduler.metrics_snapshot()["totals"]["rejected"], 1)
+
+    @override_settings(CODE_EXECUTION_QUEUE_TIMEOUT_SECONDS=1)
+    def test_host_slots_are_shared_between_processes(self):
+        """Test: Los schedulers de distintos procesos comparten los cupos del host y por candidato"""
+        # Dos schedulers = dos procesos de gunicorn con el mismo directorio de cupos
+        first_process = ExecutionScheduler(workers=2, max_queue=10, max_per_owner=1, host_slots=self.host_slots(2))
+        second_process = ExecutionScheduler(workers=2, max_queue=10, max_per_owner=1, host_slots=self.host_slots(2))
+        self.blocking = {"A1", "B1"}
+        with patch('assessments.sandbox.scheduler.run_test_cases', side_effect=self.fake_run):
+            first = first_process.submit("A", "A1", "python", [])
+            self.assertTrue(self.started.wait(5))
+            self.started.clear()
+
+            # El candidato A ya tiene su corrida en el otro proceso: espera y vence
+            with self.assertRaises(SchedulerBusyError):
+                second_process.run("A", "A2", "python", [])
+            # B usa el segundo cupo del host; con los dos tomados, C no consigue cupo
+            blocked_b = second_process.submit("B", "B1", "python", [])
+            self.assertTrue(self.started.wait(5))
+            with self.assertRaises(SchedulerBusyError):
+                second_process.run("C", "C1", "python", [])
+            self.assertEqual(second_process.metrics_snapshot()["host_slots"], {"slots": 2, "in_use": 2})
+
+            self.release.set()
+            first.result(timeout=5)
+            blocked_b.result(timeout=5)
+
+        self.assertEqual(self.order, ["A1", "B1"])
+        self.assertEqual(second_process.metrics_snapshot()["totals"]["failed"], 2)
+
+    @override_settings(CODE_EXECUTION_CPU_SECONDS=1, CODE_EXECUTION_CASE_TIMEOUT_SECONDS=2, **UNISOLATED_EXECUTION)
+    def test_cpu_limit_scales_with_test_cases(self):
+        """Test: Varios casos que usan CPU no se cortan por un límite fijo de toda la corrida"""
+        code = (
+            "import time\n"
+            "def solution(n):\n"
+            "    started = time.process_time()\n"
+            "    while time.process_time() - started < 0.6:\n"
+            "        pass\n"
+            "    return n"
+        )
+        test_cases = [{"input": f"[{i}]", "expected_output": str(i)} for i in range(4)]
+        pool = WarmPool(size=1)
+        self.addCleanup(pool.close)
+
+        for backend in ("local", "warm"):
+            with self.subTest(backend=backend), override_settings(CODE_EXECUTION_BACKEND=backend), \
+                    patch('assessments.sandbox.warm_pool.get_warm_pool', return_value=pool):
+                results, passed = ExecutionScheduler(workers=1).run("A", code, "python", test_cases)
+                self.assertEqual(passed, 4, results[0]["error"])
+
+@override_settings(**UNISOLATED_EXECUTION)
+class ExecutionCacheTestCase(TestCase):
+    """Tests para el cache de resultados de ejecución"""
+
+    def setUp(self):
+        clear_memory_cache()
+        self.backend = LocalSubprocessBackend()
+        self.code = "def solution(n):\n    return n * 2"
+        self.test_cases = [
+            {"input": "[1]", "expected_output": "2"},
+            {"input": "[5]", "expected_output": "10"},
+        ]
+        self.executed = []
+
+    def execute(self, cases):
+        self.executed.append([tc["input"] for tc in cases])
+        return run_test_cases(self.code, "python", cases, backend=self.backend)
+
+    def test_rerun_uses_memory_and_database(self):
+        """Test: La segunda corrida no ejecuta nada; tras limpiar memoria responde la base"""
+        first, passed = run_cached(self.execute, self.code, "python", self.test_cases)
+        self.assertEqual(passed, 2)
+        self.assertEqual(ExecutionCacheEntry.objects.count(), 2)
+
+        second, _ = run_cached(self.execute, self.code, "python", self.test_cases)
+        clear_memory_cache()
+        third, _ = run_cached(self.execute, self.code, "python", self.test_cases + [
+            {"description": "Nuevo", "input": "[7]", "expected_output": "14"},
+        ])
+
+        self.assertEqual(self.executed, [["[1]", "[5]"], ["[7]"]])
+        self.assertEqual(second, first)
+        self.assertEqual(third[:2], first)
+        self.assertEqual(third[2]["test_case"], "Nuevo")
+        self.assertTrue(third[2]["passed"])
+
+    def test_opt_out_and_errors_are_not_cached(self):
+        """Test: Casos con cache: false, use_cache=False y casos con error se ejecutan siempre"""
+        cases = [
+            {"input": "[1]", "expected_output": "2", "cache": False},
+            {"input": "['x']", "expected_output": "xx"},
+        ]
+        self.code = "def solution(n):\n    return n + 1"
+        run_cached(self.execute, self.code, "python", cases)
+        run_cached(self.execute, self.code, "python", cases)
+        run_cached(self.execute, self.code, "python", self.test_cases, use_cache=False)
+
+        self.assertEqual(self.executed, [["[1]", "['x']"], ["[1]", "['x']"], ["[1]", "[5]"]])
+        self.assertEqual(ExecutionCacheEntry.objects.count(), 0)
+
+
+@override_settings(**UNISOLATED_EXECUTION)
+class WarmPoolTestCase(TestCase):
+    """Tests para el pool de intérpretes Python pre-iniciados"""
+
+    PID = "import os\nprint(os.getpid())"
+
+    def setUp(self):
+        self.pool = WarmPool(size=1, max_runs=3)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def pid(self):
+        return self.pool.execute(self.PID, timeout=5, cpu_seconds=2)["stdout"].strip()
+
+    def test_worker_is_reused_and_recycled_after_max_runs(self):
+        """Test: Las corridas reutilizan el proceso hasta el máximo de corridas"""
+        pids = [self.pid() for _ in range(4)]
+
+        self.assertEqual(len(set(pids[:3])), 1)
+        self.assertNotEqual(pids[3], pids[0])
+        self.assertEqual(self.pool.recycled, 1)
+
+    def test_state_leak_and_timeout_recycle_worker(self):
+        """Test: Un cambio de estado global o un timeout descartan el worker"""
+        first = self.pid()
+        leaked = self.pool.execute("import os\nos.environ['LEAK'] = '1'", timeout=5, cpu_seconds=2)
+        after_leak = self.pid()
+        timed_out = self.pool.execute("while True:\n    pass", timeout=1, cpu_seconds=2)
+        after_timeout = self.pid()
+
+        self.assertEqual(leaked["exit_code"], 0)
+        self.assertNotEqual(after_leak, first)
+        self.assertTrue(timed_out["timed_out"])
+        self.assertNotEqual(after_timeout, after_leak)
+
+    def test_default_workers_are_single_use_and_prespawned(self):
+        """Test: Por defecto cada corrida usa un worker ya iniciado y distinto"""
+        pool = WarmPool(size=1)
+        self.addCleanup(pool.close)
+        pool.warm_up()
+
+        pids = []
+        for _ in range(3):
+            self.assertTrue(pool.wait_ready())
+            pids.append(pool.execute(self.PID, timeout=5, cpu_seconds=2)["stdout"].strip())
+
+        self.assertEqual(len(set(pids)), 3)
+        self.assertTrue(pool.wait_ready())
+
+    def test_patched_module_does_not_reach_next_candidate(self):
+        """Test: Un módulo modificado por una corrida no afecta a la siguiente"""
+        pool = WarmPool(size=1)
+        self.addCleanup(pool.close)
+        patch_modules = (
+            "import io, threading\n"
+            "class Quiet(io.StringIO):\n"
+            "    def getvalue(self):\n"
+            "        return ''\n"
+            "io.StringIO = Quiet\n"
+            "threading.active_count = lambda: 1"
+        )
+        pool.execute(patch_modules, timeout=5, cpu_seconds=2)
+
+        results, passed = run_test_cases(
+            "def solution(n):\n    return n", "python",
+            [{"input": "[5]", "expected_output": "5"}],
+            backend=WarmPythonPoolBackend(pool),
+        )
+
+        self.assertEqual(passed, 1, results)
+
+    def test_harness_results_match_cold_backend(self):
+        """Test: Mismos test_results que lanzando un proceso nuevo"""
+        code = "def solution(arr):\n    if not arr:\n        raise ValueError('vacío')\n    return max(arr)"
+        test_cases = [
+            {"input": "[[3,9,2]]", "expected_output": "9"},
+            {"input": "[[]]", "expected_output": "0"},
+        ]
+        warm, warm_passed = run_test_cases(code, "python", test_cases, backend=WarmPythonPoolBackend(self.pool))
+        cold, cold_passed = run_test_cases(code, "python", test_cases, backend=LocalSubprocessBackend())
+
+        self.assertEqual(warm_passed, cold_passed)
+        for warm_result, cold_result in zip(warm, cold):
+            warm_result.pop("execution_time_ms")
+            cold_result.pop("execution_time_ms")
+        self.assertEqual(warm, cold)
+
+
+@override_settings(**UNISOLATED_EXECUTION)
+class BackendExecutionEndpointTestCase(APITestCase):
+    """Tests para evaluate_code_sandbox con use_backend_execution"""
+
+    def setUp(self):
+        self.candidate = User.objects.create_user(username='exec_candidate', password='test123')
+        project = Project.objects.create(title="Proyecto Ejecución")
+        assessment = Assessment.objects.create(
+            candidate=self.candidate, project=project, assessment_type="CODING", title="Coding"
+        )
+        question = Question.objects.create(
+            assessment=assessment, question_type="CODE", question_text="Suma pares",
+            programming_language="python", points=20,
+        )
+        self.answer = CandidateAnswer.objects.create(
+            question=question, candidate=self.candidate,
+            code_answer="def solution(arr):\n    return sum(x for x in arr if x % 2 == 0)"
+        )
+
+    @override_settings(CODE_EXECUTION_BACKEND='local')
+    @patch('assessments.views.chat_completion', side_effect=Exception("sin red"))
+    @patch('assessments.sandbox.backends.PistonBackend.run')
+    def test_backend_execution_runs_locally(self, mock_piston, mock_chat):
+        """Test: La ejecución en backend no llama a Piston para Python"""
+        self.client.force_authenticate(user=self.candidate)
+        response = self.client.post(
+            f'/api/assessments/answers/{self.answer.id}/evaluate_code_sandbox/',
+            {
+                "use_backend_execution": True,
+                "programming_language": "python",
+                "test_cases": [{"input": "[[2,3,4]]", "expected_output": "6"}],
+            },
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_piston.assert_not_called()
+        self.answer.refresh_from_db()
+        self.assertTrue(self.answer.is_correct)
+
+    @patch('assessments.views.get_scheduler')
+    def test_busy_scheduler_returns_503(self, mock_scheduler):
+        """Test: Si la cola de ejecución está llena se responde 503 sin evaluar"""
+        mock_scheduler.return_value.run.side_effect = SchedulerBusyError("llena")
+        self.client.force_authenticate(user=self.candidate)
+        response = self.client.post(
+            f'/api/assessments/answers/{self.answer.id}/evaluate_code_sandbox/',
+            {"use_backend_execution": True, "test_cases": [{"input": "[[2]]", "expected_output": "2"}]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.answer.refresh_from_db()
+        self.assertIsNone(self.answer.is_correct)
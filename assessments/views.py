@@ -2,20 +2,49 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
 import json
 import logging
 import re
 from .models import Assessment, Question, CandidateAnswer
 from .serializers import (
     AssessmentListSerializer, AssessmentDetailSerializer, AssessmentCreateSerializer,
-    QuestionSerializer, QuestionCreateSerializer, CandidateAnswerSerializer,
+    QuestionSerializer, QuestionCreateSerializer, CandidateAnswerSerializer, CandidateAnswerSideloadSerializer,
     ApplicationAnalysisInputSerializer, ApplicationAnalysisOutputSerializer
 )
+from .grading import build_answer_key, grade_answers
+from .points import recompute_points
+from .questions import save_generated_questions
+from .question_bank import draw_questions, pool_for
+from .similarity import drop_near_duplicates
 from .openai_service import OpenAIAssessmentService
+from core.openai_client import chat_completion
+from .sandbox import SchedulerBusyError, cache_stats, get_scheduler, run_cached
+from recruiting.scoring import refresh_summary_for_assessment
 
 logger = logging.getLogger(__name__)
 
+# Frases completas que claramente mencionan código (en minúsculas)
+CODE_MENTION_PHRASES = [
+    'siguiente código', 'siguiente codigo',
+    'código anterior', 'codigo anterior',
+    'salida del', 'resultado del código', 'resultado del codigo',
+    'qué imprime', 'que imprime',
+    'qué devuelve', 'que devuelve',
+    'ejecutar el', 'execute the',
+    'output of',
+    'following code',
+    'above code',
+    'código proporcionado', 'codigo proporcionado',
+    'provided code',
+    'código mostrado', 'codigo mostrado'
+]
+# Una sola regex para todas las frases (se compila una vez por proceso)
+CODE_MENTION_RE = re.compile('|'.join(re.escape(phrase) for phrase in CODE_MENTION_PHRASES))
+FENCED_CODE_RE = re.compile(r'```(?:\w+)?\s*\n(.*?)\n```', re.DOTALL)
+INLINE_CODE_RE = re.compile(r'`([^`]+)`')
+
 
 class AssessmentViewSet(viewsets.ModelViewSet):
     """ViewSet para gestionar pruebas técnicas"""
@@ -32,10 +61,27 @@ class AssessmentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filtrar según tipo de usuario"""
         qs = super().get_queryset()
+        if self.action == 'list':
+            # El listado no muestra preguntas: solo su cantidad, contada en SQL
+            qs = qs.prefetch_related(None).annotate(question_count=Count('questions'))
+        elif self.action == 'retrieve':
+            qs = qs.annotate(question_count=Count('questions'))
         if not self.request.user.is_staff:
             # Candidatos solo ven sus propias pruebas
             qs = qs.filter(candidate=self.request.user)
         return qs
+
+    def perform_create(self, serializer):
+        assessment = serializer.save()
+        refresh_summary_for_assessment(assessment)
+
+    def perform_update(self, serializer):
+        assessment = serializer.save()
+        refresh_summary_for_assessment(assessment)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        refresh_summary_for_assessment(instance)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def generate_questions(self, request, pk=None):
@@ -47,7 +93,8 @@ class AssessmentViewSet(viewsets.ModelViewSet):
             "num_questions": 10,  # Para QUIZ
             "num_challenges": 1,  # Para CODING (siempre 1 desafío)
             "language": "es",  # o "en"
-            "include_code_snippets": true  # Generar fragmentos de código en preguntas QUIZ
+            "include_code_snippets": true,  # Generar fragmentos de código en preguntas QUIZ
+            "use_bank": true  # Tomar primero preguntas del banco pre-generado (ver question_bank.py)
         }
         """
         assessment = self.get_object()
@@ -56,6 +103,7 @@ class AssessmentViewSet(viewsets.ModelViewSet):
         num_challenges = request.data.get('num_challenges', 1)
         language = request.data.get('language', 'es')
         include_code_snippets = request.data.get('include_code_snippets', False)
+        use_bank = request.data.get('use_bank', True)
         
         if not topic:
             return Response(
@@ -66,65 +114,63 @@ class AssessmentViewSet(viewsets.ModelViewSet):
         try:
             ai_service = OpenAIAssessmentService()
             generated_questions = []
+            from_bank = 0
             
             if assessment.assessment_type == 'QUIZ':
-                # Generar preguntas de cuestionario
-                questions_data = ai_service.generate_quiz_questions(
-                    topic=topic,
-                    difficulty=assessment.difficulty,
-                    num_questions=num_questions,
-                    language=language,
-                    include_code_snippets=include_code_snippets
-                )
+                # Primero el banco; OpenAI solo genera las que falten
+                pool = pool_for(topic, assessment.difficulty, 'QUIZ', language, with_code=include_code_snippets)
+                questions_data = draw_questions(topic, pool, assessment.candidate, num_questions) if use_bank else []
+                from_bank = len(questions_data)
+                if num_questions > from_bank:
+                    questions_data += ai_service.generate_quiz_questions(
+                        topic=topic,
+                        difficulty=assessment.difficulty,
+                        num_questions=num_questions - from_bank,
+                        language=language,
+                        include_code_snippets=include_code_snippets
+                    )
                 
-                for idx, q_data in enumerate(questions_data):
-                    correct_answer_value = str(q_data.get('correct_answer', ''))
-                    question_text = q_data['question_text']
-                    code_snippet = q_data.get('code_snippet', '')
-                    
-                    # Si no hay code_snippet pero el texto menciona código, extraerlo
-                    if not code_snippet:
-                        code_snippet = self._extract_code_from_text(question_text)
-                    
-                    # Validar que si se menciona código, exista code_snippet
-                    if self._mentions_code(question_text) and not code_snippet:
+                # Pre-pass sobre todo el lote: extraer code_snippet del texto y detectar menciones de código
+                snippets = self._prepare_code_snippets(questions_data)
+                ai_prompt = f"Topic: {topic}, Difficulty: {assessment.difficulty}, Include Code: {include_code_snippets}"
+
+                for idx, (q_data, (code_snippet, missing_code)) in enumerate(zip(questions_data, snippets)):
+                    if missing_code:
                         logger.warning(
-                            f"Pregunta {idx+1} menciona código pero no tiene code_snippet: {question_text[:100]}"
+                            f"Pregunta {idx+1} menciona código pero no tiene code_snippet: {q_data['question_text'][:100]}"
                         )
-                    
-                    question = Question.objects.create(
+                    generated_questions.append(Question(
                         assessment=assessment,
                         question_type=q_data.get('question_type', 'MULTIPLE_CHOICE'),
-                        question_text=question_text,
+                        question_text=q_data['question_text'],
                         code_snippet=code_snippet,
                         options=q_data.get('options', []),
-                        correct_answer=correct_answer_value,
+                        correct_answer=str(q_data.get('correct_answer', '')),
                         explanation=q_data.get('explanation', ''),
                         points=q_data.get('points', 10),
                         order=idx,
                         generated_by_ai=True,
-                        ai_prompt=f"Topic: {topic}, Difficulty: {assessment.difficulty}, Include Code: {include_code_snippets}"
-                    )
-                    print(f"✅ Pregunta {idx+1} guardada:")
-                    print(f"   ID: {question.id}")
-                    print(f"   Texto: {question.question_text[:60]}...")
-                    print(f"   Opciones: {question.options}")
-                    print(f"   code_snippet: {len(code_snippet)} caracteres")
-                    print(f"   correct_answer: '{question.correct_answer}' (tipo: {type(question.correct_answer).__name__})")
-                    generated_questions.append(question)
-                    
+                        ai_prompt=ai_prompt,
+                        bank_question_id=q_data.get('bank_question_id')
+                    ))
+
             elif assessment.assessment_type == 'CODING':
                 # Generar desafíos de código
                 prog_lang = request.data.get('programming_language', 'python')
-                challenges_data = ai_service.generate_coding_challenges(
-                    topic=topic,
-                    difficulty=assessment.difficulty,
-                    num_challenges=num_challenges,
-                    language=prog_lang
-                )
+                pool = pool_for(topic, assessment.difficulty, 'CODING', programming_language=prog_lang)
+                challenges_data = draw_questions(topic, pool, assessment.candidate, num_challenges) if use_bank else []
+                from_bank = len(challenges_data)
+                if num_challenges > from_bank:
+                    challenges_data += ai_service.generate_coding_challenges(
+                        topic=topic,
+                        difficulty=assessment.difficulty,
+                        num_challenges=num_challenges - from_bank,
+                        language=prog_lang
+                    )
                 
+                ai_prompt = f"Topic: {topic}, Difficulty: {assessment.difficulty}, Language: {prog_lang}"
                 for idx, c_data in enumerate(challenges_data):
-                    question = Question.objects.create(
+                    generated_questions.append(Question(
                         assessment=assessment,
                         question_type='CODE',
                         question_text=c_data['question_text'],
@@ -136,13 +182,25 @@ class AssessmentViewSet(viewsets.ModelViewSet):
                         points=c_data.get('points', 20),
                         order=idx,
                         generated_by_ai=True,
-                        ai_prompt=f"Topic: {topic}, Difficulty: {assessment.difficulty}, Language: {prog_lang}"
-                    )
-                    generated_questions.append(question)
-            
+                        ai_prompt=ai_prompt,
+                        bank_question_id=c_data.get('bank_question_id')
+                    ))
+
+            # Descartar casi duplicados entre sí y respecto de las preguntas que ya tiene la prueba
+            generated_questions, duplicates = drop_near_duplicates(
+                generated_questions, existing=assessment.questions.values('question_text', 'code_snippet')
+            )
+            if duplicates:
+                logger.warning(f"🔁 {len(duplicates)} preguntas casi duplicadas descartadas en assessment {assessment.id}")
+
+            generated_questions = save_generated_questions(assessment, generated_questions)
+            logger.info(f"✅ {len(generated_questions)} preguntas guardadas para assessment {assessment.id}")
+
             serializer = QuestionSerializer(generated_questions, many=True, context={'request': request})
             return Response({
                 'message': f'{len(generated_questions)} preguntas generadas exitosamente',
+                'from_bank': from_bank,
+                'duplicates_dropped': len(duplicates),
                 'questions': serializer.data
             }, status=status.HTTP_201_CREATED)
             
@@ -169,6 +227,7 @@ class AssessmentViewSet(viewsets.ModelViewSet):
         assessment.status = 'IN_PROGRESS'
         assessment.started_at = timezone.now()
         assessment.save()
+        refresh_summary_for_assessment(assessment)
         
         serializer = self.get_serializer(assessment)
         return Response(serializer.data)
@@ -190,14 +249,12 @@ class AssessmentViewSet(viewsets.ModelViewSet):
         assessment.status = 'COMPLETED'
         assessment.completed_at = timezone.now()
         
-        # Calcular puntuación total
-        total_points = sum(q.points for q in assessment.questions.all())
-        earned_points = sum(
-            CandidateAnswer.objects.filter(
-                question__assessment=assessment,
-                candidate=request.user
-            ).values_list('points_earned', flat=True)
-        )
+        # Puntuación total con los agregados mantenidos (sin recorrer preguntas ni respuestas)
+        total_points = assessment.total_points
+        earned_points = assessment.earned_points
+        if total_points <= 0:
+            # Fallback: agregados sin inicializar (ej: preguntas creadas con bulk_create)
+            total_points, earned_points = recompute_points(assessment)
         
         if total_points > 0:
             assessment.score = (earned_points / total_points) * 100
@@ -205,12 +262,13 @@ class AssessmentViewSet(viewsets.ModelViewSet):
             assessment.score = 0
             
         assessment.save()
+        refresh_summary_for_assessment(assessment)
         
         # Enviar notificaciones por email
         from .email_service import notify_assessment_completed
         try:
             notify_assessment_completed(assessment.id)
-            logger.info(f"✅ Notificaciones enviadas para assessment {assessment.id}")
+            logger.info(f"✅ Notificaciones encoladas para assessment {assessment.id}")
         except Exception as e:
             logger.error(f"❌ Error enviando notificaciones para assessment {assessment.id}: {str(e)}")
         
@@ -233,73 +291,29 @@ class AssessmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Obtener todas las preguntas del assessment
-        questions = assessment.questions.all()
-        
-        # Obtener todas las respuestas del candidato para este assessment
-        answers = CandidateAnswer.objects.filter(
-            question__assessment=assessment,
-            candidate=request.user
-        )
-        
+        # Preguntas (ya vienen en el prefetch del queryset) y clave de respuestas
+        questions = list(assessment.questions.all())
+        answer_key = build_answer_key(questions)
+
+        # Todas las respuestas del candidato en una sola consulta, por pregunta
+        answers = {
+            answer.question_id: answer
+            for answer in CandidateAnswer.objects.filter(
+                question__assessment=assessment,
+                candidate=request.user
+            )
+        }
+        graded = grade_answers(answer_key, answers.values())
+
         total_points = 0
         max_possible_points = 0
-        evaluated_count = 0
         results_detail = []
-        
+
         for question in questions:
             max_possible_points += question.points
-            
-            try:
-                answer = answers.get(question=question)
-                
-                # Determinar si la respuesta es correcta según el tipo de pregunta
-                is_correct = False
-                
-                if question.question_type == 'MULTIPLE_CHOICE':
-                    # Para opción múltiple, comparar el índice seleccionado
-                    # El frontend puede enviar answer_text (string "0", "1", etc.) o selected_option_index (int)
-                    correct_answer_str = str(question.correct_answer).strip()
-                    user_answer_str = str(answer.answer_text).strip() if answer.answer_text else str(answer.selected_option_index)
-                    
-                    is_correct = user_answer_str == correct_answer_str
-                    
-                    print(f"\n🔍 Evaluando pregunta {question.id}:")
-                    print(f"   Pregunta: {question.question_text[:60]}...")
-                    print(f"   Opciones: {question.options}")
-                    print(f"   Respuesta correcta (backend): '{correct_answer_str}'")
-                    print(f"   Respuesta usuario (answer_text): '{answer.answer_text}'")
-                    print(f"   Respuesta usuario (selected_option_index): {answer.selected_option_index}")
-                    print(f"   ¿Es correcta?: {is_correct}")
-                
-                elif question.question_type == 'TRUE_FALSE':
-                    # Para verdadero/falso, comparar directamente
-                    is_correct = answer.answer_text.lower() == question.correct_answer.lower()
-                
-                elif question.question_type == 'SHORT_ANSWER':
-                    # Para respuesta corta, comparar texto (case-insensitive)
-                    is_correct = answer.answer_text.lower().strip() == question.correct_answer.lower().strip()
-                
-                # Actualizar la respuesta
-                answer.is_correct = is_correct
-                answer.points_earned = question.points if is_correct else 0
-                answer.feedback = question.explanation if question.explanation else ''
-                answer.save()
-                
-                if is_correct:
-                    total_points += question.points
-                
-                evaluated_count += 1
-                
-                results_detail.append({
-                    'question_id': question.id,
-                    'question_text': question.question_text[:50] + '...',
-                    'is_correct': is_correct,
-                    'points_earned': answer.points_earned,
-                    'max_points': question.points
-                })
-                
-            except CandidateAnswer.DoesNotExist:
+            answer = answers.get(question.id)
+
+            if answer is None:
                 # Pregunta sin respuesta
                 results_detail.append({
                     'question_id': question.id,
@@ -310,7 +324,23 @@ class AssessmentViewSet(viewsets.ModelViewSet):
                     'error': 'Sin respuesta'
                 })
                 continue
-        
+
+            if answer.is_correct:
+                total_points += question.points
+
+            results_detail.append({
+                'question_id': question.id,
+                'question_text': question.question_text[:50] + '...',
+                'is_correct': answer.is_correct,
+                'points_earned': answer.points_earned,
+                'max_points': question.points
+            })
+
+        with transaction.atomic():
+            CandidateAnswer.objects.bulk_update(graded, ['is_correct', 'points_earned', 'feedback'])
+            # bulk_update no pasa por save(): recalcular earned_points en la base
+            recompute_points(assessment)
+
         # Calcular porcentaje
         score_percentage = (total_points / max_possible_points * 100) if max_possible_points > 0 else 0
         
@@ -318,14 +348,15 @@ class AssessmentViewSet(viewsets.ModelViewSet):
         assessment.score = score_percentage
         assessment.status = 'EVALUATED'
         assessment.save()
+        refresh_summary_for_assessment(assessment)
         
         return Response({
             'assessment_id': assessment.id,
             'total_points': total_points,
             'max_possible_points': max_possible_points,
             'score_percentage': round(score_percentage, 2),
-            'evaluated_answers': evaluated_count,
-            'total_questions': questions.count(),
+            'evaluated_answers': len(graded),
+            'total_questions': len(questions),
             'passed': score_percentage >= assessment.passing_score,
             'results_detail': results_detail
         })
@@ -458,13 +489,14 @@ class AssessmentViewSet(viewsets.ModelViewSet):
             )
         
         # Enviar invitaciones
+        # Encolar invitaciones (las envía el worker send_outbox_emails)
         result = send_assessment_invitation(
             assessment_id=assessment.id,
             user_ids=list(existing_users),
             custom_message=custom_message
         )
         
-        return Response(result, status=status.HTTP_200_OK)
+        return Response(result, status=status.HTTP_202_ACCEPTED if result["success"] else status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     @action(detail=True, methods=['post'], url_path='notify-completed', permission_classes=[permissions.IsAuthenticated])
     def notify_completed(self, request, pk=None):
@@ -497,10 +529,10 @@ class AssessmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Enviar notificaciones
+        # Encolar notificaciones
         result = notify_assessment_completed(assessment_id=assessment.id)
         
-        return Response(result, status=status.HTTP_200_OK)
+        return Response(result, status=status.HTTP_202_ACCEPTED if result["success"] else status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     def _extract_code_from_text(self, text):
         """
@@ -511,14 +543,12 @@ class AssessmentViewSet(viewsets.ModelViewSet):
             str: El código extraído o cadena vacía
         """
         # Patrón 1: Triple backticks con o sin lenguaje (```python ... ``` o ``` ... ```)
-        pattern1 = r'```(?:\w+)?\s*\n(.*?)\n```'
-        match = re.search(pattern1, text, re.DOTALL)
+        match = FENCED_CODE_RE.search(text)
         if match:
             return match.group(1).strip()
         
         # Patrón 2: Backticks simples multilínea (`código`)
-        pattern2 = r'`([^`]+)`'
-        matches = re.findall(pattern2, text)
+        matches = INLINE_CODE_RE.findall(text)
         # Si hay matches largos (probablemente código), retornar el más largo
         if matches:
             longest = max(matches, key=len)
@@ -534,30 +564,34 @@ class AssessmentViewSet(viewsets.ModelViewSet):
         Returns:
             bool: True si menciona código
         """
-        # Frases completas que claramente mencionan código
-        explicit_phrases = [
-            'siguiente código', 'siguiente codigo',
-            'código anterior', 'codigo anterior',
-            'salida del', 'resultado del código', 'resultado del codigo',
-            'qué imprime', 'que imprime',
-            'qué devuelve', 'que devuelve',
-            'ejecutar el', 'execute the',
-            'output of',
-            'following code',
-            'above code',
-            'código proporcionado', 'codigo proporcionado',
-            'provided code',
-            'código mostrado', 'codigo mostrado'
-        ]
+        return CODE_MENTION_RE.search(text.lower()) is not None
+
+    def _prepare_code_snippets(self, questions_data):
+        """
+        Pre-pass sobre el lote generado, antes de armar las preguntas.
         
-        text_lower = text.lower()
-        return any(phrase in text_lower for phrase in explicit_phrases)
+        Returns:
+            list[(code_snippet, missing_code)]: snippet final de cada pregunta (el
+            de la IA o el extraído del texto) y si menciona código sin tenerlo
+        """
+        prepared = []
+        for q_data in questions_data:
+            question_text = q_data['question_text']
+            code_snippet = q_data.get('code_snippet', '') or self._extract_code_from_text(question_text)
+            prepared.append((code_snippet, not code_snippet and self._mentions_code(question_text)))
+        return prepared
 
 
 class QuestionViewSet(viewsets.ModelViewSet):
     """ViewSet para gestionar preguntas"""
-    queryset = Question.objects.select_related("assessment").all()
+    # El cursor solo usa el primer campo: con assessment_id (repetido en cada
+    # pregunta de la prueba) paginaría con OFFSET dentro de la prueba, así que
+    # se pagina por PK. La lista completa usa el mismo orden para que ambas
+    # coincidan. No es el orden de `order`: cada llamada a generate_questions
+    # lo reinicia en 0 y el staff lo puede editar; el cliente ordena por ese campo.
+    queryset = Question.objects.select_related("assessment").order_by("id")
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ("id",)
     
     def get_serializer_class(self):
         if self.request.user.is_staff:
@@ -590,67 +624,50 @@ class CandidateAnswerViewSet(viewsets.ModelViewSet):
         qs = super().get_queryset()
         
         # Obtener parámetros de filtrado
+        # (para depurar consultas: REQUEST_METRICS_LOG_QUERIES, ver core/middleware.py)
         assessment_id = self.request.query_params.get('assessment')
         question_id = self.request.query_params.get('question')
         
-        print(f"\n🔍 FILTRADO DE RESPUESTAS:")
-        print(f"   Assessment ID solicitado: {assessment_id}")
-        print(f"   Question ID solicitado: {question_id}")
-        print(f"   Usuario: {self.request.user.username}")
-        
-        # DEBUG: Mostrar estado antes de filtrar
-        if assessment_id:
-            # Verificar cuántas respuestas existen en total para este usuario
-            total_answers = CandidateAnswer.objects.filter(candidate=self.request.user).count() if not self.request.user.is_staff else CandidateAnswer.objects.all().count()
-            print(f"   📊 Total respuestas en DB: {total_answers}")
-            
-            # Verificar cuántas preguntas tiene este assessment
-            from .models import Assessment
-            try:
-                assessment = Assessment.objects.get(id=assessment_id)
-                questions_count = assessment.questions.count()
-                print(f"   📋 Preguntas en assessment {assessment_id}: {questions_count}")
-                
-                # Ver si hay respuestas para esas preguntas
-                question_ids = list(assessment.questions.values_list('id', flat=True))
-                print(f"   🔑 IDs de preguntas: {question_ids}")
-                
-                answers_for_questions = CandidateAnswer.objects.filter(question_id__in=question_ids)
-                if self.request.user.is_staff:
-                    answers_count = answers_for_questions.count()
-                    print(f"   💬 Respuestas existentes para esas preguntas (todos los usuarios): {answers_count}")
-                else:
-                    answers_count = answers_for_questions.filter(candidate=self.request.user).count()
-                    print(f"   💬 Respuestas existentes para esas preguntas (tu usuario): {answers_count}")
-                    
-            except Assessment.DoesNotExist:
-                print(f"   ❌ Assessment {assessment_id} no existe")
-        
         # Filtrar por assessment (a través de question__assessment)
         if assessment_id:
             qs = qs.filter(question__assessment_id=assessment_id)
-            print(f"   ✅ Filtrando por question__assessment_id={assessment_id}")
         
         # Filtrar por question
         if question_id:
             qs = qs.filter(question_id=question_id)
-            print(f"   ✅ Filtrando por question_id={question_id}")
         
         if not self.request.user.is_staff:
             # Candidatos solo ven sus propias respuestas
             qs = qs.filter(candidate=self.request.user)
-            print(f"   ✅ Filtrando por candidate={self.request.user.id}")
-        
-        # Log de resultados
-        results = list(qs.values_list('id', 'question__assessment_id', 'question_id', 'candidate__username'))
-        print(f"   📊 Respuestas encontradas: {len(results)}")
-        for answer_id, assessment, question, username in results[:5]:  # Mostrar máximo 5
-            print(f"      - Answer ID={answer_id}, Assessment={assessment}, Question={question}, Usuario={username}")
-        if len(results) > 5:
-            print(f"      ... y {len(results) - 5} más")
-        print()
             
         return qs
+
+    def list(self, request, *args, **kwargs):
+        """
+        Con ?sideload=questions cada respuesta lleva solo question_id y las
+        preguntas van una sola vez en un mapa {id: pregunta}:
+        {"results": [...], "questions": {"12": {...}}} (con next/previous si
+        además se pagina). Sin el parámetro la respuesta no cambia.
+        """
+        if request.query_params.get('sideload') != 'questions':
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        answers = page if page is not None else list(queryset)
+        context = self.get_serializer_context()
+
+        # Las preguntas ya vienen en el select_related: se serializa cada una una vez
+        questions = {answer.question_id: answer.question for answer in answers}
+        question_data = QuestionSerializer(list(questions.values()), many=True, context=context).data
+        answer_data = CandidateAnswerSideloadSerializer(answers, many=True, context=context).data
+
+        if page is not None:
+            response = self.get_paginated_response(answer_data)
+        else:
+            response = Response({'results': answer_data})
+        response.data['questions'] = {str(question['id']): question for question in question_data}
+        return response
     
     def perform_create(self, serializer):
         """Guardar respuesta y evaluar automáticamente"""
@@ -780,6 +797,7 @@ class CandidateAnswerViewSet(viewsets.ModelViewSet):
             answer.feedback = evaluation.get('feedback', '')
             answer.test_results = evaluation.get('test_results', {})
             answer.save()
+            refresh_summary_for_assessment(assessment)
             
             serializer = self.get_serializer(answer)
             return Response(serializer.data)
@@ -790,6 +808,14 @@ class CandidateAnswerViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser], url_path='execution-metrics')
+    def execution_metrics(self, request):
+        """
+        Estado del scheduler de ejecución de código de este proceso
+        GET /api/assessments/answers/execution-metrics/
+        """
+        return Response({**get_scheduler().metrics_snapshot(), "cache": cache_stats()})
+
     @action(detail=True, methods=['post'])
     def evaluate_code_sandbox(self, request, pk=None):
         """
@@ -829,141 +855,24 @@ class CandidateAnswerViewSet(viewsets.ModelViewSet):
             test_cases = request.data.get('test_cases', [])
             code = request.data.get('code', answer.code_answer)
             
-            print(f"\n🐍 EJECUTANDO CÓDIGO EN BACKEND ({programming_language.upper()})")
-            print(f"   Código a ejecutar: {code[:100]}...")
-            print(f"   Test cases: {len(test_cases)}")
-            
-            # Ejecutar código con Piston API
-            import requests
-            
-            test_results = []
-            passed_tests = 0
-            
-            # Mapeo de lenguajes a Piston
-            language_map = {
-                'python': 'python',
-                'javascript': 'javascript',
-                'java': 'java'
-            }
-            
-            piston_language = language_map.get(programming_language.lower(), 'python')
-            
-            for idx, test_case in enumerate(test_cases, 1):
-                test_input = test_case.get('input', '')
-                expected_output = test_case.get('expected_output', '')
-                description = test_case.get('description', f'Test {idx}')
-                
-                print(f"\n🔍 DEBUG Test {idx}:")
-                print(f"   Input original: {repr(test_input)} (tipo: {type(test_input)})")
-                print(f"   Expected output: {repr(expected_output)}")
-                
-                # Parsear el input - puede venir como array ["value"] o valor directo
-                # Si viene como ["value"], extraer solo el valor
-                try:
-                    import ast
-                    parsed_input = ast.literal_eval(test_input)
-                    print(f"   Parsed con ast.literal_eval: {parsed_input} (tipo: {type(parsed_input)})")
-                    # Si es una lista de un solo elemento, extraerlo
-                    if isinstance(parsed_input, list) and len(parsed_input) == 1:
-                        actual_input = parsed_input[0]
-                    elif isinstance(parsed_input, list):
-                        # Si es lista de múltiples elementos, mantenerlo como lista
-                        actual_input = parsed_input
-                    else:
-                        actual_input = parsed_input
-                except Exception as e:
-                    # Si falla el parsing, usar el input tal cual
-                    print(f"   ⚠️ Error parseando: {e}")
-                    actual_input = test_input
-                
-                print(f"   Actual input: {actual_input} (tipo: {type(actual_input)})")
-                
-                print(f"   Actual input: {actual_input} (tipo: {type(actual_input)})")
-                
-                # Construir código con test case
-                if programming_language.lower() == 'python':
-                    test_input_formatted = repr(actual_input)
-                    test_code = f"""{code}
-
-# Test case {idx}
-result = solution({test_input_formatted})
-print(result)
-"""
-                elif programming_language.lower() == 'javascript':
-                    # Para JavaScript, convertir a sintaxis JS válida
-                    test_input_formatted = json.dumps(actual_input)
-                    print(f"   Input formateado para JS: {test_input_formatted}")
-                    test_code = f"""{code}
-
-// Test case {idx}
-const result = solution({test_input_formatted});
-console.log(result);
-"""
-                    print(f"   Código a ejecutar:\n{test_code[:200]}...")
-                else:
-                    test_input_formatted = str(actual_input)
-                    test_code = code  # Para otros lenguajes, ajustar según sea necesario
-                
-                try:
-                    # Llamar a Piston API
-                    piston_response = requests.post(
-                        'https://emkc.org/api/v2/piston/execute',
-                        json={
-                            'language': piston_language,
-                            'version': '*',
-                            'files': [{
-                                'content': test_code
-                            }]
-                        },
-                        timeout=10
-                    )
-                    
-                    piston_result = piston_response.json()
-                    actual_output = piston_result.get('run', {}).get('output', '').strip()
-                    error = piston_result.get('run', {}).get('stderr', '')
-                    
-                    # Comparar resultado - normalizar valores null/None
-                    # Para JavaScript: null, undefined -> normalizar
-                    # Para Python: None -> normalizar
-                    def normalize_output(val):
-                        val_str = str(val).strip().strip('"')
-                        if val_str.lower() in ['null', 'none', 'undefined']:
-                            return 'null'
-                        return val_str
-                    
-                    passed = normalize_output(actual_output) == normalize_output(expected_output)
-                    
-                    if passed:
-                        passed_tests += 1
-                    
-                    test_results.append({
-                        'test_case': description,
-                        'input': test_input,
-                        'expected_output': expected_output,
-                        'actual_output': actual_output if not error else None,
-                        'passed': passed,
-                        'execution_time_ms': 0,
-                        'error': error if error else None
-                    })
-                    
-                    print(f"   ✅ Test {idx}: {'PASÓ' if passed else 'FALLÓ'}")
-                    
-                except Exception as e:
-                    print(f"   ❌ Error ejecutando test {idx}: {e}")
-                    test_results.append({
-                        'test_case': description,
-                        'input': test_input,
-                        'expected_output': expected_output,
-                        'actual_output': None,
-                        'passed': False,
-                        'execution_time_ms': 0,
-                        'error': str(e)
-                    })
+            # Ejecutar los test cases en el backend configurado (local con rlimits o Piston),
+            # a través del scheduler para no saturar el host cuando muchos envían a la vez.
+            # Los casos ya ejecutados con el mismo código salen del cache (use_cache: false para omitirlo)
+            use_cache = request.data.get('use_cache', True) is not False
+            try:
+                test_results, passed_tests = run_cached(
+                    lambda cases: get_scheduler().run(answer.candidate_id, code, programming_language, cases),
+                    code, programming_language, test_cases, use_cache=use_cache,
+                )
+            except SchedulerBusyError as e:
+                logger.warning(f"⚠️ Ejecución de answer {answer.id} rechazada: {e}")
+                return Response(
+                    {'error': 'El servidor de ejecución está ocupado, intenta nuevamente en unos segundos'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
             
             total_tests = len(test_cases)
             sandbox_success = True
-            
-            print(f"   📊 Resultado final: {passed_tests}/{total_tests} tests pasados\n")
 
         if not sandbox_success or total_tests == 0:
             # Si el sandbox falló, usar evaluación tradicional con IA
@@ -980,9 +889,6 @@ console.log(result);
         ai_quality_feedback = ""
 
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
             # Prompt simplificado - SOLO calidad, NO funcionalidad
             quality_prompt = f"""Evalúa SOLO la CALIDAD del siguiente código.
 
@@ -1008,7 +914,8 @@ Responde en JSON:
 }}
 """
 
-            response = client.chat.completions.create(
+            response = chat_completion(
+                "code_quality",
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "Eres un evaluador experto de calidad de código."},
@@ -1076,6 +983,7 @@ Responde en JSON:
         answer.feedback = combined_feedback
         answer.test_results = test_results  # Guardar los resultados de los tests
         answer.save()
+        refresh_summary_for_assessment(answer.question.assessment)
 
         # Serializar y retornar
         serializer = self.get_serializer(answer)
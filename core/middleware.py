@@ -0,0 +1,150 @@
+"""
+Instrumentación por request: cantidad de consultas SQL, tiempo en la base y
+tiempo total, agrupados por endpoint (nombre de la ruta, p. ej.
+"answer-list" o "assessment-generate-questions").
+
+  - Cada respuesta lleva un header Server-Timing (visible en las devtools).
+  - GET /api/metrics/requests/ (solo staff) muestra los totales del proceso.
+  - Si un endpoint supera su presupuesto de consultas (QUERY_BUDGETS o
+    QUERY_BUDGET_DEFAULT) se registra un warning. El presupuesto se busca
+    por "MÉTODO ruta" y luego por la ruta sola: el GET y el POST de un
+    listado hacen trabajos muy distintos.
+  - Con REQUEST_METRICS_LOG_QUERIES=True se loguea el SQL de cada request
+    (reemplaza los print de depuración de las vistas).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Bucket único para los requests sin ruta (404, scanners): agrupar por path
+# haría crecer _totals sin límite. Lo mismo para métodos HTTP inventados.
+UNRESOLVED_ENDPOINT = "unresolved"
+KNOWN_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+
+_metrics_lock = threading.Lock()
+_recent_requests = deque(maxlen=200)
+_totals = {}
+
+
+class QueryRecorder:
+    """execute_wrapper que cuenta consultas y mide su duración"""
+
+    def __init__(self, keep_sql=False):
+        self.count = 0
+        self.duration = 0.0
+        self.keep_sql = keep_sql
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if self.keep_sql:
+                self.queries.append((round(elapsed * 1000, 2), sql))
+
+
+def endpoint_name(request):
+    """Nombre de la ruta resuelta; si no hay (404), UNRESOLVED_ENDPOINT"""
+    match = getattr(request, "resolver_match", None)
+    if match is not None and match.view_name:
+        return match.view_name
+    return UNRESOLVED_ENDPOINT
+
+
+def query_budget(endpoint, method=None):
+    """Presupuesto de "MÉTODO ruta"; si no está, el de la ruta; si no, QUERY_BUDGET_DEFAULT"""
+    budgets = settings.QUERY_BUDGETS
+    if method and f"{method} {endpoint}" in budgets:
+        return budgets[f"{method} {endpoint}"]
+    return budgets.get(endpoint, settings.QUERY_BUDGET_DEFAULT)
+
+
+def _record(endpoint, method, status_code, queries, db_ms, total_ms, over_budget):
+    entry = {
+        "endpoint": endpoint,
+        "method": method,
+        "status": status_code,
+        "queries": queries,
+        "db_ms": db_ms,
+        "total_ms": total_ms,
+        "over_budget": over_budget,
+    }
+    with _metrics_lock:
+        _recent_requests.append(entry)
+        totals = _totals.setdefault(f"{method} {endpoint}", {
+            "requests": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0,
+            "total_ms": 0.0, "max_total_ms": 0.0, "budget_violations": 0,
+        })
+        totals["requests"] += 1
+        totals["queries"] += queries
+        totals["max_queries"] = max(totals["max_queries"], queries)
+        totals["db_ms"] += db_ms
+        totals["total_ms"] += total_ms
+        totals["max_total_ms"] = max(totals["max_total_ms"], total_ms)
+        totals["budget_violations"] += over_budget
+    return entry
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder(keep_sql=settings.REQUEST_METRICS_LOG_QUERIES)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = round((time.perf_counter() - started) * 1000, 2)
+        db_ms = round(recorder.duration * 1000, 2)
+
+        endpoint = endpoint_name(request)
+        method = request.method if request.method in KNOWN_METHODS else "OTHER"
+        budget = query_budget(endpoint, method)
+        over_budget = budget is not None and recorder.count > budget
+        _record(endpoint, method, response.status_code, recorder.count, db_ms, total_ms, over_budget)
+
+        if over_budget:
+            logger.warning(
+                f"⚠️ {method} {endpoint}: {recorder.count} consultas "
+                f"(presupuesto {budget}), {db_ms}ms en DB, {total_ms}ms total"
+            )
+        if recorder.keep_sql:
+            logger.info(f"🔍 {request.method} {request.path} ({endpoint}): {recorder.count} consultas, {db_ms}ms")
+            for duration, sql in recorder.queries:
+                logger.info(f"   {duration}ms {sql}")
+
+        response["Server-Timing"] = (
+            f'db;dur={db_ms};desc="{recorder.count} queries", total;dur={total_ms}'
+        )
+        return response
+
+
+def metrics_snapshot():
+    """Totales por endpoint y últimos requests de este proceso"""
+    with _metrics_lock:
+        return {
+            "totals": {endpoint: dict(values) for endpoint, values in _totals.items()},
+            "recent": list(_recent_requests),
+        }
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _recent_requests.clear()
+        _totals.clear()
@@ -0,0 +1,202 @@
+"""
+Cliente OpenAI compartido por todo el backend.
+
+Todas las llamadas pasan por aquí para tener en un solo lugar:
+  - un único cliente por proceso con pool de conexiones HTTP (keep-alive),
+  - timeout por tipo de tarea,
+  - reintentos con backoff exponencial y jitter ante errores transitorios,
+  - un semáforo que limita las llamadas simultáneas del proceso,
+  - métricas por llamada (tarea, modelo, latencia, tokens, resultado).
+
+Uso:
+    from core.openai_client import chat_completion
+    response = chat_completion("cv_parse", model=MODEL, messages=[...])
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+from django.conf import settings
+from openai import APIConnectionError, APIStatusError, DefaultHttpxClient, OpenAI
+
+logger = logging.getLogger(__name__)
+
+# Timeout (segundos) por tipo de tarea; las no listadas usan OPENAI_TIMEOUT_SECONDS
+TASK_TIMEOUTS = {
+    "cv_parse": 60,
+    "cv_score": 45,
+    "cv_parse_and_score": 90,
+    "meeting_analysis": 90,
+    "transcription": 300,
+    "quiz_generation": 120,
+    "coding_generation": 120,
+    "code_evaluation": 60,
+    "code_quality": 30,
+    "application_analysis": 60,
+}
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class OpenAIBusyError(RuntimeError):
+    """No se liberó un cupo del semáforo dentro del tiempo de espera"""
+
+
+_client = None
+_client_lock = threading.Lock()
+_semaphore = None
+_metrics_lock = threading.Lock()
+_recent_calls = deque(maxlen=500)
+_totals = {}
+
+
+def get_client():
+    """Cliente único del proceso (se crea en el primer uso)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    ),
+                )
+                # Los reintentos se manejan aquí (con jitter), no en el SDK
+                _client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    http_client=http_client,
+                    max_retries=0,
+                    timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                )
+    return _client
+
+
+def _get_semaphore():
+    global _semaphore
+    if _semaphore is None:
+        with _client_lock:
+            if _semaphore is None:
+                _semaphore = threading.BoundedSemaphore(settings.OPENAI_MAX_CONCURRENCY)
+    return _semaphore
+
+
+def task_timeout(task):
+    return TASK_TIMEOUTS.get(task, settings.OPENAI_TIMEOUT_SECONDS)
+
+
+def is_retryable(error):
+    if isinstance(error, APIConnectionError):  # incluye APITimeoutError
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def backoff_delay(attempt):
+    """Full jitter: aleatorio entre 0 y base * 2^intento (con tope)"""
+    cap = min(settings.OPENAI_RETRY_MAX_DELAY, settings.OPENAI_RETRY_BASE_DELAY * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+def _token_count(usage, field):
+    value = getattr(usage, field, 0)
+    return value if isinstance(value, int) else 0
+
+
+def _record(task, model, started, attempts, outcome, response=None, metrics=None):
+    usage = getattr(response, "usage", None)
+    entry = {
+        "task": task,
+        "model": model,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "prompt_tokens": _token_count(usage, "prompt_tokens"),
+        "completion_tokens": _token_count(usage, "completion_tokens"),
+        "attempts": attempts,
+        "outcome": outcome,
+    }
+    with _metrics_lock:
+        _recent_calls.append(entry)
+        totals = _totals.setdefault(task, {
+            "calls": 0, "errors": 0, "retries": 0, "latency_ms": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0,
+        })
+        totals["calls"] += 1
+        totals["errors"] += outcome != "ok"
+        totals["retries"] += attempts - 1
+        totals["latency_ms"] += entry["latency_ms"]
+        totals["prompt_tokens"] += entry["prompt_tokens"]
+        totals["completion_tokens"] += entry["completion_tokens"]
+
+    if metrics is not None:
+        metrics.append(entry)
+    logger.info(
+        f"🤖 OpenAI {task} ({model}): {outcome} en {entry['latency_ms']}ms, "
+        f"{entry['prompt_tokens']}+{entry['completion_tokens']} tokens, {attempts} intento(s)"
+    )
+    return entry
+
+
+def _call(task, model, operation, metrics=None):
+    """Ejecuta `operation(client, timeout)` con semáforo, reintentos y métricas"""
+    semaphore = _get_semaphore()
+    if not semaphore.acquire(timeout=settings.OPENAI_QUEUE_TIMEOUT_SECONDS):
+        raise OpenAIBusyError(f"Demasiadas llamadas simultáneas a OpenAI ({task})")
+
+    started = time.perf_counter()
+    attempts = 0
+    try:
+        while True:
+            attempts += 1
+            try:
+                response = operation(get_client(), task_timeout(task))
+            except Exception as e:
+                if attempts <= settings.OPENAI_MAX_RETRIES and is_retryable(e):
+                    delay = backoff_delay(attempts - 1)
+                    logger.warning(f"⚠️ OpenAI {task} falló (intento {attempts}), reintento en {delay:.2f}s: {e}")
+                    time.sleep(delay)
+                    continue
+                _record(task, model, started, attempts, type(e).__name__, metrics=metrics)
+                raise
+            _record(task, model, started, attempts, "ok", response, metrics=metrics)
+            return response
+    finally:
+        semaphore.release()
+
+
+def chat_completion(task, metrics=None, **kwargs):
+    """client.chat.completions.create instrumentado. `metrics` (lista) recibe el registro de la llamada."""
+    return _call(
+        task,
+        kwargs.get("model", ""),
+        lambda client, timeout: client.chat.completions.create(timeout=timeout, **kwargs),
+        metrics=metrics,
+    )
+
+
+def transcription(task, metrics=None, **kwargs):
+    """client.audio.transcriptions.create instrumentado"""
+    return _call(
+        task,
+        kwargs.get("model", ""),
+        lambda client, timeout: client.audio.transcriptions.create(timeout=timeout, **kwargs),
+        metrics=metrics,
+    )
+
+
+def metrics_snapshot():
+    """Totales por tarea y últimas llamadas de este proceso"""
+    with _metrics_lock:
+        return {
+            "totals": {task: dict(values) for task, values in _totals.items()},
+            "recent": list(_recent_calls),
+        }
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _recent_calls.clear()
+        _totals.clear()
@@ -0,0 +1,41 @@
+"""
+Paginación por cursor (keyset) para los endpoints de listado.
+
+Es opt-in para no romper el frontend actual: sin `cursor` ni `page_size` en
+el query string la respuesta sigue siendo la lista completa. Con
+`?page_size=50` la respuesta pasa a ser {"next", "previous", "results"} y
+se sigue con el link `next`.
+
+La posición se toma del primer campo del orden (WHERE created_at < ...), que
+tiene índice en cada modelo, así que una página profunda cuesta lo mismo
+que la primera. Cada ViewSet puede fijar su orden con `cursor_ordering`.
+El primer campo tiene que ser (casi) único: las filas que lo repiten se
+saltean con OFFSET, y DRF deja de paginar si pasan de 1000.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    page_size_query_param = "page_size"
+    default_ordering = ("-id",)
+
+    def __init__(self):
+        # Se instancia por request: toma los valores actuales de settings
+        self.page_size = settings.PAGINATION_PAGE_SIZE
+        self.max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None  # lista completa, como antes
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        """`cursor_ordering` del ViewSet, o el orden del modelo con id como desempate"""
+        ordering = getattr(view, "cursor_ordering", None)
+        if ordering is None:
+            ordering = tuple(queryset.query.order_by) or tuple(queryset.model._meta.ordering) or self.default_ordering
+            if not any(field.lstrip("-") in ("id", "pk") for field in ordering):
+                ordering += ("-id" if ordering[0].startswith("-") else "id",)
+        return tuple(ordering)
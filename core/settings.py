@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from datetime import timedelta
 from decouple import config, Csv
@@ -26,11 +27,13 @@ INSTALLED_APPS = [
     'projects',
     'recruiting',
     'assessments',
+    'notifications',
 ]
 
 # --- Middleware ---
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # 🔸 Habilita comunicación React ↔ Django
+    'core.middleware.RequestMetricsMiddleware',  # 🔸 Consultas SQL y latencia por endpoint
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # 🔸 Sirve archivos estáticos en producción
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -41,6 +44,24 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Instrumentación por request (core/middleware.py)
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=True, cast=bool)
+# Loguea el SQL de cada request (solo para depurar)
+REQUEST_METRICS_LOG_QUERIES = config('REQUEST_METRICS_LOG_QUERIES', default=False, cast=bool)
+# Máximo de consultas por endpoint: "MÉTODO ruta" o solo la ruta (cualquier
+# método); los que no están usan el default
+QUERY_BUDGET_DEFAULT = config('QUERY_BUDGET_DEFAULT', default=30, cast=int)
+QUERY_BUDGETS = {
+    'GET answer-list': 10,
+    'GET assessment-list': 10,
+    'GET assessment-detail': 10,
+    'GET application-list': 10,
+    'GET project-list': 10,
+    'GET user-list': 10,
+    'POST assessment-evaluate-quiz': 20,
+    'POST assessment-generate-questions': 20,
+}
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -102,7 +123,11 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Opt-in: solo pagina si el request trae ?page_size= o ?cursor= (core/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.OptInCursorPagination',
 }
+PAGINATION_PAGE_SIZE = config('PAGINATION_PAGE_SIZE', default=50, cast=int)
+PAGINATION_MAX_PAGE_SIZE = config('PAGINATION_MAX_PAGE_SIZE', default=200, cast=int)
 
 # --- Configuración JWT ---
 SIMPLE_JWT = {
@@ -112,12 +137,100 @@ SIMPLE_JWT = {
 
 # --- OpenAI Configuration ---
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
+# Cliente compartido (core/openai_client.py)
+OPENAI_TIMEOUT_SECONDS = config('OPENAI_TIMEOUT_SECONDS', default=60, cast=float)
+OPENAI_MAX_RETRIES = config('OPENAI_MAX_RETRIES', default=2, cast=int)
+OPENAI_RETRY_BASE_DELAY = config('OPENAI_RETRY_BASE_DELAY', default=0.5, cast=float)
+OPENAI_RETRY_MAX_DELAY = config('OPENAI_RETRY_MAX_DELAY', default=8.0, cast=float)
+OPENAI_MAX_CONCURRENCY = config('OPENAI_MAX_CONCURRENCY', default=8, cast=int)
+OPENAI_QUEUE_TIMEOUT_SECONDS = config('OPENAI_QUEUE_TIMEOUT_SECONDS', default=120, cast=float)
+OPENAI_MAX_CONNECTIONS = config('OPENAI_MAX_CONNECTIONS', default=20, cast=int)
+# Generación de quizzes en tandas paralelas (0 = una sola llamada)
+QUIZ_GENERATION_CHUNK_SIZE = config('QUIZ_GENERATION_CHUNK_SIZE', default=5, cast=int)
+QUIZ_GENERATION_MAX_PARALLEL = config('QUIZ_GENERATION_MAX_PARALLEL', default=4, cast=int)
+QUIZ_GENERATION_TOPUP_ROUNDS = config('QUIZ_GENERATION_TOPUP_ROUNDS', default=2, cast=int)
+# Banco de preguntas pre-generadas (assessments/question_bank.py)
+QUESTION_BANK_ENABLED = config('QUESTION_BANK_ENABLED', default=True, cast=bool)
+QUESTION_BANK_MIN_AVAILABLE = config('QUESTION_BANK_MIN_AVAILABLE', default=10, cast=int)
+QUESTION_BANK_REFILL_SIZE = config('QUESTION_BANK_REFILL_SIZE', default=20, cast=int)
+QUESTION_BANK_CODING_REFILL_SIZE = config('QUESTION_BANK_CODING_REFILL_SIZE', default=3, cast=int)
+# Un refill RUNNING más viejo que esto quedó de un worker muerto y se retoma
+QUESTION_BANK_REFILL_LOCK_TIMEOUT_SECONDS = config('QUESTION_BANK_REFILL_LOCK_TIMEOUT_SECONDS', default=900, cast=int)
+# Jaccard estimado (MinHash) desde el que dos preguntas son casi duplicadas; > 1 desactiva el filtro
+QUESTION_SIMILARITY_THRESHOLD = config('QUESTION_SIMILARITY_THRESHOLD', default=0.8, cast=float)
+
+# --- Procesamiento asíncrono de CVs (python manage.py process_cv_jobs) ---
+CV_PIPELINE_MAX_ATTEMPTS = config('CV_PIPELINE_MAX_ATTEMPTS', default=3, cast=int)
+CV_PIPELINE_RETRY_DELAY_SECONDS = config('CV_PIPELINE_RETRY_DELAY_SECONDS', default=30, cast=int)
+CV_PIPELINE_LOCK_TIMEOUT_SECONDS = config('CV_PIPELINE_LOCK_TIMEOUT_SECONDS', default=600, cast=int)
+# Extraer y calificar el CV en una sola llamada a OpenAI (con fallback a dos llamadas)
+CV_COMBINED_LLM_CALL = config('CV_COMBINED_LLM_CALL', default=False, cast=bool)
+
+# Cache del parsing de CVs con IA (LRU + TTL en base de datos)
+CV_PARSE_CACHE_ENABLED = config('CV_PARSE_CACHE_ENABLED', default=True, cast=bool)
+CV_PARSE_CACHE_TTL_DAYS = config('CV_PARSE_CACHE_TTL_DAYS', default=30, cast=int)
+CV_PARSE_CACHE_MAX_ENTRIES = config('CV_PARSE_CACHE_MAX_ENTRIES', default=5000, cast=int)
+
+# Re-scoring masivo de aplicaciones (python manage.py rescore_applications)
+RESCORING_CHUNK_SIZE = config('RESCORING_CHUNK_SIZE', default=250, cast=int)
+RESCORING_WORKERS = config('RESCORING_WORKERS', default=2, cast=int)
+
+# --- Ejecución de código de candidatos (assessments/sandbox) ---
+# 'piston' (API externa), 'warm' (pool de intérpretes Python pre-iniciados) o 'local'
+# (subproceso aislado); lo que el backend no soporte va al subproceso local y luego a Piston.
+# 'warm' y 'local' ejecutan código de terceros en este host: requieren el aislamiento de abajo
+CODE_EXECUTION_BACKEND = config('CODE_EXECUTION_BACKEND', default='piston')
+CODE_EXECUTION_TIMEOUT_SECONDS = config('CODE_EXECUTION_TIMEOUT_SECONDS', default=5, cast=int)
+CODE_EXECUTION_CPU_SECONDS = config('CODE_EXECUTION_CPU_SECONDS', default=3, cast=int)
+CODE_EXECUTION_MEMORY_MB = config('CODE_EXECUTION_MEMORY_MB', default=256, cast=int)
+# Aislamiento de 'local' / 'warm' (sandbox/launcher.py, el proceso debe correr como root):
+# sin red, sin ver estas rutas, /tmp privado y como un usuario sin privilegios con un tope
+# de procesos + threads (compartido por todas las corridas simultáneas)
+CODE_EXECUTION_SANDBOX_USER = config('CODE_EXECUTION_SANDBOX_USER', default='nobody')
+CODE_EXECUTION_MAX_PROCESSES = config('CODE_EXECUTION_MAX_PROCESSES', default=64, cast=int)
+CODE_EXECUTION_HIDDEN_PATHS = config('CODE_EXECUTION_HIDDEN_PATHS', default=f'{BASE_DIR},{MEDIA_ROOT}', cast=Csv())
+# Si no se puede aislar (sin root, Windows) no se ejecuta nada; False solo para desarrollo
+CODE_EXECUTION_REQUIRE_ISOLATION = config('CODE_EXECUTION_REQUIRE_ISOLATION', default=True, cast=bool)
+# Todos los test cases de una pregunta en una sola ejecución (Python / JavaScript)
+CODE_EXECUTION_SINGLE_LAUNCH = config('CODE_EXECUTION_SINGLE_LAUNCH', default=True, cast=bool)
+CODE_EXECUTION_CASE_TIMEOUT_SECONDS = config('CODE_EXECUTION_CASE_TIMEOUT_SECONDS', default=2, cast=float)
+# Cupos compartidos por todos los procesos del host (assessments/sandbox/host_slots.py):
+# corridas simultáneas en el host y directorio de los locks (vacío: <tmp>/code_execution_slots)
+CODE_EXECUTION_HOST_SLOTS = config('CODE_EXECUTION_HOST_SLOTS', default=os.cpu_count() or 2, cast=int)
+CODE_EXECUTION_SLOTS_DIR = config('CODE_EXECUTION_SLOTS_DIR', default='')
+# Scheduler (uno por proceso): threads que ejecutan y cola justa por candidato.
+# MAX_PER_CANDIDATE también se aplica entre procesos con los cupos del host
+CODE_EXECUTION_WORKERS = config('CODE_EXECUTION_WORKERS', default=CODE_EXECUTION_HOST_SLOTS, cast=int)
+CODE_EXECUTION_MAX_QUEUE = config('CODE_EXECUTION_MAX_QUEUE', default=200, cast=int)
+CODE_EXECUTION_MAX_PER_CANDIDATE = config('CODE_EXECUTION_MAX_PER_CANDIDATE', default=1, cast=int)
+CODE_EXECUTION_RUN_BUDGET_SECONDS = config('CODE_EXECUTION_RUN_BUDGET_SECONDS', default=30, cast=int)
+CODE_EXECUTION_QUEUE_TIMEOUT_SECONDS = config('CODE_EXECUTION_QUEUE_TIMEOUT_SECONDS', default=60, cast=int)
+# Pool warm: intérpretes ya iniciados, uno por corrida (el doble de los workers
+# del scheduler: mientras unos corren, los reemplazos se inician en segundo plano).
+# MAX_RUNS > 1 reutiliza el intérprete entre candidatos: solo para código confiable
+CODE_EXECUTION_WARM_POOL_SIZE = config('CODE_EXECUTION_WARM_POOL_SIZE', default=CODE_EXECUTION_WORKERS * 2, cast=int)
+CODE_EXECUTION_WARM_MAX_RUNS = config('CODE_EXECUTION_WARM_MAX_RUNS', default=1, cast=int)
+# Cache de resultados por (lenguaje, código, input): LRU en memoria + tabla ExecutionCacheEntry
+CODE_EXECUTION_CACHE_ENABLED = config('CODE_EXECUTION_CACHE_ENABLED', default=True, cast=bool)
+CODE_EXECUTION_CACHE_SIZE = config('CODE_EXECUTION_CACHE_SIZE', default=5000, cast=int)
+CODE_EXECUTION_CACHE_TTL_DAYS = config('CODE_EXECUTION_CACHE_TTL_DAYS', default=30, cast=int)
+CODE_EXECUTION_CACHE_MAX_ROWS = config('CODE_EXECUTION_CACHE_MAX_ROWS', default=200000, cast=int)
+PISTON_API_URL = config('PISTON_API_URL', default='https://emkc.org/api/v2/piston/execute')
 
 # --- Resend Email Configuration ---
 RESEND_API_KEY = config('RESEND_API_KEY', default='')
 FROM_EMAIL = config('FROM_EMAIL', default='onboarding@resend.dev')
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:5173')
 
+# Outbox de emails (python manage.py send_outbox_emails)
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY_SECONDS = config('EMAIL_OUTBOX_RETRY_DELAY_SECONDS', default=60, cast=int)
+EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS = config('EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS', default=300, cast=int)
+# Rate limit de Resend compartido por todos los workers (requests por segundo)
+RESEND_RATE_LIMIT_PER_SECOND = config('RESEND_RATE_LIMIT_PER_SECOND', default=2.0, cast=float)
+RESEND_RATE_LIMIT_BURST = config('RESEND_RATE_LIMIT_BURST', default=2.0, cast=float)
+
 # --- CORS (para React frontend) ---
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -0,0 +1,442 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from unittest.mock import patch, MagicMock
+import httpx
+import json
+import re
+import threading
+import time
+from openai import APIConnectionError
+
+from . import middleware, openai_client
+
+
+@override_settings(OPENAI_MAX_RETRIES=2, OPENAI_RETRY_BASE_DELAY=0, OPENAI_RETRY_MAX_DELAY=0)
+class OpenAIClientTestCase(SimpleTestCase):
+    """Tests para el cliente OpenAI compartido"""
+
+    def setUp(self):
+        openai_client.reset_metrics()
+
+    @patch('core.openai_client._client')
+    def test_retries_transient_errors_and_records_metrics(self, mock_client):
+        """Test: Reintenta errores de conexión y registra latencia, tokens y resultado"""
+        response = MagicMock()
+        response.usage.prompt_tokens = 120
+        response.usage.completion_tokens = 30
+        mock_client.chat.completions.create.side_effect = [
+            APIConnectionError(request=httpx.Request("POST", "https://api.openai.com")),
+            response,
+        ]
+
+        calls = []
+        result = openai_client.chat_completion("cv_parse", metrics=calls, model="gpt-4o-mini", messages=[])
+
+        self.assertIs(result, response)
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+        # Timeout por tarea en cada llamada
+        self.assertEqual(mock_client.chat.completions.create.call_args.kwargs["timeout"], 60)
+        self.assertEqual(calls[0]["attempts"], 2)
+        self.assertEqual(calls[0]["outcome"], "ok")
+        self.assertEqual(calls[0]["prompt_tokens"], 120)
+
+        totals = openai_client.metrics_snapshot()["totals"]["cv_parse"]
+        self.assertEqual((totals["calls"], totals["retries"], totals["errors"]), (1, 1, 0))
+
+    @patch('core.openai_client._client')
+    def test_non_retryable_errors_fail_fast(self, mock_client):
+        """Test: Errores no transitorios no se reintentan y quedan registrados"""
+        mock_client.chat.completions.create.side_effect = ValueError("payload inválido")
+
+        with self.assertRaises(ValueError):
+            openai_client.chat_completion("cv_score", model="gpt-4o-mini", messages=[])
+
+        self.assertEqual(mock_client.chat.completions.create.call_count, 1)
+        self.assertEqual(openai_client.metrics_snapshot()["recent"][-1]["outcome"], "ValueError")
+
+
+class RequestMetricsMiddlewareTestCase(APITestCase):
+    """Tests para la instrumentación de consultas y latencia por endpoint"""
+
+    def setUp(self):
+        middleware.reset_metrics()
+        self.admin = User.objects.create_superuser(username='metrics_admin', password='test123', email='m@test.com')
+        self.client.force_authenticate(user=self.admin)
+
+    def test_server_timing_header_and_staff_endpoint(self):
+        """Test: Cada respuesta lleva Server-Timing y el endpoint agrega por ruta"""
+        response = self.client.get('/api/assessments/answers/')
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$')
+
+        metrics = self.client.get('/api/metrics/requests/').json()
+        totals = metrics["totals"]["GET answer-list"]
+        self.assertEqual(totals["requests"], 1)
+        self.assertEqual(totals["budget"], 10)
+        self.assertEqual(metrics["recent"][-1]["endpoint"], "answer-list")
+
+        self.client.force_authenticate(user=User.objects.create_user(username='metrics_user', password='test123'))
+        self.assertEqual(self.client.get('/api/metrics/requests/').status_code, 403)
+
+    @override_settings(QUERY_BUDGETS={'answer-list': 0})
+    def test_budget_violations_are_logged(self):
+        """Test: Superar el presupuesto de consultas deja un warning y se cuenta"""
+        with self.assertLogs('core.middleware', level='WARNING') as logs:
+            self.client.get('/api/assessments/answers/')
+        self.assertIn("answer-list", logs.output[0])
+        self.assertEqual(middleware.metrics_snapshot()["totals"]["GET answer-list"]["budget_violations"], 1)
+
+    def test_budgets_are_per_method(self):
+        """Test: El POST de un listado no se mide con el presupuesto del GET"""
+        from projects.models import Project
+        project = Project.objects.create(title="Proyecto", description="Desc", required_skills=["python"])
+        self.client.force_authenticate(user=User.objects.create_user(username='metrics_candidate', password='test123'))
+        with self.assertNoLogs('core.middleware', level='WARNING'):
+            response = self.client.post('/api/recruiting/applications/', {"project": project.id}, format='json')
+        self.assertEqual(response.status_code, 202)
+
+        self.client.force_authenticate(user=self.admin)
+        totals = self.client.get('/api/metrics/requests/').json()["totals"]
+        self.assertGreater(totals["POST application-list"]["queries"], settings.QUERY_BUDGETS["GET application-list"])
+        self.assertEqual(totals["POST application-list"]["budget"], settings.QUERY_BUDGET_DEFAULT)
+        self.assertEqual(totals["POST application-list"]["budget_violations"], 0)
+
+    def test_unresolved_paths_share_one_bucket(self):
+        """Test: Los 404 y los métodos desconocidos no crean una entrada nueva cada uno"""
+        for i in range(3):
+            self.assertEqual(self.client.get(f'/api/no-existe-{i}/').status_code, 404)
+        self.client.generic('PROPFIND', '/api/assessments/answers/')
+
+        totals = middleware.metrics_snapshot()["totals"]
+        self.assertEqual(totals["GET unresolved"]["requests"], 3)
+        self.assertEqual(totals["OTHER answer-list"]["requests"], 1)
+        self.assertFalse(any("no-existe" in key for key in totals))
+
+
+@override_settings(REQUEST_METRICS_ENABLED=False, QUESTION_BANK_ENABLED=False, OPENAI_API_KEY='test')
+class EndpointQueryBudgetTestCase(APITestCase):
+    """
+    Presupuesto de consultas y tiempo de respuesta por endpoint con un volumen
+    de datos realista. Un N+1 (una consulta por fila) supera el presupuesto
+    por varias decenas; OpenAI y Resend están simulados.
+    """
+
+    CANDIDATES = 24
+    QUESTIONS_PER_QUIZ = 10
+    MAX_RESPONSE_SECONDS = 2.0
+    # Temas de las preguntas que "genera" OpenAI (textos distintos entre sí)
+    QUIZ_TOPICS = [
+        "decoradores", "generadores", "context managers", "metaclases", "el GIL", "asyncio",
+        "dataclasses", "descriptores", "__slots__", "el garbage collector", "type hints", "functools.lru_cache",
+    ]
+    APPLICATION_ANALYSIS = {
+        "suggested_title": "Evaluación Python backend", "suggested_description": "Django y APIs REST",
+        "suggested_type": "QUIZ", "suggested_difficulty": "MEDIUM", "suggested_time_minutes": 45,
+        "suggested_passing_score": 70, "suggested_num_questions": 10, "suggested_programming_language": "python",
+        "difficulty_reason": "Match intermedio", "time_reason": "10 preguntas", "score_reason": "Estándar",
+        "type_reason": "Conceptos", "detected_skills": ["python", "django"],
+        "candidate_experience_level": "intermediate", "project_complexity": "medium",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        from assessments.models import Assessment, CandidateAnswer, Question
+        from projects.models import Meeting, Project
+        from recruiting.models import Application
+        from recruiting.scoring import rebuild_score_summaries
+
+        cls.admin = User.objects.create_superuser(username='budget_admin', password='test123', email='budget@test.com')
+        cls.projects = [
+            Project.objects.create(title=f"Proyecto {i}", description="Proyecto de carga", required_skills=["python", "django"])
+            for i in range(3)
+        ]
+        Meeting.objects.bulk_create([
+            Meeting(title=f"Reunión {i}", date=timezone.now(), created_by=cls.admin, project=cls.projects[i % 3])
+            for i in range(6)
+        ])
+        cls.candidates = [
+            User.objects.create_user(username=f'budget_{i}', password='test123', email=f'budget_{i}@test.com')
+            for i in range(cls.CANDIDATES)
+        ]
+        statuses = ["SUBMITTED", "REVIEW", "APPROVED", "REJECTED"]
+        for i, candidate in enumerate(cls.candidates):
+            project = cls.projects[i % 3]
+            Application.objects.create(candidate=candidate, project=project, match_score=50 + i, status=statuses[i % 4])
+
+            quiz = Assessment.objects.create(
+                candidate=candidate, project=project, assessment_type="QUIZ", title=f"Quiz {i}",
+                status="EVALUATED", score=60 + i,
+            )
+            questions = Question.objects.bulk_create([
+                Question(
+                    assessment=quiz, question_type="MULTIPLE_CHOICE", order=n, points=10,
+                    question_text=f"Pregunta {n} del quiz {i}", options=["a", "b", "c", "d"], correct_answer="1",
+                )
+                for n in range(cls.QUESTIONS_PER_QUIZ)
+            ])
+            CandidateAnswer.objects.bulk_create([
+                CandidateAnswer(question=question, candidate=candidate, answer_text=str(n % 4), points_earned=10 * (n % 2))
+                for n, question in enumerate(questions)
+            ])
+            coding = Assessment.objects.create(
+                candidate=candidate, project=project, assessment_type="CODING", title=f"Código {i}", status="COMPLETED",
+            )
+            Question.objects.create(
+                assessment=coding, question_type="CODE", question_text="Suma los pares", programming_language="python",
+                test_cases=[{"input": "[[1, 2]]", "expected_output": "2"}], points=20,
+            )
+        rebuild_score_summaries()
+
+        cls.candidate = cls.candidates[0]
+        cls.quiz = cls.candidate.assessments.get(assessment_type="QUIZ")
+        cls.coding = cls.candidate.assessments.get(assessment_type="CODING")
+        cls.application = cls.candidate.application_set.get()
+        cls.answer = cls.quiz.questions.first().candidate_answers.get()
+
+    def setUp(self):
+        # OpenAI y Resend simulados para todo el suite
+        self.generated = 0
+        self.generated_lock = threading.Lock()  # los chunks del quiz llaman en paralelo
+        openai_patch = patch('core.openai_client.get_client')
+        self.addCleanup(openai_patch.stop)
+        openai_patch.start().return_value.chat.completions.create.side_effect = self.fake_completion
+        for target in ('resend.Emails.send', 'resend.Batch.send'):
+            resend_patch = patch(target, return_value={"id": "stub"})
+            self.addCleanup(resend_patch.stop)
+            resend_patch.start()
+
+    def fake_completion(self, messages, **kwargs):
+        """Respuesta de OpenAI según el pedido: N preguntas distintas, análisis de aplicación u otra"""
+        system = messages[0]["content"]
+        requested = re.search(r"EXACTAMENTE (\d+) preguntas", system)
+        if requested:
+            with self.generated_lock:
+                topics = self.QUIZ_TOPICS[self.generated:self.generated + int(requested.group(1))]
+                self.generated += len(topics)
+            content = {"questions": [
+                {"question_text": f"¿Qué problema resuelve {topic} en Python? Explica un caso de uso concreto.",
+                 "options": ["a", "b", "c", "d"], "correct_answer": "1", "explanation": "..."}
+                for topic in topics
+            ]}
+        elif "recursos humanos" in system:
+            content = self.APPLICATION_ANALYSIS
+        else:
+            content = {"questions": [], "challenges": []}
+        completion = MagicMock()
+        completion.choices[0].message.content = json.dumps(content)
+        return completion
+
+    def assertWithinBudget(self, user, method, url, max_queries, data=None, expected_status=None):
+        self.client.force_authenticate(user=user)
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+        elapsed = time.perf_counter() - started
+        with self.subTest(url=url, method=method):
+            if expected_status is not None:
+                self.assertEqual(response.status_code, expected_status)
+            else:
+                self.assertLess(response.status_code, 400, response.content[:200])
+            self.assertLessEqual(
+                len(queries), max_queries,
+                f"{method.upper()} {url}: {len(queries)} consultas\n" + "\n".join(q["sql"] for q in queries)
+            )
+            self.assertLess(elapsed, self.MAX_RESPONSE_SECONDS)
+        return response
+
+    def test_accounts_endpoints(self):
+        """Test: accounts (usuarios, perfil)"""
+        self.assertWithinBudget(self.admin, 'get', '/api/accounts/users/', 2)
+        self.assertWithinBudget(self.admin, 'get', f'/api/accounts/users/{self.candidate.id}/', 2)
+        self.assertWithinBudget(self.candidate, 'get', '/api/accounts/me/', 1)
+        self.assertWithinBudget(self.candidate, 'patch', '/api/accounts/me/update/', 2, {"first_name": "Ana"})
+
+    def test_projects_endpoints(self):
+        """Test: projects (listado, detalle, re-scoring, reuniones)"""
+        project = self.projects[0]
+        self.assertWithinBudget(self.admin, 'get', '/api/projects/', 2)
+        self.assertWithinBudget(self.admin, 'get', f'/api/projects/{project.id}/', 2)
+        self.assertWithinBudget(self.admin, 'post', f'/api/projects/{project.id}/rescore/', 4, expected_status=202)
+        self.assertWithinBudget(self.admin, 'get', f'/api/projects/{project.id}/rescore/', 3)
+        self.assertWithinBudget(self.admin, 'get', '/api/projects/meetings/', 2)
+
+    def test_recruiting_endpoints(self):
+        """Test: recruiting (aplicaciones, dashboard, acciones)"""
+        self.assertWithinBudget(self.admin, 'get', '/api/recruiting/applications/', 2)
+        self.assertWithinBudget(self.candidate, 'get', '/api/recruiting/applications/', 2)
+        self.assertWithinBudget(self.admin, 'get', f'/api/recruiting/applications/{self.application.id}/', 2)
+        self.assertWithinBudget(self.admin, 'get', f'/api/recruiting/applications/{self.application.id}/processing/', 3)
+        self.assertWithinBudget(self.admin, 'get', '/api/recruiting/applications/stats/', 7)
+        self.assertWithinBudget(self.admin, 'get', '/api/recruiting/dashboard-stats/', 7)
+        self.assertWithinBudget(
+            self.admin, 'patch', f'/api/recruiting/applications/{self.application.id}/update_status/', 10, {"status": "REVIEW"}
+        )
+        self.assertWithinBudget(
+            self.admin, 'post', f'/api/recruiting/applications/{self.application.id}/notify-admins/', 7, expected_status=202
+        )
+        newcomer = User.objects.create_user(username='budget_new', password='test123', email='budget_new@test.com')
+        self.assertWithinBudget(
+            newcomer, 'post', '/api/recruiting/applications/', 16, {"project": self.projects[0].id}, expected_status=202
+        )
+
+    def test_assessments_read_endpoints(self):
+        """Test: assessments (listados y detalles)"""
+        self.assertWithinBudget(self.admin, 'get', '/api/assessments/assessments/', 1)
+        self.assertWithinBudget(self.candidate, 'get', '/api/assessments/assessments/', 1)
+        self.assertWithinBudget(self.admin, 'get', f'/api/assessments/assessments/{self.quiz.id}/', 3)
+        self.assertWithinBudget(self.admin, 'get', '/api/assessments/questions/', 2)
+        self.assertWithinBudget(self.admin, 'get', f'/api/assessments/questions/?assessment={self.quiz.id}', 2)
+        self.assertWithinBudget(self.admin, 'get', f'/api/assessments/questions/{self.answer.question_id}/', 2)
+        self.assertWithinBudget(self.admin, 'get', '/api/assessments/answers/', 2)
+        self.assertWithinBudget(self.candidate, 'get', f'/api/assessments/answers/?assessment={self.quiz.id}', 2)
+        self.assertWithinBudget(self.admin, 'get', '/api/assessments/answers/?sideload=questions', 2)
+        self.assertWithinBudget(self.admin, 'get', f'/api/assessments/answers/{self.answer.id}/', 2)
+        self.assertWithinBudget(self.admin, 'get', '/api/assessments/answers/execution-metrics/', 1)
+
+    def test_assessments_action_endpoints(self):
+        """Test: assessments (acciones sobre pruebas y respuestas)"""
+        self.assertWithinBudget(self.candidate, 'post', f'/api/assessments/assessments/{self.quiz.id}/evaluate_quiz/', 16)
+        self.assertWithinBudget(self.candidate, 'post', f'/api/assessments/assessments/{self.quiz.id}/submit/', 16)
+        self.assertWithinBudget(
+            self.candidate, 'post', f'/api/assessments/assessments/{self.quiz.id}/notify-completed/', 8,
+            expected_status=202,
+        )
+        self.assertWithinBudget(
+            self.admin, 'post', f'/api/assessments/assessments/{self.quiz.id}/send-invitation/', 8,
+            {"user_ids": [c.id for c in self.candidates]}, expected_status=202,
+        )
+        self.assertWithinBudget(
+            self.admin, 'post', f'/api/assessments/assessments/{self.coding.id}/generate_questions/', 5,
+            {"topic": "Python"}, expected_status=201,
+        )
+        self.assertWithinBudget(
+            self.admin, 'post', f'/api/assessments/assessments/{self.quiz.id}/generate_questions/', 8,
+            {"topic": "Python", "num_questions": 10}, expected_status=201,
+        )
+        self.assertEqual(self.quiz.questions.filter(generated_by_ai=True).count(), 10)
+        response = self.assertWithinBudget(
+            self.admin, 'post', '/api/assessments/assessments/analyze-application/', 2, {"application_id": self.application.id},
+            expected_status=200,
+        )
+        self.assertEqual(response.data["suggested_num_questions"], 10)
+        self.assertNotIn("fallback_used", response.data)
+        self.assertWithinBudget(
+            self.admin, 'post', f'/api/assessments/analyze-application/{self.application.id}/', 2, expected_status=200,
+        )
+
+    def test_assessments_start_and_code_evaluation_endpoints(self):
+        """Test: assessments (iniciar una prueba y evaluar código con IA y con el sandbox)"""
+        from assessments.models import Assessment, CandidateAnswer
+        from assessments.sandbox.cache import clear_memory_cache
+
+        pending = Assessment.objects.create(
+            candidate=self.candidate, project=self.application.project, assessment_type="QUIZ", title="Pendiente",
+        )
+        self.assertWithinBudget(self.candidate, 'post', f'/api/assessments/assessments/{pending.id}/start/', 10)
+
+        answer = CandidateAnswer.objects.create(
+            question=self.coding.questions.get(), candidate=self.candidate, code_answer="def solution(arr):\n    return 2",
+        )
+        self.assertWithinBudget(self.admin, 'post', f'/api/assessments/answers/{answer.id}/evaluate_code/', 10)
+
+        clear_memory_cache()
+        results = [{"test_case": "Test 1", "input": "[[1, 2]]", "expected_output": "2", "actual_output": "2",
+                    "passed": True, "execution_time_ms": 1.0, "error": None}]
+        with patch('assessments.views.get_scheduler') as scheduler:
+            scheduler.return_value.run.return_value = (results, 1)
+            self.assertWithinBudget(
+                self.candidate, 'post', f'/api/assessments/answers/{answer.id}/evaluate_code_sandbox/', 13,
+                {"use_backend_execution": True, "test_cases": [{"input": "[[1, 2]]", "expected_output": "2"}]},
+            )
+        self.assertWithinBudget(
+            self.candidate, 'post', f'/api/assessments/answers/{answer.id}/evaluate_code_sandbox/', 10,
+            {"test_results": results, "total_tests": 1, "passed_tests": 1, "sandbox_success": True},
+        )
+
+
+@override_settings(PAGINATION_PAGE_SIZE=4, PAGINATION_MAX_PAGE_SIZE=6)
+class CursorPaginationTestCase(APITestCase):
+    """Tests para la paginación por cursor opt-in"""
+
+    def setUp(self):
+        from assessments.models import Assessment
+        from projects.models import Project
+
+        self.admin = User.objects.create_superuser(username='page_admin', password='test123', email='page@test.com')
+        project = Project.objects.create(title="Proyecto Paginación")
+        self.assessments = [
+            Assessment.objects.create(candidate=self.admin, project=project, assessment_type="QUIZ", title=f"Prueba {i}")
+            for i in range(15)
+        ]
+        self.client.force_authenticate(user=self.admin)
+
+    def test_without_params_returns_full_list(self):
+        """Test: Sin cursor ni page_size la respuesta sigue siendo la lista completa"""
+        response = self.client.get('/api/assessments/assessments/')
+        self.assertIsInstance(response.json(), list)
+        self.assertEqual(len(response.json()), 15)
+
+    def test_pages_cover_all_rows_with_constant_queries(self):
+        """Test: Siguiendo `next` se recorren todas las filas una vez y cada página cuesta lo mismo"""
+        url = '/api/assessments/assessments/?page_size=100'  # se limita a PAGINATION_MAX_PAGE_SIZE
+        seen, query_counts = [], []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(url).json()
+            query_counts.append(len(queries))
+            self.assertLessEqual(len(data["results"]), 6)
+            seen += [row["id"] for row in data["results"]]
+            url = data["next"]
+
+        self.assertEqual(seen, [a.id for a in reversed(self.assessments)])
+        self.assertEqual(len(query_counts), 3)
+        self.assertEqual(len(set(query_counts[:-1])), 1)
+
+    def test_questions_of_one_assessment_page_without_offset(self):
+        """Test: Las preguntas de una misma prueba se paginan por id, sin OFFSET, en el orden de la lista completa"""
+        from assessments.models import Question
+
+        # Dos lotes generados: `order` se reinicia en 0 en el segundo
+        questions = Question.objects.bulk_create([
+            Question(assessment=self.assessments[0], question_type="SHORT_ANSWER", question_text=f"¿{i}?", order=i % 5)
+            for i in range(10)
+        ])
+        full_list = self.client.get(f'/api/assessments/questions/?assessment={self.assessments[0].id}').json()
+        url = f'/api/assessments/questions/?assessment={self.assessments[0].id}&page_size=4'
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(url).json()
+            self.assertFalse(any("OFFSET" in q["sql"] for q in queries))
+            seen += [row["id"] for row in data["results"]]
+            url = data["next"]
+
+        self.assertEqual(seen, sorted(q.id for q in questions))
+        self.assertEqual(seen, [row["id"] for row in full_list])
+
+    def test_every_list_endpoint_accepts_cursor(self):
+        """Test: Todos los listados aceptan page_size y devuelven next"""
+        from assessments.models import CandidateAnswer, Question
+
+        for assessment in self.assessments[:3]:
+            question = Question.objects.create(assessment=assessment, question_type="SHORT_ANSWER", question_text="¿?")
+            CandidateAnswer.objects.create(question=question, candidate=self.admin, answer_text="x")
+        for i in range(3):
+            User.objects.create_user(username=f'page_user_{i}', password='test123')
+
+        for url in [
+            '/api/accounts/users/', '/api/projects/', '/api/projects/meetings/', '/api/recruiting/applications/',
+            '/api/assessments/assessments/', '/api/assessments/questions/', '/api/assessments/answers/',
+        ]:
+            with self.subTest(url=url):
+                response = self.client.get(url, {"page_size": 2})
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("results", response.json())
+                self.assertLessEqual(len(response.json()["results"]), 2)
+                if response.json()["next"]:
+                    self.assertEqual(self.client.get(response.json()["next"]).status_code, 200)
@@ -9,6 +9,7 @@ from rest_framework_simplejwt.views import (
 from rest_framework.routers import DefaultRouter
 from projects.views import MeetingViewSet
 from accounts.views import EmailTokenObtainPairView  
+from core.views import RequestMetricsView
 
 router = DefaultRouter()
 router.register(r"meetings", MeetingViewSet, basename="meetings") 
@@ -27,6 +28,9 @@ urlpatterns = [
     path('api/projects/', include('projects.urls')),
     path('api/recruiting/', include('recruiting.urls')),
     path('api/assessments/', include('assessments.urls')),
+
+    # Métricas de consultas y latencia por endpoint (solo staff)
+    path('api/metrics/requests/', RequestMetricsView.as_view(), name='request-metrics'),
 ]
 
 # Servir archivos de medios tanto en desarrollo como en producción
@@ -0,0 +1,27 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import middleware
+
+
+class RequestMetricsView(APIView):
+    """
+    Consultas SQL y latencia por endpoint de este proceso (solo staff)
+    GET /api/metrics/requests/
+    DELETE /api/metrics/requests/  -> reinicia los contadores
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        snapshot = middleware.metrics_snapshot()
+        for key, totals in snapshot["totals"].items():
+            method, endpoint = key.split(" ", 1)
+            totals["budget"] = middleware.query_budget(endpoint, method)
+            totals["avg_queries"] = round(totals["queries"] / totals["requests"], 1)
+            totals["avg_total_ms"] = round(totals["total_ms"] / totals["requests"], 2)
+        return Response(snapshot)
+
+    def delete(self, request):
+        middleware.reset_metrics()
+        return Response(status=204)
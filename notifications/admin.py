@@ -0,0 +1,15 @@
+from django.contrib import admin
+from .models import EmailOutbox, RateLimitBucket
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ("id", "to_email", "subject", "category", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status", "category")
+    search_fields = ("to_email", "subject", "reference")
+    readonly_fields = ("batch_id", "provider_id", "last_error", "locked_at", "locked_by", "created_at", "sent_at")
+
+
+@admin.register(RateLimitBucket)
+class RateLimitBucketAdmin(admin.ModelAdmin):
+    list_display = ("name", "tokens", "updated_at")
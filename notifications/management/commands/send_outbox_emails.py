@@ -0,0 +1,34 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.models import EmailOutbox
+from notifications.outbox import process_outbox
+
+
+class Command(BaseCommand):
+    help = "Worker que envía los emails del outbox respetando el rate limit de Resend"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Envía los emails pendientes y termina")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Segundos de espera cuando el outbox está vacío")
+        parser.add_argument("--requeue-failed", action="store_true", help="Reencola los emails en estado FAILED antes de empezar")
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+
+        if options["requeue_failed"]:
+            count = EmailOutbox.objects.filter(status="FAILED").update(status="PENDING", attempts=0, last_error="")
+            self.stdout.write(f"🔁 {count} emails reencolados")
+
+        self.stdout.write(f"📧 Worker de emails iniciado ({worker})")
+        while True:
+            sent, failed = process_outbox(worker)
+            if sent or failed:
+                self.stdout.write(f"✅ {sent} enviados, {failed} con error")
+            if options["once"]:
+                break
+            if not sent and not failed:
+                time.sleep(options["sleep"])
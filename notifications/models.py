@@ -0,0 +1,59 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+
+class EmailOutbox(models.Model):
+    """
+    Email pendiente de envío. Los endpoints solo insertan filas aquí; el
+    worker (`python manage.py send_outbox_emails`) las envía por Resend.
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pendiente"),
+        ("SENDING", "Enviando"),
+        ("SENT", "Enviado"),
+        ("FAILED", "Fallido"),
+    ]
+
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    html = models.TextField()
+    # Origen del email, ej: category="assessment_invitation", reference="assessment:12"
+    category = models.CharField(max_length=50, blank=True)
+    reference = models.CharField(max_length=100, blank=True)
+    # Emails encolados juntos (permite recuperar sus ids tras bulk_create)
+    batch_id = models.UUIDField(default=uuid.uuid4, db_index=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    provider_id = models.CharField(max_length=100, blank=True)
+
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+            models.Index(fields=["category", "reference"]),
+        ]
+
+    def __str__(self):
+        return f"{self.to_email} - {self.subject} ({self.status})"
+
+
+class RateLimitBucket(models.Model):
+    """Token bucket compartido entre workers (se actualiza con lock de fila)"""
+    name = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name}: {self.tokens:.2f}"
@@ -0,0 +1,154 @@
+"""
+Outbox de emails.
+
+enqueue_emails inserta los mensajes y retorna sus ids sin tocar la red.
+process_outbox (worker) toma lotes con SKIP LOCKED, respeta el token bucket
+compartido de Resend, usa el envío por lotes (Batch API) cuando hay más de un
+mensaje y reintenta con backoff los envíos fallidos.
+"""
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+import resend
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EmailOutbox
+from .rate_limit import try_acquire
+
+logger = logging.getLogger(__name__)
+
+RESEND_BUCKET = "resend"
+# Límite de la Batch API de Resend
+RESEND_MAX_BATCH = 100
+
+
+def enqueue_emails(messages, category="", reference=""):
+    """
+    messages: [{"to": "a@b.com", "subject": "...", "html": "..."}]
+    Retorna la lista de ids del outbox (en el mismo orden).
+    """
+    if not messages:
+        return []
+    batch_id = uuid.uuid4()
+    EmailOutbox.objects.bulk_create([
+        EmailOutbox(
+            to_email=m["to"],
+            from_email=m.get("from") or settings.FROM_EMAIL,
+            subject=m["subject"],
+            html=m["html"],
+            category=category,
+            reference=reference,
+            batch_id=batch_id,
+        )
+        for m in messages
+    ])
+    # MySQL no retorna pks en bulk_create: se recuperan por batch_id
+    return list(EmailOutbox.objects.filter(batch_id=batch_id).order_by("id").values_list("id", flat=True))
+
+
+def claim_batch(worker, size):
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.EMAIL_OUTBOX_LOCK_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        emails = list(
+            EmailOutbox.objects
+            .select_for_update(skip_locked=True)
+            .filter(Q(status="PENDING", available_at__lte=now) | Q(status="SENDING", locked_at__lt=stale))
+            .order_by("available_at", "id")[:size]
+        )
+        if emails:
+            EmailOutbox.objects.filter(id__in=[e.id for e in emails]).update(
+                status="SENDING", locked_at=now, locked_by=worker
+            )
+    return emails
+
+
+def _params(email):
+    return {
+        "from": email.from_email,
+        "to": [email.to_email],
+        "subject": email.subject,
+        "html": email.html,
+    }
+
+
+def _deliver(emails):
+    """Envía por Resend y retorna los ids del proveedor (uno por email)"""
+    resend.api_key = settings.RESEND_API_KEY
+    if len(emails) == 1:
+        response = resend.Emails.send(_params(emails[0]))
+        return [response.get("id", "")]
+    response = resend.Batch.send([_params(e) for e in emails])
+    data = response.get("data") or []
+    return [item.get("id", "") for item in data] + [""] * (len(emails) - len(data))
+
+
+def _wait_for_token():
+    while True:
+        wait = try_acquire(
+            RESEND_BUCKET,
+            rate=settings.RESEND_RATE_LIMIT_PER_SECOND,
+            capacity=settings.RESEND_RATE_LIMIT_BURST,
+        )
+        if not wait:
+            return
+        time.sleep(wait)
+
+
+def send_batch(emails):
+    """Envía un lote ya reclamado. Retorna (enviados, fallidos)."""
+    _wait_for_token()  # un request a Resend, sea individual o por lote
+    now = timezone.now()
+    try:
+        provider_ids = _deliver(emails)
+    except Exception as e:
+        for email in emails:
+            email.attempts += 1
+            email.last_error = str(e)
+            email.locked_at = None
+            email.locked_by = ""
+            if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                email.status = "FAILED"
+            else:
+                email.status = "PENDING"
+                delay = settings.EMAIL_OUTBOX_RETRY_DELAY_SECONDS * (2 ** (email.attempts - 1))
+                email.available_at = now + timedelta(seconds=delay)
+        EmailOutbox.objects.bulk_update(
+            emails, ["attempts", "last_error", "locked_at", "locked_by", "status", "available_at"]
+        )
+        logger.error(f"❌ Error enviando lote de {len(emails)} emails: {e}")
+        return 0, len(emails)
+
+    for email, provider_id in zip(emails, provider_ids):
+        email.status = "SENT"
+        email.attempts += 1
+        email.provider_id = provider_id or ""
+        email.sent_at = now
+        email.last_error = ""
+        email.locked_at = None
+        email.locked_by = ""
+    EmailOutbox.objects.bulk_update(
+        emails, ["status", "attempts", "provider_id", "sent_at", "last_error", "locked_at", "locked_by"]
+    )
+    logger.info(f"✅ {len(emails)} emails enviados")
+    return len(emails), 0
+
+
+def process_outbox(worker, max_batches=None):
+    """Envía lotes hasta vaciar el outbox (o max_batches). Retorna (enviados, fallidos)."""
+    size = min(settings.EMAIL_OUTBOX_BATCH_SIZE, RESEND_MAX_BATCH)
+    sent = failed = batches = 0
+    while max_batches is None or batches < max_batches:
+        emails = claim_batch(worker, size)
+        if not emails:
+            break
+        ok, ko = send_batch(emails)
+        sent += ok
+        failed += ko
+        batches += 1
+    return sent, failed
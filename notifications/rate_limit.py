@@ -0,0 +1,40 @@
+"""
+Token bucket en base de datos.
+
+Resend permite ~2 requests por segundo por cuenta; como puede haber varios
+workers enviando, el estado del bucket vive en una fila que se bloquea con
+SELECT ... FOR UPDATE en cada consumo.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RateLimitBucket
+
+
+def try_acquire(name, rate, capacity, tokens=1):
+    """
+    Intenta consumir `tokens`. Retorna 0 si se concedieron o los segundos a
+    esperar hasta que haya suficientes.
+    """
+    with transaction.atomic():
+        try:
+            bucket, _ = RateLimitBucket.objects.select_for_update().get_or_create(
+                name=name, defaults={"tokens": capacity}
+            )
+        except IntegrityError:
+            # Otro worker creó el bucket al mismo tiempo
+            bucket = RateLimitBucket.objects.select_for_update().get(name=name)
+
+        now = timezone.now()
+        elapsed = max((now - bucket.updated_at).total_seconds(), 0.0)
+        available = min(capacity, bucket.tokens + elapsed * rate)
+
+        if available >= tokens:
+            bucket.tokens = available - tokens
+            wait = 0.0
+        else:
+            bucket.tokens = available
+            wait = (tokens - available) / rate
+        bucket.updated_at = now
+        bucket.save(update_fields=["tokens", "updated_at"])
+    return wait
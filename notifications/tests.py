@@ -0,0 +1,94 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from unittest.mock import patch
+
+from assessments.models import Assessment
+from projects.models import Project
+from .models import EmailOutbox
+from .outbox import enqueue_emails, process_outbox
+from .rate_limit import try_acquire
+
+
+class EmailOutboxEndpointTestCase(APITestCase):
+    """Tests para el encolado de emails desde los endpoints"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='outbox_admin', password='admin123', email='admin@test.com', is_staff=True
+        )
+        self.candidates = [
+            User.objects.create_user(username=f'outbox_{i}', password='test123', email=f'c{i}@test.com')
+            for i in range(3)
+        ]
+        self.project = Project.objects.create(title="Proyecto Outbox")
+        self.assessment = Assessment.objects.create(
+            candidate=self.candidates[0], project=self.project, assessment_type='QUIZ', title="Quiz Outbox"
+        )
+
+    @patch('notifications.outbox.resend')
+    def test_send_invitation_enqueues_and_returns_ids(self, mock_resend):
+        """Test: Las invitaciones se encolan sin llamar a Resend en el request"""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(
+            f'/api/assessments/assessments/{self.assessment.id}/send-invitation/',
+            {"user_ids": [u.id for u in self.candidates]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["emails_queued"], 3)
+        outbox = EmailOutbox.objects.filter(id__in=response.data["outbox_ids"])
+        self.assertEqual(outbox.count(), 3)
+        self.assertTrue(all(e.status == "PENDING" for e in outbox))
+        mock_resend.Emails.send.assert_not_called()
+        mock_resend.Batch.send.assert_not_called()
+
+
+@override_settings(RESEND_RATE_LIMIT_PER_SECOND=1000, RESEND_RATE_LIMIT_BURST=1000,
+                   EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_RETRY_DELAY_SECONDS=0)
+class EmailOutboxSenderTestCase(TestCase):
+    """Tests para el worker de envío del outbox"""
+
+    def _enqueue(self, n):
+        return enqueue_emails(
+            [{"to": f"user{i}@test.com", "subject": "Hola", "html": "<p>Hola</p>"} for i in range(n)],
+            category="test",
+        )
+
+    @patch('notifications.outbox.resend')
+    def test_sends_in_batches(self, mock_resend):
+        """Test: Varios emails se envían en un solo request por lotes"""
+        ids = self._enqueue(3)
+        mock_resend.Batch.send.return_value = {"data": [{"id": f"re_{i}"} for i in range(3)]}
+
+        sent, failed = process_outbox("test-worker")
+
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(mock_resend.Batch.send.call_count, 1)
+        mock_resend.Emails.send.assert_not_called()
+        self.assertEqual(
+            list(EmailOutbox.objects.filter(id__in=ids).values_list("provider_id", flat=True)),
+            ["re_0", "re_1", "re_2"],
+        )
+
+    @patch('notifications.outbox.resend')
+    def test_failed_sends_are_retried_then_marked_failed(self, mock_resend):
+        """Test: Un envío fallido se reintenta y al agotar intentos queda FAILED"""
+        email_id = self._enqueue(1)[0]
+        mock_resend.Emails.send.side_effect = Exception("429 Too Many Requests")
+
+        process_outbox("test-worker", max_batches=1)
+        email = EmailOutbox.objects.get(id=email_id)
+        self.assertEqual((email.status, email.attempts), ("PENDING", 1))
+
+        process_outbox("test-worker", max_batches=1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ("FAILED", 2))
+        self.assertIn("429", email.last_error)
+
+    def test_token_bucket_is_shared(self):
+        """Test: El bucket niega tokens cuando se agota la capacidad"""
+        self.assertEqual(try_acquire("test", rate=1, capacity=2), 0)
+        self.assertEqual(try_acquire("test", rate=1, capacity=2), 0)
+        self.assertGreater(try_acquire("test", rate=1, capacity=2), 0)
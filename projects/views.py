@@ -1,31 +1,55 @@
 import json
 from rest_framework import viewsets, permissions, mixins, status
+from rest_framework.decorators import action
 from .models import Project, Meeting
 from .serializers import ProjectSerializer, MeetingSerializer
 from recruiting.ai_client import analyze_meeting_transcript
+from recruiting.models import RescoringJob
+from recruiting.rescoring import enqueue_rescoring
+from recruiting.serializers import RescoringJobSerializer
 from rest_framework.response import Response
 from datetime import timedelta
 from django.utils import timezone
 import base64
 import tempfile
 import os
-from openai import OpenAI
-from django.conf import settings
 from django.contrib.auth.models import User
-
-# Inicialización global del cliente OpenAI
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+from core.openai_client import transcription
 
 class ProjectViewSet(viewsets.ModelViewSet):
     queryset = Project.objects.all().order_by("-id")
     serializer_class = ProjectSerializer
 
+    def perform_update(self, serializer):
+        previous_skills = serializer.instance.required_skills
+        project = serializer.save()
+        # Los match_score existentes se calcularon con los skills anteriores
+        if project.required_skills != previous_skills and project.application_set.exists():
+            enqueue_rescoring(project, user=self.request.user)
+
+    @action(detail=True, methods=['get', 'post'], permission_classes=[permissions.IsAdminUser])
+    def rescore(self, request, pk=None):
+        """
+        Re-scoring de todas las aplicaciones del proyecto (lo ejecuta el worker)
+        POST /api/projects/{id}/rescore/  -> encola un job (202)
+        GET  /api/projects/{id}/rescore/  -> progreso del último job
+        """
+        project = self.get_object()
+        if request.method == "POST":
+            job = enqueue_rescoring(project, user=request.user)
+            return Response(RescoringJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        job = RescoringJob.objects.filter(project=project).first()
+        if job is None:
+            return Response({"detail": "El proyecto no tiene re-scoring registrados"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(RescoringJobSerializer(job).data)
+
 class MeetingViewSet(
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet
 ):
-    queryset = Meeting.objects.all()
+    queryset = Meeting.objects.select_related("project")
     serializer_class = MeetingSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -51,7 +75,8 @@ class MeetingViewSet(
                     temp_path = temp_video.name
 
                 with open(temp_path, "rb") as audio_file:
-                    transcript_res = client.audio.transcriptions.create(
+                    transcript_res = transcription(
+                        "transcription",
                         model="whisper-1",
                         file=audio_file,
                         language="es"
@@ -1,12 +1,40 @@
 from django.contrib import admin
-from .models import Application
+from .models import Application, CVProcessingJob, CVParseCache, CandidateScoreSummary, RescoringJob
 
 @admin.register(Application)
 class ApplicationAdmin(admin.ModelAdmin):
-    list_display = ("id", "candidate", "project", "status", "created_at")
-    list_filter = ("status", "project")
+    list_display = ("id", "candidate", "project", "status", "processing_status", "created_at")
+    list_filter = ("status", "processing_status", "project")
     search_fields = ("candidate__username",)
 
 
 
 
+
+
+@admin.register(CVProcessingJob)
+class CVProcessingJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "application", "status", "current_stage", "created_at", "finished_at")
+    list_filter = ("status", "current_stage")
+    readonly_fields = ("stages", "last_error", "locked_at", "locked_by", "created_at", "updated_at", "finished_at")
+
+
+@admin.register(CVParseCache)
+class CVParseCacheAdmin(admin.ModelAdmin):
+    list_display = ("key", "hits", "created_at", "last_used_at")
+    readonly_fields = ("key", "extracted", "hits", "created_at", "last_used_at")
+    ordering = ("-last_used_at",)
+
+
+@admin.register(CandidateScoreSummary)
+class CandidateScoreSummaryAdmin(admin.ModelAdmin):
+    list_display = ("candidate", "project", "status", "match_score", "avg_quiz", "avg_coding", "updated_at")
+    list_filter = ("status", "project")
+    search_fields = ("candidate__username",)
+
+
+@admin.register(RescoringJob)
+class RescoringJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "project", "status", "processed", "total", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = ("last_application_id", "last_error", "started_at", "finished_at", "elapsed_seconds")
@@ -1,8 +1,6 @@
 import json
-from openai import OpenAI
-from django.conf import settings
+from core.openai_client import chat_completion
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
 MODEL = "gpt-4o-mini"
 
 SCHEMA = {
@@ -26,6 +24,10 @@ SCHEMA = {
   "required": ["full_name", "emails", "skills"]
 }
 
+# Incrementar cuando cambie el prompt o el post-procesamiento del parser:
+# invalida las entradas de CVParseCache generadas con la versión anterior
+PROMPT_VERSION = "1"
+
 SYSTEM_MESSAGE = """
 Eres un parser ATS experto.
 Extrae información de un CV en español o inglés.
@@ -33,11 +35,16 @@ Nunca inventes datos. Si no existe, deja arrays vacíos o string vacío.
 Responde SOLO en JSON siguiendo el esquema.
 """
 
-def calculate_candidate_score(candidate_data, project_requirements):
+class CombinedResponseError(ValueError):
+    """La respuesta del modo combinado no cumple el esquema esperado"""
+
+
+def calculate_candidate_score(candidate_data, project_requirements, metrics=None):
     """
     Nueva función para calificar al candidato con pesos personalizados.
     candidate_data: El JSON extraído del CV.
     project_requirements: Requerimientos del proyecto (skills, descripción).
+    metrics: lista opcional donde se registra latencia y tokens de la llamada.
     """
     
     system_message = """
@@ -58,7 +65,9 @@ def calculate_candidate_score(candidate_data, project_requirements):
     Calcula las notas basándote en la relevancia real, no solo en palabras clave.
     """
 
-    result = client.chat.completions.create(
+    result = chat_completion(
+        "cv_score",
+        metrics=metrics,
         model=MODEL,
         messages=[
             {"role": "system", "content": system_message},
@@ -69,13 +78,15 @@ def calculate_candidate_score(candidate_data, project_requirements):
     
     return json.loads(result.choices[0].message.content)
 
-def parse_cv_text(cv_text: str):
+def parse_cv_text(cv_text: str, metrics=None):
     messages = [
       {"role": "system", "content": SYSTEM_MESSAGE},
       {"role": "user", "content": f"Esquema:\n{json.dumps(SCHEMA)}\n\nCV:\n{cv_text[:20000]}"}
     ]
     try:
-      result = client.chat.completions.create(
+      result = chat_completion(
+          "cv_parse",
+          metrics=metrics,
           model=MODEL,
           messages=messages,
           response_format={"type": "json_object"},
@@ -90,6 +101,71 @@ def parse_cv_text(cv_text: str):
         # Si algo falla, devolvemos un diccionario vacío en lugar de None
         return {}
 
+
+
+COMBINED_SYSTEM_MESSAGE = """
+Eres un parser ATS experto y un reclutador IT.
+1. Extrae información de un CV en español o inglés siguiendo el esquema.
+   Nunca inventes datos. Si no existe, deja arrays vacíos o string vacío.
+2. Califica la compatibilidad del candidato con el proyecto:
+   'skills_score' (0-10) qué tanto coinciden sus hard/soft skills,
+   'experience_score' (0-10) qué tan relevante es su historia laboral,
+   'justification' una breve explicación de la nota.
+Responde SOLO en JSON: {"extracted": {...esquema...}, "scores": {"skills_score": 0, "experience_score": 0, "justification": ""}}
+"""
+
+
+def _validate_combined(data):
+    if not isinstance(data, dict):
+        raise CombinedResponseError("La respuesta no es un objeto JSON")
+
+    extracted = data.get("extracted")
+    if not isinstance(extracted, dict) or not extracted:
+        raise CombinedResponseError("Falta 'extracted'")
+    missing = [key for key in SCHEMA["required"] if key not in extracted]
+    if missing:
+        raise CombinedResponseError(f"'extracted' sin campos requeridos: {missing}")
+
+    scores = data.get("scores")
+    if not isinstance(scores, dict):
+        raise CombinedResponseError("Falta 'scores'")
+    for key in ("skills_score", "experience_score"):
+        value = scores.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 10:
+            raise CombinedResponseError(f"'{key}' debe ser un número entre 0 y 10")
+    scores.setdefault("justification", "")
+    return extracted, scores
+
+
+def parse_and_score_cv(cv_text: str, project_requirements, metrics=None):
+    """
+    Modo combinado: extrae el CV y lo califica en una sola llamada.
+    Retorna (extracted, scores). Lanza CombinedResponseError si la llamada
+    falla o la respuesta no valida, para que el llamador use el flujo de dos pasos.
+    """
+    messages = [
+        {"role": "system", "content": COMBINED_SYSTEM_MESSAGE},
+        {"role": "user", "content": (
+            f"Esquema de 'extracted':\n{json.dumps(SCHEMA)}\n\n"
+            f"REQUERIMIENTOS DEL PROYECTO:\n{project_requirements}\n\n"
+            f"CV:\n{cv_text[:20000]}"
+        )},
+    ]
+    try:
+        result = chat_completion(
+            "cv_parse_and_score",
+            metrics=metrics,
+            model=MODEL,
+            messages=messages,
+            response_format={"type": "json_object"},
+            temperature=0.1
+        )
+        data = json.loads(result.choices[0].message.content)
+    except Exception as e:
+        raise CombinedResponseError(f"Error llamando a OpenAI: {e}") from e
+
+    return _validate_combined(data)
+
     
 def analyze_meeting_transcript(transcript: str, hourly_rate: float):
     """
@@ -151,7 +227,8 @@ def analyze_meeting_transcript(transcript: str, hourly_rate: float):
     ]
 
     try:
-        resp = client.chat.completions.create(
+        resp = chat_completion(
+            "meeting_analysis",
             model=MODEL,
             messages=messages,
             response_format={"type": "json_object"},
@@ -0,0 +1,123 @@
+"""
+Cache por contenido para parse_cv_text.
+
+Un candidato suele subir el mismo CV a varios proyectos: el JSON extraído se
+reutiliza si el texto normalizado, el esquema y la versión del prompt coinciden.
+Las extracciones del modo combinado (CV_COMBINED_LLM_CALL) usan otro prompt y
+se guardan con otra clave: un parse de dos llamadas nunca las reutiliza.
+Las entradas expiran por TTL y, si se supera el máximo, se eliminan las menos
+usadas recientemente (LRU).
+"""
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CVParseCache
+from .ai_client import COMBINED_SYSTEM_MESSAGE, MODEL, PROMPT_VERSION, SCHEMA, SYSTEM_MESSAGE, parse_cv_text
+
+logger = logging.getLogger(__name__)
+
+
+def _fingerprint(system_message):
+    return hashlib.sha256(
+        "\n".join([
+            MODEL,
+            PROMPT_VERSION,
+            system_message,
+            json.dumps(SCHEMA, sort_keys=True),
+        ]).encode("utf-8")
+    ).hexdigest()
+
+
+# Por modo de parsing (ver pipeline._stage_parse_cv)
+_PARSER_FINGERPRINTS = {
+    "two_step": _fingerprint(SYSTEM_MESSAGE),
+    "combined": _fingerprint(COMBINED_SYSTEM_MESSAGE),
+}
+
+
+def normalize_cv_text(cv_text):
+    """Normaliza Unicode y espacios; respeta mayúsculas (nombres, siglas)"""
+    text = unicodedata.normalize("NFC", cv_text or "")
+    text = re.sub(r"\s+", " ", text).strip()
+    # parse_cv_text solo envía los primeros 20000 caracteres
+    return text[:20000]
+
+
+def cv_cache_key(cv_text, mode="two_step"):
+    normalized = normalize_cv_text(cv_text)
+    return hashlib.sha256(f"{_PARSER_FINGERPRINTS[mode]}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+def get_cached_extraction(cv_text, mode="two_step"):
+    """Retorna el JSON cacheado o None si no existe / expiró"""
+    key = cv_cache_key(cv_text, mode)
+    entry = CVParseCache.objects.filter(key=key).only("id", "extracted", "created_at").first()
+    if entry is None:
+        return None
+
+    ttl = timedelta(days=settings.CV_PARSE_CACHE_TTL_DAYS)
+    if entry.created_at < timezone.now() - ttl:
+        entry.delete()
+        return None
+
+    CVParseCache.objects.filter(pk=entry.pk).update(hits=F("hits") + 1, last_used_at=timezone.now())
+    return entry.extracted
+
+
+def store_extraction(cv_text, extracted, mode="two_step"):
+    key = cv_cache_key(cv_text, mode)
+    try:
+        CVParseCache.objects.update_or_create(
+            key=key,
+            defaults={"extracted": extracted, "last_used_at": timezone.now()},
+        )
+    except IntegrityError:
+        # Otro worker guardó la misma clave en paralelo
+        pass
+    evict()
+
+
+def evict():
+    """Aplica TTL y el límite de entradas (LRU). Retorna cuántas se eliminaron."""
+    removed, _ = CVParseCache.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=settings.CV_PARSE_CACHE_TTL_DAYS)
+    ).delete()
+
+    max_entries = settings.CV_PARSE_CACHE_MAX_ENTRIES
+    overflow = CVParseCache.objects.count() - max_entries
+    if overflow > 0:
+        stale_ids = list(
+            CVParseCache.objects.order_by("last_used_at").values_list("id", flat=True)[:overflow]
+        )
+        deleted, _ = CVParseCache.objects.filter(id__in=stale_ids).delete()
+        removed += deleted
+    return removed
+
+
+def parse_cv_text_cached(cv_text, metrics=None):
+    """
+    Igual que parse_cv_text pero reutiliza resultados previos.
+    Retorna (extracted, cache_hit).
+    """
+    if not settings.CV_PARSE_CACHE_ENABLED:
+        return parse_cv_text(cv_text, metrics=metrics), False
+
+    cached = get_cached_extraction(cv_text)
+    if cached is not None:
+        logger.info("♻️ CV encontrado en cache, se omite la llamada a OpenAI")
+        return cached, True
+
+    extracted = parse_cv_text(cv_text, metrics=metrics)
+    # Solo se cachean respuestas válidas (parse_cv_text retorna {} si falla)
+    if isinstance(extracted, dict) and extracted:
+        store_extraction(cv_text, extracted)
+    return extracted, False
@@ -1,9 +1,8 @@
-import resend
 from django.conf import settings
 from django.contrib.auth.models import User
+from notifications.outbox import enqueue_emails
 from .models import Application
 import logging
-import time
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +15,9 @@ def notify_new_application(application_id):
         application_id: ID de la aplicación
     
     Returns:
-        dict: Resultado del envío con conteo de éxitos/errores
+        dict: Resultado con los ids del outbox (el envío lo hace send_outbox_emails)
     """
     try:
-        # Configurar API key de Resend
-        resend.api_key = settings.RESEND_API_KEY
-        
         # Obtener la aplicación con relaciones
         application = Application.objects.select_related(
             'candidate', 'project'
@@ -35,17 +31,12 @@ def notify_new_application(application_id):
             logger.warning("No hay administradores para notificar")
             return {
                 "success": True,
-                "emails_sent": 0,
-                "failed": 0,
+                "emails_queued": 0,
+                "outbox_ids": [],
                 "recipients": [],
                 "message": "No hay administradores registrados"
             }
         
-        emails_sent = 0
-        failed = 0
-        recipients = []
-        errors = []
-        
         # Información de la aplicación
         candidate = application.candidate
         project = application.project
@@ -57,79 +48,69 @@ def notify_new_application(application_id):
         if application.cv_file:
             cv_info = f'<p style="margin: 8px 0;"><strong>📄 CV:</strong> <a href="{application.cv_file.url}">Ver CV</a></p>'
         
-        # Enviar a cada administrador
-        for admin in admins:
-            try:
-                html_content = f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <h2 style="color: #3B82F6;">Nueva Aplicación Recibida</h2>
-                    
-                    <p>Hola <strong>Admin</strong>,</p>
-                    
-                    <p>Se ha recibido una nueva aplicación que requiere revisión:</p>
-                    
-                    <div style="background-color: #dbeafe; padding: 20px; border-radius: 8px; 
-                                border-left: 4px solid #3B82F6; margin: 20px 0;">
-                        <p style="margin: 8px 0;"><strong>👤 Candidato:</strong> {candidate.first_name} {candidate.last_name}</p>
-                        <p style="margin: 8px 0;"><strong>📧 Email:</strong> {candidate.email}</p>
-                        <p style="margin: 8px 0;"><strong>📁 Proyecto:</strong> {project.title}</p>
-                        <p style="margin: 8px 0;"><strong>📅 Fecha:</strong> {applied_at}</p>
-                        {cv_info}
-                        <p style="margin: 8px 0;"><strong>📊 Estado:</strong> {application.get_status_display()}</p>
-                    </div>
-                    
-                    <p>
-                        <a href="{admin_link}" 
-                           style="display: inline-block; background-color: #3B82F6; color: white; 
-                                  padding: 12px 24px; text-decoration: none; border-radius: 6px; 
-                                  font-weight: bold;">
-                            Revisar Aplicación
-                        </a>
-                    </p>
-                    
-                    <p style="color: #6B7280; font-size: 14px;">
-                        Revisa el perfil del candidato y toma las acciones necesarias.
-                    </p>
-                </body>
-                </html>
-                """
-                
-                # Enviar email
-                params = {
-                    "from": settings.FROM_EMAIL,
-                    "to": [admin.email],
-                    "subject": f"Nueva Aplicación Recibida - {project.title}",
-                    "html": html_content,
-                }
-                
-                resend.Emails.send(params)
-                emails_sent += 1
-                recipients.append(admin.email)
-                logger.info(f"✅ Notificación enviada a admin {admin.email} para application {application_id}")
-                time.sleep(0.6)  # Delay para respetar rate limit de Resend (2 req/sec)
-                
-            except Exception as e:
-                failed += 1
-                error_msg = f"Error enviando a {admin.email}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+        # El contenido es el mismo para todos los administradores
+        html_content = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <h2 style="color: #3B82F6;">Nueva Aplicación Recibida</h2>
+            
+            <p>Hola <strong>Admin</strong>,</p>
+            
+            <p>Se ha recibido una nueva aplicación que requiere revisión:</p>
+            
+            <div style="background-color: #dbeafe; padding: 20px; border-radius: 8px; 
+                        border-left: 4px solid #3B82F6; margin: 20px 0;">
+                <p style="margin: 8px 0;"><strong>👤 Candidato:</strong> {candidate.first_name} {candidate.last_name}</p>
+                <p style="margin: 8px 0;"><strong>📧 Email:</strong> {candidate.email}</p>
+                <p style="margin: 8px 0;"><strong>📁 Proyecto:</strong> {project.title}</p>
+                <p style="margin: 8px 0;"><strong>📅 Fecha:</strong> {applied_at}</p>
+                {cv_info}
+                <p style="margin: 8px 0;"><strong>📊 Estado:</strong> {application.get_status_display()}</p>
+            </div>
+            
+            <p>
+                <a href="{admin_link}" 
+                   style="display: inline-block; background-color: #3B82F6; color: white; 
+                          padding: 12px 24px; text-decoration: none; border-radius: 6px; 
+                          font-weight: bold;">
+                    Revisar Aplicación
+                </a>
+            </p>
+            
+            <p style="color: #6B7280; font-size: 14px;">
+                Revisa el perfil del candidato y toma las acciones necesarias.
+            </p>
+        </body>
+        </html>
+        """
+
+        messages = [
+            {
+                "to": admin.email,
+                "subject": f"Nueva Aplicación Recibida - {project.title}",
+                "html": html_content,
+            }
+            for admin in admins if admin.email
+        ]
+        outbox_ids = enqueue_emails(
+            messages, category="new_application", reference=f"application:{application_id}"
+        )
+        logger.info(f"📧 {len(outbox_ids)} notificaciones encoladas para application {application_id}")
         
         return {
             "success": True,
-            "emails_sent": emails_sent,
-            "failed": failed,
-            "recipients": recipients,
-            "errors": errors if errors else None,
-            "message": f"Notificaciones enviadas a admins: {emails_sent} exitosas, {failed} fallidas"
+            "emails_queued": len(outbox_ids),
+            "outbox_ids": outbox_ids,
+            "recipients": [m["to"] for m in messages],
+            "message": f"Notificaciones a admins encoladas: {len(outbox_ids)}"
         }
         
     except Application.DoesNotExist:
         logger.error(f"Application {application_id} no existe")
         return {
             "success": False,
-            "emails_sent": 0,
-            "failed": 0,
+            "emails_queued": 0,
+            "outbox_ids": [],
             "recipients": [],
             "message": "Aplicación no encontrada"
         }
@@ -137,8 +118,8 @@ def notify_new_application(application_id):
         logger.error(f"Error general en notify_new_application: {str(e)}")
         return {
             "success": False,
-            "emails_sent": 0,
-            "failed": 0,
+            "emails_queued": 0,
+            "outbox_ids": [],
             "recipients": [],
             "message": f"Error: {str(e)}"
         }
@@ -0,0 +1,63 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recruiting.skill_matcher import SkillMatcher, reference_compute_match_v2
+
+SKILL_POOL = [
+    "Python", "Django", "Django REST Framework", "Flask", "FastAPI", "React", "ReactJS",
+    "React Native", "Angular", "Vue.js", "Node.js", "NestJS", "Express", "TypeScript",
+    "JavaScript", "Java", "Spring Boot", "Kotlin", "Swift", "C#", ".NET", ".NET MAUI",
+    "SQL Server", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Docker", "Kubernetes",
+    "AWS", "Azure", "GCP", "Terraform", "Git", "Linux", "Pandas", "NumPy",
+    "TensorFlow", "PyTorch", "Scikit-learn", "GraphQL", "REST APIs", "HTML", "CSS",
+    "Tailwind CSS", "Figma", "Scrum", "Jira", "Go", "Rust", "PHP", "Laravel",
+]
+
+
+class Command(BaseCommand):
+    help = "Compara el matching par a par original contra SkillMatcher (tiempos y puntajes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--candidates", type=int, default=2000)
+        parser.add_argument("--required", type=int, default=8, help="Skills requeridos del proyecto")
+        parser.add_argument("--skills", type=int, default=15, help="Skills máximos por candidato")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        required = rng.sample(SKILL_POOL, options["required"])
+        candidates = [
+            [self._noisy(rng, s) for s in rng.sample(SKILL_POOL, rng.randint(1, options["skills"]))]
+            for _ in range(options["candidates"])
+        ]
+
+        started = time.perf_counter()
+        expected = [reference_compute_match_v2(required, c) for c in candidates]
+        reference_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        got = SkillMatcher(required).score_many(candidates)
+        indexed_s = time.perf_counter() - started
+
+        mismatches = sum(1 for a, b in zip(expected, got) if a != b)
+        self.stdout.write(f"📊 {len(candidates)} candidatos, {len(required)} skills requeridos")
+        self.stdout.write(f"   Original : {reference_s * 1000:.1f} ms")
+        self.stdout.write(f"   Indexado : {indexed_s * 1000:.1f} ms ({reference_s / max(indexed_s, 1e-9):.1f}x)")
+        if mismatches:
+            raise CommandError(f"❌ {mismatches} puntajes difieren de la implementación original")
+        self.stdout.write(self.style.SUCCESS("✅ Puntajes idénticos"))
+
+    @staticmethod
+    def _noisy(rng, skill):
+        """Variantes como las que aparecen en CVs reales"""
+        choice = rng.random()
+        if choice < 0.15:
+            return skill.lower() + " developer"
+        if choice < 0.25:
+            return skill.upper()
+        if choice < 0.30 and len(skill) > 4:
+            i = rng.randrange(len(skill))
+            return skill[:i] + skill[i + 1:]  # typo
+        return skill
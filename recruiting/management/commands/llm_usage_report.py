@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from recruiting.models import CVProcessingJob
+
+LLM_STAGES = ("parse_cv", "score")
+
+
+class Command(BaseCommand):
+    help = "Compara latencia y tokens de IA por aplicación entre el modo combinado y el de dos llamadas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--last", type=int, default=500, help="Jobs terminados más recientes a considerar")
+
+    def handle(self, *args, **options):
+        jobs = (
+            CVProcessingJob.objects.filter(status="DONE")
+            .order_by("-finished_at")
+            .values_list("stages", flat=True)[:options["last"]]
+        )
+
+        totals = defaultdict(lambda: {"applications": 0, "calls": 0, "latency_ms": 0.0, "tokens": 0})
+        for stages in jobs:
+            parse = stages.get("parse_cv", {})
+            if "llm_mode" not in parse:
+                continue  # job anterior al registro de métricas
+            mode = "cache" if parse.get("cache_hit") and "scores" not in parse else parse["llm_mode"]
+            if parse.get("combined_fallback"):
+                mode = "combined_fallback"
+            row = totals[mode]
+            row["applications"] += 1
+            for name in LLM_STAGES:
+                stage = stages.get(name, {})
+                row["calls"] += len(stage.get("llm_calls", []))
+                row["latency_ms"] += stage.get("llm_latency_ms", 0)
+                row["tokens"] += stage.get("llm_tokens", 0)
+
+        if not totals:
+            self.stdout.write("No hay jobs con métricas de IA registradas")
+            return
+
+        self.stdout.write(f"{'modo':<20}{'apps':>6}{'llamadas/app':>14}{'latencia ms/app':>17}{'tokens/app':>12}")
+        for mode, row in sorted(totals.items()):
+            n = row["applications"]
+            self.stdout.write(
+                f"{mode:<20}{n:>6}{row['calls'] / n:>14.2f}{row['latency_ms'] / n:>17.1f}{row['tokens'] / n:>12.0f}"
+            )
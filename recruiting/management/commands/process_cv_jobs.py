@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from assessments.question_bank import process_pending_refills
+from recruiting.models import CVProcessingJob
+from recruiting.pipeline import enqueue_application, process_available_jobs, worker_id
+from recruiting.rescoring import process_pending_rescoring_jobs
+
+
+class Command(BaseCommand):
+    help = "Worker que procesa la cola de CVs (extracción, parsing IA, scoring y notificación), los re-scoring y los refills del banco de preguntas pendientes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Procesa los jobs disponibles y termina")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Segundos de espera cuando la cola está vacía")
+        parser.add_argument("--max-jobs", type=int, default=None, help="Máximo de jobs a procesar antes de salir")
+        parser.add_argument("--requeue-failed", action="store_true", help="Reencola los jobs en estado FAILED antes de empezar")
+
+    def handle(self, *args, **options):
+        worker = worker_id()
+
+        if options["requeue_failed"]:
+            failed = CVProcessingJob.objects.filter(status="FAILED").select_related("application")
+            count = 0
+            for job in failed:
+                enqueue_application(job.application)
+                count += 1
+            self.stdout.write(f"🔁 {count} jobs reencolados")
+
+        self.stdout.write(f"🚀 Worker de CVs iniciado ({worker})")
+        total = 0
+        while True:
+            remaining = None if options["max_jobs"] is None else options["max_jobs"] - total
+            processed = process_available_jobs(max_jobs=remaining, worker=worker)
+            total += processed
+            if processed:
+                self.stdout.write(f"✅ {processed} jobs procesados (total {total})")
+
+            # Re-scoring encolado desde la API (POST /api/projects/{id}/rescore/)
+            rescored = process_pending_rescoring_jobs()
+            if rescored:
+                self.stdout.write(f"📊 {rescored} jobs de re-scoring procesados")
+
+            # Refills del banco de preguntas encolados por generate_questions; uno
+            # por vuelta para que una tanda de refills no frene la cola de CVs
+            refilled = process_pending_refills(max_jobs=1)
+            if refilled:
+                self.stdout.write(f"🏦 {refilled} refills del banco de preguntas procesados")
+
+            if options["once"] or (options["max_jobs"] is not None and total >= options["max_jobs"]):
+                break
+            if not processed and not rescored and not refilled:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Worker finalizado: {total} jobs procesados"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from recruiting.scoring import rebuild_score_summaries
+
+
+class Command(BaseCommand):
+    help = "Reconstruye la tabla CandidateScoreSummary a partir de aplicaciones y pruebas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, default=None, help="Solo reconstruye un proyecto")
+
+    def handle(self, *args, **options):
+        total = rebuild_score_summaries(project_id=options["project"])
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} resúmenes reconstruidos"))
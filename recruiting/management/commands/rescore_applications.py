@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.models import Project
+from recruiting.models import RescoringJob
+from recruiting.rescoring import enqueue_rescoring, process_pending_rescoring_jobs, run_rescoring_job
+
+
+class Command(BaseCommand):
+    help = "Recalcula el skills_match_score y el match_score de las aplicaciones reutilizando los CVs ya extraídos"
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument("--project", type=int, help="Crea y ejecuta un job para este proyecto")
+        group.add_argument("--resume", type=int, help="Reanuda un job interrumpido o fallido")
+        group.add_argument("--pending", action="store_true", help="Ejecuta los jobs encolados desde la API")
+        parser.add_argument("--workers", type=int, default=None, help="Procesos del pool (default RESCORING_WORKERS)")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Aplicaciones por chunk (default RESCORING_CHUNK_SIZE)")
+
+    def handle(self, *args, **options):
+        if options["pending"]:
+            total = process_pending_rescoring_jobs(workers=options["workers"], progress=self._progress)
+            self.stdout.write(self.style.SUCCESS(f"✅ {total} jobs de re-scoring procesados"))
+            return
+
+        if options["project"] is not None:
+            try:
+                project = Project.objects.get(pk=options["project"])
+            except Project.DoesNotExist:
+                raise CommandError(f"Proyecto {options['project']} no existe")
+            job = enqueue_rescoring(project)
+        else:
+            try:
+                job = RescoringJob.objects.get(pk=options["resume"])
+            except RescoringJob.DoesNotExist:
+                raise CommandError(f"Job {options['resume']} no existe")
+            if job.status == "DONE":
+                raise CommandError(f"Job {job.id} ya terminó")
+            self.stdout.write(f"🔁 Reanudando job {job.id} desde la aplicación {job.last_application_id}")
+
+        job = run_rescoring_job(
+            job,
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            progress=self._progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Job {job.id}: {job.processed} aplicaciones en {job.elapsed_seconds:.1f}s ({job.throughput}/s)"
+        ))
+
+    def _progress(self, job):
+        pct = (job.processed / job.total * 100) if job.total else 100.0
+        self.stdout.write(f"   {job.processed}/{job.total} ({pct:.0f}%) - {job.throughput} aplicaciones/s")
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruiting', '0004_cvprocessingjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVParseCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('extracted', models.JSONField(default=dict)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='recruiting__last_us_853426_idx'), models.Index(fields=['created_at'], name='recruiting__created_f48c31_idx')],
+            },
+        ),
+    ]
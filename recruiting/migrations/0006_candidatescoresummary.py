@@ -0,0 +1,81 @@
+# Generated by Django 5.2.7 on 2026-10-18 01:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Avg, Count, Q
+
+
+def populate_summaries(apps, schema_editor):
+    Application = apps.get_model('recruiting', 'Application')
+    Assessment = apps.get_model('assessments', 'Assessment')
+    CandidateScoreSummary = apps.get_model('recruiting', 'CandidateScoreSummary')
+
+    finished = Q(status__in=['EVALUATED', 'COMPLETED'])
+    grouped = (
+        Assessment.objects.values('candidate_id', 'project_id')
+        .annotate(
+            avg_quiz=Avg('score', filter=Q(status='EVALUATED', assessment_type='QUIZ')),
+            avg_coding=Avg('score', filter=Q(status='EVALUATED', assessment_type='CODING')),
+            evaluated_count=Count('id', filter=Q(status='EVALUATED')),
+            pending_count=Count('id', filter=Q(status='PENDING')),
+            completed_avg=Avg('score', filter=finished),
+            completed_count=Count('id', filter=finished),
+        )
+        .order_by()
+    )
+    metrics = {(row['candidate_id'], row['project_id']): row for row in grouped}
+
+    summaries = []
+    for app in Application.objects.all():
+        row = metrics.get((app.candidate_id, app.project_id), {})
+        summaries.append(CandidateScoreSummary(
+            application_id=app.id,
+            candidate_id=app.candidate_id,
+            project_id=app.project_id,
+            avg_quiz=row.get('avg_quiz') or 0.0,
+            avg_coding=row.get('avg_coding') or 0.0,
+            evaluated_count=row.get('evaluated_count') or 0,
+            pending_count=row.get('pending_count') or 0,
+            completed_avg=row.get('completed_avg') or 0.0,
+            completed_count=row.get('completed_count') or 0,
+            match_score=app.match_score,
+            status=app.status,
+        ))
+    CandidateScoreSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_is_hidden'),
+        ('recruiting', '0005_cvparsecache'),
+        ('assessments', '0002_candidateanswer_code_answer_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateScoreSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('avg_quiz', models.FloatField(default=0.0)),
+                ('avg_coding', models.FloatField(default=0.0)),
+                ('evaluated_count', models.IntegerField(default=0)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('completed_avg', models.FloatField(default=0.0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('match_score', models.FloatField(default=0.0)),
+                ('status', models.CharField(choices=[('SUBMITTED', 'Submitted'), ('REVIEW', 'In Review'), ('REJECTED', 'Rejected'), ('APPROVED', 'Approved')], default='SUBMITTED', max_length=20)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score_summary', to='recruiting.application')),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_summaries', to=settings.AUTH_USER_MODEL)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_summaries', to='projects.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'status'], name='recruiting__project_eaa4a0_idx'), models.Index(fields=['status'], name='recruiting__status_ad729f_idx'), models.Index(fields=['-match_score'], name='recruiting__match_s_d654b6_idx')],
+                'unique_together': {('candidate', 'project')},
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_is_hidden'),
+        ('recruiting', '0007_rescoringjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['-created_at'], name='recruiting__created_4fff3e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['candidate', '-created_at'], name='recruiting__candida_cf960d_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruiting', '0008_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='skills_match_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recruiting', '0009_application_skills_match_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='experience_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from projects.models import Project
 from django.db.models import JSONField
+from django.utils import timezone
 from assessments.models import Assessment
 
 
@@ -16,17 +17,189 @@ class Application(models.Model):
         ("APPROVED", "Approved"),
     ]
 
+    PROCESSING_CHOICES = [
+        ("PENDING", "Pending"),
+        ("PROCESSING", "Processing"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    ]
+
     candidate = models.ForeignKey(User, on_delete=models.CASCADE)
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     cv_file = models.FileField(upload_to=cv_upload_path, blank=True, null=True)
     parsed_text = models.TextField(blank=True)
     extracted   = JSONField(default=dict, blank=True)  # ← IA: JSON estructurado
+    # 0.4·skills + 0.6·experiencia (0-100). Al re-scoring, la parte de skills
+    # pasa a ser skills_match_score y la de experiencia se toma de experience_score
     match_score = models.FloatField(default=0.0)
+    # Coincidencia de skills (SkillMatcher, 0-100) con los required_skills
+    # actuales del proyecto. La recalcula el re-scoring.
+    skills_match_score = models.FloatField(null=True, blank=True)
+    # Nota de experiencia de la IA (0-10), guardada al calificar: no depende
+    # de los required_skills, así que el re-scoring la reutiliza sin llamar a la IA
+    experience_score = models.FloatField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="SUBMITTED")
     created_at = models.DateTimeField(auto_now_add=True)
     ai_analysis = models.TextField(blank=True, null=True) #
+    # Estado del procesamiento asíncrono del CV (extracción, IA, notificación)
+    processing_status = models.CharField(max_length=20, choices=PROCESSING_CHOICES, default="COMPLETED")
     class Meta:
         unique_together = ("candidate", "project")  # 1 aplicación por proyecto
+        indexes = [
+            # Paginación por cursor (todas / las del candidato)
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["candidate", "-created_at"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .scoring import refresh_summary_for_application
+
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            # La fila del dashboard existe desde que se crea la aplicación,
+            # aunque todavía no tenga puntaje o su scoring falle
+            refresh_summary_for_application(self)
 
     def __str__(self):
         return f"{self.candidate.username} -> {self.project.title}"
+
+
+class CVProcessingJob(models.Model):
+    """Trabajo en cola para procesar el CV de una aplicación fuera del request"""
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pendiente"),
+        ("RUNNING", "En ejecución"),
+        ("DONE", "Terminado"),
+        ("FAILED", "Fallido"),
+    ]
+
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, related_name="processing_job")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    current_stage = models.CharField(max_length=30, blank=True)
+    # Estado por etapa: {"parse_cv": {"status": "done", "attempts": 1, "duration_ms": 812.4, "error": ""}}
+    stages = JSONField(default=dict, blank=True)
+    last_error = models.TextField(blank=True)
+
+    # Control de la cola
+    available_at = models.DateTimeField(default=timezone.now, help_text="No se procesa antes de esta fecha (backoff)")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} - application {self.application_id} ({self.status})"
+
+
+class CVParseCache(models.Model):
+    """
+    Cache persistente del JSON extraído por la IA para un texto de CV.
+    La clave es un hash del texto normalizado + versión del esquema/prompt.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    extracted = JSONField(default=dict)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["last_used_at"]),
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.key[:12]}… ({self.hits} hits)"
+
+
+class CandidateScoreSummary(models.Model):
+    """
+    Resumen desnormalizado por (candidato, proyecto) para el dashboard.
+    Se actualiza cuando cambian las pruebas o el estado de la aplicación
+    (ver recruiting/scoring.py) y se reconstruye con rebuild_score_summaries.
+    """
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, related_name="score_summary")
+    candidate = models.ForeignKey(User, on_delete=models.CASCADE, related_name="score_summaries")
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="score_summaries")
+
+    # Promedios de pruebas EVALUATED por tipo
+    avg_quiz = models.FloatField(default=0.0)
+    avg_coding = models.FloatField(default=0.0)
+    evaluated_count = models.IntegerField(default=0)
+    pending_count = models.IntegerField(default=0)
+    # Pruebas EVALUATED o COMPLETED (top candidatos)
+    completed_avg = models.FloatField(default=0.0)
+    completed_count = models.IntegerField(default=0)
+
+    # Copia de la aplicación
+    match_score = models.FloatField(default=0.0)
+    status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES, default="SUBMITTED")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("candidate", "project")
+        indexes = [
+            models.Index(fields=["project", "status"]),
+            models.Index(fields=["status"]),
+            models.Index(fields=["-match_score"]),
+        ]
+
+    def __str__(self):
+        return f"{self.candidate_id} -> {self.project_id} (quiz {self.avg_quiz}, coding {self.avg_coding})"
+
+
+class RescoringJob(models.Model):
+    """
+    Recalcula el skills_match_score y el match_score de todas las aplicaciones
+    de un proyecto (por ejemplo tras editar required_skills). Guarda un cursor para poder
+    reanudarse si el proceso se interrumpe.
+    """
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pendiente"),
+        ("RUNNING", "En ejecución"),
+        ("DONE", "Terminado"),
+        ("FAILED", "Fallido"),
+    ]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="rescoring_jobs")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    required_skills = JSONField(default=list, blank=True)  # skills usados al encolar
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    # Última aplicación procesada (se recorre por id ascendente)
+    last_application_id = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    elapsed_seconds = models.FloatField(default=0.0)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    @property
+    def throughput(self):
+        """Aplicaciones por segundo"""
+        if not self.elapsed_seconds:
+            return 0.0
+        return round(self.processed / self.elapsed_seconds, 1)
+
+    def __str__(self):
+        return f"Rescoring {self.id} - project {self.project_id} ({self.processed}/{self.total})"
@@ -0,0 +1,290 @@
+"""
+Pipeline asíncrono de ingesta de CVs.
+
+El request de creación de una aplicación solo encola un CVProcessingJob; el
+worker (`python manage.py process_cv_jobs`) ejecuta las etapas en orden.
+Cada etapa se reintenta por separado y registra su duración, de modo que un
+fallo en el scoring no repite la extracción ni la llamada de parsing. Si el
+parsing falla en todos los intentos se guarda {"error": ...} en `extracted`
+y la aplicación igual se califica y se notifica a los admins.
+
+Con CV_COMBINED_LLM_CALL la etapa parse_cv extrae y califica en una sola
+llamada; si la respuesta no valida se usa el flujo de dos llamadas. Las
+etapas con IA registran latencia y tokens (ver `manage.py llm_usage_report`).
+"""
+import logging
+import os
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Application, CVProcessingJob
+from .utils import extract_text
+from .ai_client import CombinedResponseError, calculate_candidate_score, parse_and_score_cv
+from .cv_cache import get_cached_extraction, parse_cv_text_cached, store_extraction
+from .rescoring import skills_match
+from .scoring import refresh_summary_for_application
+
+logger = logging.getLogger(__name__)
+
+
+class StageError(Exception):
+    """Error recuperable dentro de una etapa del pipeline"""
+
+
+def _project_requirements(project):
+    return {
+        "title": project.title,
+        "skills": project.required_skills,
+        "description": project.description
+    }
+
+
+def _llm_info(mode, calls):
+    """Resumen de las llamadas a la IA que se guarda en el registro de la etapa"""
+    return {
+        "llm_mode": mode,
+        "llm_calls": calls,
+        "llm_latency_ms": round(sum(c["latency_ms"] for c in calls), 1),
+        "llm_tokens": sum(c["prompt_tokens"] + c["completion_tokens"] for c in calls),
+    }
+
+
+def _stage_extract_text(app, job):
+    if app.cv_file:
+        text = extract_text(app.cv_file.path)
+        app.parsed_text = text[:20000]
+        app.save(update_fields=["parsed_text"])
+
+
+def _stage_parse_cv(app, job):
+    extracted = None
+    cache_hit = False
+    calls = []
+    info = {}
+
+    if app.parsed_text and settings.CV_COMBINED_LLM_CALL:
+        if settings.CV_PARSE_CACHE_ENABLED:
+            extracted = get_cached_extraction(app.parsed_text, mode="combined")
+            cache_hit = extracted is not None
+        if extracted is None:
+            try:
+                extracted, scores = parse_and_score_cv(
+                    app.parsed_text, _project_requirements(app.project), metrics=calls
+                )
+                # La etapa score reutiliza estas notas en lugar de llamar a la IA
+                info["scores"] = scores
+                if settings.CV_PARSE_CACHE_ENABLED:
+                    store_extraction(app.parsed_text, extracted, mode="combined")
+            except CombinedResponseError as e:
+                logger.warning(f"⚠️ Modo combinado inválido para application {app.id}, se usan dos llamadas: {e}")
+                info["combined_fallback"] = str(e)
+                extracted = None
+
+    if extracted is None:
+        extracted = {}
+        if app.parsed_text:
+            try:
+                extracted, cache_hit = parse_cv_text_cached(app.parsed_text, metrics=calls)
+                # parse_cv_text devuelve {} cuando OpenAI falla: se reintenta la etapa
+                if not isinstance(extracted, dict) or not extracted:
+                    raise StageError("La IA retornó un formato inválido o vacío")
+            except Exception as e:
+                attempts = job.stages.get("parse_cv", {}).get("attempts", 0) + 1
+                if attempts < settings.CV_PIPELINE_MAX_ATTEMPTS:
+                    raise
+                # Último intento: se guarda el error y la aplicación igual se
+                # califica y se notifica a los admins
+                logger.error(f"❌ No se pudo parsear el CV de application {app.id}: {e}")
+                extracted = {"error": str(e)}
+                info["parse_error"] = str(e)
+
+    app.extracted = extracted
+    app.save(update_fields=["extracted"])
+
+    mode = "combined" if "scores" in info else "two_step"
+    return {"cache_hit": cache_hit, **info, **_llm_info(mode, calls)}
+
+
+def _stage_score(app, job):
+    calls = []
+    scores = job.stages.get("parse_cv", {}).get("scores")
+    mode = "combined"
+    if scores is None:
+        mode = "two_step"
+        scores = calculate_candidate_score(app.extracted, _project_requirements(app.project), metrics=calls)
+
+    s_score = scores.get("skills_score", 0)
+    e_score = scores.get("experience_score", 0)
+
+    # Pesos: Skills 40%, Experience 60%
+    final_score = (s_score * 0.4) + (e_score * 0.6)
+    logger.info(f"📊 Calificación application {app.id}: Skills({s_score}) + Exp({e_score}) = Total: {final_score}")
+
+    app.match_score = final_score * 10
+    app.skills_match_score = skills_match(app.project.required_skills, app.extracted)
+    app.experience_score = e_score
+    app.ai_analysis = scores.get("justification", "Sin análisis disponible")
+    app.save(update_fields=["match_score", "skills_match_score", "experience_score", "ai_analysis"])
+    refresh_summary_for_application(app)
+    return _llm_info(mode, calls)
+
+
+def _stage_notify(app, job):
+    from .email_service import notify_new_application
+    result = notify_new_application(app.id)
+    if not result.get("success"):
+        raise StageError(result.get("message", "Error notificando a los admins"))
+
+
+STAGES = [
+    ("extract_text", _stage_extract_text),
+    ("parse_cv", _stage_parse_cv),
+    ("score", _stage_score),
+    ("notify", _stage_notify),
+]
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_application(application):
+    """Crea (o reinicia) el job de procesamiento de una aplicación"""
+    job, created = CVProcessingJob.objects.get_or_create(application=application)
+    if not created:
+        job.status = "PENDING"
+        job.current_stage = ""
+        job.stages = {}
+        job.last_error = ""
+        job.available_at = timezone.now()
+        job.locked_at = None
+        job.locked_by = ""
+        job.finished_at = None
+        job.save()
+
+    Application.objects.filter(pk=application.pk).update(processing_status="PENDING")
+    application.processing_status = "PENDING"
+    return job
+
+
+def claim_next_job(worker=None):
+    """
+    Toma el siguiente job disponible con un lock de fila (SKIP LOCKED),
+    así varios workers pueden consumir la cola en paralelo.
+    También recupera jobs RUNNING cuyo worker murió (lock vencido).
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.CV_PIPELINE_LOCK_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        job = (
+            CVProcessingJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status="PENDING", available_at__lte=now) |
+                Q(status="RUNNING", locked_at__lt=stale)
+            )
+            .order_by("available_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "RUNNING"
+        job.locked_at = now
+        job.locked_by = worker or worker_id()
+        job.save(update_fields=["status", "locked_at", "locked_by", "updated_at"])
+    return job
+
+
+def run_job(job):
+    """
+    Ejecuta las etapas pendientes del job. Si una etapa falla se agenda un
+    reintento (solo de esa etapa) con backoff; al agotar los intentos el job
+    y la aplicación quedan en FAILED.
+    """
+    app = Application.objects.select_related("project").get(pk=job.application_id)
+    if app.processing_status != "PROCESSING":
+        app.processing_status = "PROCESSING"
+        app.save(update_fields=["processing_status"])
+
+    max_attempts = settings.CV_PIPELINE_MAX_ATTEMPTS
+
+    for name, stage in STAGES:
+        state = job.stages.get(name, {})
+        if state.get("status") == "done":
+            continue
+
+        job.current_stage = name
+        attempts = state.get("attempts", 0) + 1
+        started = time.perf_counter()
+        try:
+            # Una etapa puede retornar datos extra para el registro (ej: cache_hit)
+            info = stage(app, job) or {}
+        except Exception as e:
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            job.stages[name] = {
+                "status": "failed",
+                "attempts": attempts,
+                "duration_ms": duration_ms,
+                "error": str(e),
+            }
+            job.last_error = f"{name}: {e}"
+            job.locked_at = None
+            job.locked_by = ""
+
+            if attempts >= max_attempts:
+                logger.error(f"❌ Job {job.id} falló en '{name}' tras {attempts} intentos: {e}")
+                job.status = "FAILED"
+                job.finished_at = timezone.now()
+                job.save()
+                app.processing_status = "FAILED"
+                app.save(update_fields=["processing_status"])
+            else:
+                delay = settings.CV_PIPELINE_RETRY_DELAY_SECONDS * (2 ** (attempts - 1))
+                logger.warning(f"⚠️ Job {job.id} etapa '{name}' falló (intento {attempts}), reintento en {delay}s: {e}")
+                job.status = "PENDING"
+                job.available_at = timezone.now() + timedelta(seconds=delay)
+                job.save()
+            return job
+
+        job.stages[name] = {
+            "status": "done",
+            "attempts": attempts,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "error": "",
+            **info,
+        }
+        job.save(update_fields=["current_stage", "stages", "updated_at"])
+
+    job.status = "DONE"
+    job.current_stage = ""
+    job.last_error = ""
+    job.locked_at = None
+    job.locked_by = ""
+    job.finished_at = timezone.now()
+    job.save()
+
+    app.processing_status = "COMPLETED"
+    app.save(update_fields=["processing_status"])
+    logger.info(f"✅ Job {job.id} completado para application {app.id}")
+    return job
+
+
+def process_available_jobs(max_jobs=None, worker=None):
+    """Procesa jobs hasta vaciar la cola (o llegar a max_jobs). Retorna cuántos se procesaron."""
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = claim_next_job(worker)
+        if job is None:
+            break
+        try:
+            run_job(job)
+        except Application.DoesNotExist:
+            job.delete()
+        processed += 1
+    return processed
@@ -0,0 +1,174 @@
+"""
+Re-scoring masivo de aplicaciones de un proyecto.
+
+Cuando cambian los required_skills de un proyecto, la coincidencia de skills
+guardada queda desactualizada. Un RescoringJob recorre las aplicaciones por id
+ascendente reutilizando Application.extracted (sin llamar a la IA), puntúa
+los skills con SkillMatcher en un pool de procesos y guarda
+skills_match_score con bulk_update. En el mismo bulk_update recalcula
+match_score (0.4·skills + 0.6·experiencia) con la nota de experiencia que la
+IA dio al calificar (experience_score) y actualiza CandidateScoreSummary, así
+el ranking y el dashboard reflejan los skills nuevos. Las aplicaciones sin
+experience_score (calificadas antes de guardarla) conservan su match_score.
+Después de cada página se persiste el cursor, de modo que un job
+interrumpido se reanuda donde quedó.
+"""
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Application, CandidateScoreSummary, RescoringJob
+from .skill_matcher import SkillMatcher
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_skills(extracted):
+    """Skills técnicos del JSON extraído del CV"""
+    skills = (extracted or {}).get("skills") or []
+    if isinstance(skills, dict):
+        return skills.get("hard") or []
+    if isinstance(skills, list):
+        return skills
+    return []
+
+
+def skills_match(required_skills, extracted):
+    """skills_match_score de una aplicación (mismo cálculo que el re-scoring)"""
+    return SkillMatcher(required_skills or []).score_many([candidate_skills(extracted)])[0]
+
+
+def combined_match_score(skills_match_score, experience_score):
+    """match_score (0-100) con la misma ponderación que la etapa score del pipeline"""
+    return skills_match_score * 0.4 + experience_score * 10 * 0.6
+
+
+def score_chunk(required_skills, rows):
+    """
+    Puntúa [(application_id, extracted), ...]. Se ejecuta en los procesos del
+    pool, por eso solo recibe datos serializables y no toca la base de datos.
+    """
+    matcher = SkillMatcher(required_skills)
+    scores = matcher.score_many(candidate_skills(extracted) for _, extracted in rows)
+    return [(app_id, score) for (app_id, _), score in zip(rows, scores)]
+
+
+def enqueue_rescoring(project, user=None):
+    """Crea un job para el proyecto (o actualiza el que aún no empezó)"""
+    job = RescoringJob.objects.filter(project=project, status="PENDING").first()
+    if job is None:
+        job = RescoringJob(project=project, created_by=user)
+    job.required_skills = list(project.required_skills or [])
+    job.save()
+    return job
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def run_rescoring_job(job, workers=None, chunk_size=None, progress=None):
+    """
+    Ejecuta (o reanuda) un RescoringJob. `progress(job)` se llama después de
+    cada página guardada. Con workers=1 se puntúa en el mismo proceso.
+    """
+    workers = workers or settings.RESCORING_WORKERS
+    chunk_size = chunk_size or settings.RESCORING_CHUNK_SIZE
+
+    applications = Application.objects.filter(project_id=job.project_id)
+    if job.status != "RUNNING" or not job.total:
+        job.total = applications.count()
+    job.status = "RUNNING"
+    job.last_error = ""
+    job.started_at = job.started_at or timezone.now()
+    job.save()
+
+    # Una página entrega un chunk a cada proceso del pool
+    page_size = chunk_size * workers
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    started = time.perf_counter()
+    elapsed_before = job.elapsed_seconds
+
+    try:
+        while True:
+            page = list(
+                applications.filter(id__gt=job.last_application_id)
+                .order_by("id")
+                .values_list("id", "extracted", "experience_score", "match_score")[:page_size]
+            )
+            if not page:
+                break
+            rows = [(app_id, extracted) for app_id, extracted, _, _ in page]
+            previous = {app_id: (experience, match) for app_id, _, experience, match in page}
+
+            chunks = list(_chunks(rows, chunk_size))
+            if pool:
+                results = pool.map(score_chunk, [job.required_skills] * len(chunks), chunks)
+            else:
+                results = (score_chunk(job.required_skills, chunk) for chunk in chunks)
+            scored = [item for chunk_result in results for item in chunk_result]
+            match_scores = {}
+            for app_id, score in scored:
+                experience, match = previous[app_id]
+                match_scores[app_id] = match if experience is None else combined_match_score(score, experience)
+
+            with transaction.atomic():
+                Application.objects.bulk_update(
+                    [
+                        Application(id=app_id, skills_match_score=score, match_score=match_scores[app_id])
+                        for app_id, score in scored
+                    ],
+                    ["skills_match_score", "match_score"],
+                    batch_size=chunk_size,
+                )
+                summaries = list(
+                    CandidateScoreSummary.objects.filter(application_id__in=match_scores).only("id", "application_id")
+                )
+                for summary in summaries:
+                    summary.match_score = match_scores[summary.application_id]
+                CandidateScoreSummary.objects.bulk_update(summaries, ["match_score"], batch_size=chunk_size)
+                job.processed += len(scored)
+                job.last_application_id = rows[-1][0]
+                job.elapsed_seconds = elapsed_before + (time.perf_counter() - started)
+                job.save(update_fields=["processed", "last_application_id", "elapsed_seconds", "updated_at"])
+
+            if progress:
+                progress(job)
+    except Exception as e:
+        logger.error(f"❌ Rescoring {job.id} falló tras {job.processed} aplicaciones: {e}")
+        job.status = "FAILED"
+        job.last_error = str(e)
+        job.save(update_fields=["status", "last_error", "updated_at"])
+        raise
+    finally:
+        if pool:
+            pool.shutdown()
+
+    job.status = "DONE"
+    job.finished_at = timezone.now()
+    job.elapsed_seconds = elapsed_before + (time.perf_counter() - started)
+    job.save()
+    logger.info(f"✅ Rescoring {job.id}: {job.processed} aplicaciones ({job.throughput}/s)")
+    return job
+
+
+def process_pending_rescoring_jobs(workers=None, progress=None):
+    """Ejecuta los jobs pendientes. Retorna cuántos se procesaron."""
+    processed = 0
+    for job_id in RescoringJob.objects.filter(status="PENDING").order_by("created_at").values_list("id", flat=True):
+        # Tomar el job de forma atómica para no duplicarlo entre workers
+        claimed = RescoringJob.objects.filter(id=job_id, status="PENDING").update(status="RUNNING")
+        if not claimed:
+            continue
+        job = RescoringJob.objects.get(id=job_id)
+        try:
+            run_rescoring_job(job, workers=workers, progress=progress)
+        except Exception:
+            pass  # ya quedó en FAILED con el error registrado
+        processed += 1
+    return processed
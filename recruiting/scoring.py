@@ -0,0 +1,109 @@
+"""
+Mantenimiento de CandidateScoreSummary.
+
+Las vistas que cambian pruebas (evaluate_quiz, submit, evaluate_code*, start...)
+o el estado de una aplicación llaman a refresh_candidate_summary para
+recalcular solo la fila afectada; rebuild_score_summaries regenera la tabla.
+La fila se crea junto con la aplicación (Application.save), así que las
+aplicaciones sin puntaje también aparecen en el dashboard.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+
+from assessments.models import Assessment
+from .models import Application, CandidateScoreSummary
+
+logger = logging.getLogger(__name__)
+
+_FINISHED = Q(status__in=["EVALUATED", "COMPLETED"])
+
+SUMMARY_AGGREGATES = {
+    "avg_quiz": Avg("score", filter=Q(status="EVALUATED", assessment_type="QUIZ")),
+    "avg_coding": Avg("score", filter=Q(status="EVALUATED", assessment_type="CODING")),
+    "evaluated_count": Count("id", filter=Q(status="EVALUATED")),
+    "pending_count": Count("id", filter=Q(status="PENDING")),
+    "completed_avg": Avg("score", filter=_FINISHED),
+    "completed_count": Count("id", filter=_FINISHED),
+}
+
+
+def _summary_values(app, metrics):
+    return {
+        "candidate_id": app.candidate_id,
+        "project_id": app.project_id,
+        "avg_quiz": metrics.get("avg_quiz") or 0.0,
+        "avg_coding": metrics.get("avg_coding") or 0.0,
+        "evaluated_count": metrics.get("evaluated_count") or 0,
+        "pending_count": metrics.get("pending_count") or 0,
+        "completed_avg": metrics.get("completed_avg") or 0.0,
+        "completed_count": metrics.get("completed_count") or 0,
+        "match_score": app.match_score,
+        "status": app.status,
+    }
+
+
+def refresh_candidate_summary(candidate_id, project_id):
+    """Recalcula la fila de un (candidato, proyecto). Sin aplicación no hay fila."""
+    app = Application.objects.filter(candidate_id=candidate_id, project_id=project_id).first()
+    if app is None:
+        CandidateScoreSummary.objects.filter(candidate_id=candidate_id, project_id=project_id).delete()
+        return None
+
+    metrics = Assessment.objects.filter(
+        candidate_id=candidate_id, project_id=project_id
+    ).aggregate(**SUMMARY_AGGREGATES)
+
+    summary, _ = CandidateScoreSummary.objects.update_or_create(
+        application=app,
+        defaults=_summary_values(app, metrics),
+    )
+    return summary
+
+
+def refresh_summary_for_assessment(assessment):
+    try:
+        return refresh_candidate_summary(assessment.candidate_id, assessment.project_id)
+    except Exception as e:
+        # El resumen se puede reconstruir: no debe romper la acción principal
+        logger.error(f"Error actualizando resumen de puntajes para assessment {assessment.id}: {e}")
+        return None
+
+
+def refresh_summary_for_application(application):
+    try:
+        return refresh_candidate_summary(application.candidate_id, application.project_id)
+    except Exception as e:
+        logger.error(f"Error actualizando resumen de puntajes para application {application.id}: {e}")
+        return None
+
+
+def rebuild_score_summaries(project_id=None):
+    """Regenera la tabla completa (o de un proyecto) con 2 consultas de lectura"""
+    applications = Application.objects.all()
+    assessments = Assessment.objects.all()
+    if project_id is not None:
+        applications = applications.filter(project_id=project_id)
+        assessments = assessments.filter(project_id=project_id)
+
+    grouped = (
+        assessments.values("candidate_id", "project_id")
+        .annotate(**SUMMARY_AGGREGATES)
+        .order_by()
+    )
+    metrics = {(row["candidate_id"], row["project_id"]): row for row in grouped}
+
+    summaries = [
+        CandidateScoreSummary(application=app, **_summary_values(app, metrics.get((app.candidate_id, app.project_id), {})))
+        for app in applications.only("id", "candidate_id", "project_id", "match_score", "status")
+    ]
+
+    with transaction.atomic():
+        stale = CandidateScoreSummary.objects.all()
+        if project_id is not None:
+            stale = stale.filter(project_id=project_id)
+        stale.delete()
+        CandidateScoreSummary.objects.bulk_create(summaries, batch_size=500)
+
+    return len(summaries)
@@ -1,6 +1,6 @@
 # serializers.py
 from rest_framework import serializers
-from .models import Application
+from .models import Application, RescoringJob
 from django.contrib.auth.models import User
 
 class CandidateSerializer(serializers.ModelSerializer):
@@ -21,4 +21,18 @@ class ApplicationSerializer(serializers.ModelSerializer):
         model = Application
         fields = "__all__"
         # El status ya no es read_only para que los admins puedan actualizarlo
-        read_only_fields = ("candidate", "match_score", "parsed_text", "created_at","ai_analysis")
+        read_only_fields = ("candidate", "match_score", "skills_match_score", "experience_score", "parsed_text", "created_at","ai_analysis", "processing_status")
+
+
+class RescoringJobSerializer(serializers.ModelSerializer):
+    """Progreso de un re-scoring masivo"""
+    throughput = serializers.ReadOnlyField()
+
+    class Meta:
+        model = RescoringJob
+        fields = [
+            "id", "project", "status", "required_skills", "total", "processed",
+            "last_error", "created_at", "started_at", "finished_at",
+            "elapsed_seconds", "throughput",
+        ]
+        read_only_fields = fields
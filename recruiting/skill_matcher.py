@@ -0,0 +1,185 @@
+"""
+Motor de matching de skills indexado.
+
+compute_match_v2 comparaba cada skill requerido contra cada skill del
+candidato con SequenceMatcher y normalizaba ambas listas en cada llamada.
+Aquí se precompila el vocabulario normalizado (memoizado), se indexan los
+skills por trigramas para probar primero los más parecidos y se cachea el
+peso de cada par (requerido, candidato), de modo que al puntuar muchos
+candidatos contra un mismo proyecto cada par se evalúa una sola vez.
+
+Los puntajes son idénticos a los de la implementación original: los
+trigramas solo deciden el orden de evaluación; la poda usa cotas superiores
+exactas de SequenceMatcher (real_quick_ratio / quick_ratio).
+"""
+from collections import defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from .utils import normalize_skill
+
+# (umbral de similitud, peso) en orden descendente
+MATCH_THRESHOLDS = ((0.90, 1.0), (0.75, 0.7), (0.60, 0.4))
+CONTAINMENT_SIMILARITY = 0.95
+
+
+@lru_cache(maxsize=8192)
+def normalized(skill):
+    """normalize_skill memoizado (es una función pura)"""
+    return normalize_skill(skill)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def weight_for_similarity(sim):
+    for threshold, weight in MATCH_THRESHOLDS:
+        if sim >= threshold:
+            return weight
+    return 0.0
+
+
+def _normalize_list(skills):
+    result = []
+    for s in skills or []:
+        if not s:
+            continue
+        n = normalized(s)
+        if n:
+            result.append(n)
+    return result
+
+
+def _final_score(per_skill_scores, unique_stack_size):
+    base_score = (sum(per_skill_scores) / len(per_skill_scores)) * 100.0
+    # BONUS por amplitud de stack (máx 10 puntos extra)
+    breadth_bonus = min(unique_stack_size / 10.0, 1.0) * 10.0
+    final_score = base_score * 0.9 + breadth_bonus * 0.1
+    return round(min(final_score, 100.0), 1)
+
+
+class SkillVocabulary:
+    """Skills normalizados con su índice de trigramas"""
+
+    def __init__(self):
+        self._grams = {}
+        self._index = defaultdict(set)
+
+    def add(self, skill):
+        if skill not in self._grams:
+            grams = trigrams(skill)
+            self._grams[skill] = grams
+            for g in grams:
+                self._index[g].add(skill)
+        return self._grams[skill]
+
+    def ranked(self, query, within):
+        """
+        Retorna los skills de `within` ordenados por trigramas compartidos con
+        `query` (más parecidos primero). Los que no comparten ninguno van al
+        final: aun así pueden superar los umbrales y se evalúan igual.
+        """
+        shared = defaultdict(int)
+        for g in self.add(query):
+            for skill in self._index.get(g, ()):
+                if skill in within:
+                    shared[skill] += 1
+        hits = sorted(shared, key=lambda s: (-shared[s], s))
+        return hits + sorted(s for s in within if s not in shared)
+
+
+class SkillMatcher:
+    """
+    Puntúa candidatos contra los skills requeridos de un proyecto.
+
+        matcher = SkillMatcher(project.required_skills)
+        scores = matcher.score_many([app.extracted.get("skills") for app in apps])
+    """
+
+    def __init__(self, required_skills, vocabulary=None):
+        self.required = _normalize_list(required_skills)
+        self.vocabulary = vocabulary or SkillVocabulary()
+        self._weights = {}
+        for req in self.required:
+            self.vocabulary.add(req)
+
+    def pair_weight(self, req, cand):
+        key = (req, cand)
+        weight = self._weights.get(key)
+        if weight is None:
+            weight = self._compute_weight(req, cand)
+            self._weights[key] = weight
+        return weight
+
+    @staticmethod
+    def _compute_weight(req, cand):
+        if req == cand or req in cand or cand in req:
+            return 1.0  # similitud >= 0.95
+        matcher = SequenceMatcher(None, req, cand)
+        # Cotas superiores baratas antes del ratio completo
+        floor = MATCH_THRESHOLDS[-1][0]
+        if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+            return 0.0
+        return weight_for_similarity(matcher.ratio())
+
+    def _best_weight(self, req, cand_set):
+        if req in cand_set:
+            return 1.0
+        best = 0.0
+        for cand in self.vocabulary.ranked(req, cand_set):
+            w = self.pair_weight(req, cand)
+            if w > best:
+                best = w
+                if best == 1.0:
+                    break
+        return best
+
+    def score(self, candidate_skills):
+        if not self.required:
+            return 0.0
+        cand_norm = _normalize_list(candidate_skills)
+        if not cand_norm:
+            return 0.0
+
+        cand_set = set(cand_norm)
+        for cand in cand_set:
+            self.vocabulary.add(cand)
+
+        per_skill_scores = [self._best_weight(req, cand_set) for req in self.required]
+        return _final_score(per_skill_scores, len(cand_set))
+
+    def score_many(self, candidates_skills):
+        """Puntúa una lista de listas de skills en una sola pasada"""
+        return [self.score(skills) for skills in candidates_skills]
+
+
+def reference_compute_match_v2(required_skills, candidate_skills):
+    """
+    Implementación original (par a par con SequenceMatcher).
+    Se mantiene como referencia para tests y el benchmark.
+    """
+    if not required_skills:
+        return 0.0
+
+    req_norm = [normalize_skill(s) for s in required_skills if s]
+    cand_norm = [normalize_skill(s) for s in candidate_skills or [] if s]
+    req_norm = [s for s in req_norm if s]
+    cand_norm = [s for s in cand_norm if s]
+
+    if not req_norm or not cand_norm:
+        return 0.0
+
+    per_skill_scores = []
+    for req in req_norm:
+        best = 0.0
+        for cand in cand_norm:
+            sim = SequenceMatcher(None, req, cand).ratio()
+            if req in cand or cand in req:
+                sim = max(sim, CONTAINMENT_SIMILARITY)
+            if sim > best:
+                best = sim
+        per_skill_scores.append(weight_for_similarity(best))
+
+    return _final_score(per_skill_scores, len(set(cand_norm)))
@@ -1,7 +1,9 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth.models import User
 from rest_framework.test import APITestCase
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, Mock, MagicMock, mock_open
 import json
 
 from .utils import (
@@ -10,9 +12,15 @@ from .utils import (
     normalize_skill,
     compute_match_v2
 )
-from .ai_client import parse_cv_text, analyze_meeting_transcript
-from .models import Application
+from .ai_client import parse_cv_text, analyze_meeting_transcript, CombinedResponseError
+from .models import Application, CVProcessingJob, CVParseCache, CandidateScoreSummary, RescoringJob
+from .pipeline import enqueue_application, run_job
+from .cv_cache import get_cached_extraction, parse_cv_text_cached, cv_cache_key, store_extraction
+from .scoring import rebuild_score_summaries
+from .skill_matcher import SkillMatcher, reference_compute_match_v2
+from .rescoring import enqueue_rescoring, run_rescoring_job
 from projects.models import Project
+from assessments.models import Assessment
 
 
 class CVExtractionTestCase(TestCase):
@@ -102,11 +110,25 @@ class SkillMatchingTestCase(TestCase):
         # Debería tener un buen match considerando sinónimos y match parcial
         self.assertGreater(score, 50.0)
 
+    def test_skill_matcher_matches_reference(self):
+        """Test: SkillMatcher da los mismos puntajes que el algoritmo original"""
+        required = ["Python", "Django", "React", ".NET MAUI", "SQL Server", "Docker"]
+        candidates = [
+            ["python developer", "djang", "reactjs"],
+            ["C Sharp", "dotnet", "mssql", "Dockr"],
+            ["Java", "Spring Boot", "Kotlin"],
+            ["Pyton", "Flask", "React Native", "PostgreSQL", "docker compose"],
+            [],
+        ]
+        scores = SkillMatcher(required).score_many(candidates)
+        self.assertEqual(scores, [reference_compute_match_v2(required, c) for c in candidates])
+        self.assertEqual(scores[0], compute_match_v2(required, candidates[0]))
+
 
 class AIClientTestCase(TestCase):
     """Tests para el cliente de IA de recruiting"""
 
-    @patch('recruiting.ai_client.client')
+    @patch('core.openai_client._client')
     def test_parse_cv_text_success(self, mock_client):
         """Test: Parsing exitoso de CV con IA"""
         # Mock de respuesta de OpenAI
@@ -135,7 +157,7 @@ class AIClientTestCase(TestCase):
         self.assertIn("juan@example.com", result["emails"])
         self.assertIn("Python", result["skills"]["hard"])
 
-    @patch('recruiting.ai_client.client')
+    @patch('core.openai_client._client')
     def test_analyze_meeting_transcript_success(self, mock_client):
         """Test: Análisis exitoso de transcript de reunión"""
         mock_response = MagicMock()
@@ -237,3 +259,426 @@ class SkillNormalizationEdgeCasesTestCase(TestCase):
         self.assertEqual(normalize_skill(""), "")
         self.assertEqual(normalize_skill(None), "")
         self.assertEqual(normalize_skill("   "), "")
+
+
+class CVProcessingPipelineTestCase(APITestCase):
+    """Tests para la cola asíncrona de procesamiento de CVs"""
+
+    def setUp(self):
+        self.candidate = User.objects.create_user(
+            username='pipeline_candidate',
+            password='test123',
+            email='pipeline@test.com'
+        )
+        self.project = Project.objects.create(
+            title="Proyecto Pipeline",
+            description="Proyecto para testing del pipeline",
+            required_skills=["Python", "Django"]
+        )
+
+    def test_create_application_returns_202_and_enqueues(self):
+        """Test: Crear una aplicación responde 202 y deja el job pendiente"""
+        self.client.force_authenticate(user=self.candidate)
+
+        response = self.client.post(
+            '/api/recruiting/applications/',
+            {"project": self.project.id},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['processing_status'], 'PENDING')
+        job = CVProcessingJob.objects.get(application_id=response.json()['id'])
+        self.assertEqual(job.status, 'PENDING')
+
+        poll = self.client.get(f"/api/recruiting/applications/{response.json()['id']}/processing/")
+        self.assertEqual(poll.status_code, 200)
+        self.assertEqual(poll.json()['processing_status'], 'PENDING')
+
+    @patch('recruiting.email_service.notify_new_application', return_value={"success": True})
+    @patch('recruiting.pipeline.calculate_candidate_score')
+    @patch('recruiting.cv_cache.parse_cv_text')
+    def test_failed_stage_is_retried_alone(self, mock_parse, mock_score, mock_notify):
+        """Test: Una etapa fallida se reintenta sin repetir las anteriores"""
+        mock_parse.return_value = {"full_name": "Ana", "skills": {"hard": ["Python"], "soft": []}}
+        mock_score.side_effect = [
+            Exception("timeout"),
+            {"skills_score": 8, "experience_score": 6, "justification": "OK"},
+        ]
+        application = Application.objects.create(
+            candidate=self.candidate,
+            project=self.project,
+            parsed_text="Ana - Python developer",
+            processing_status="PENDING"
+        )
+        job = enqueue_application(application)
+
+        job = run_job(job)
+        self.assertEqual(job.status, 'PENDING')
+        self.assertEqual(job.stages['parse_cv']['status'], 'done')
+        self.assertEqual(job.stages['score']['status'], 'failed')
+
+        job = run_job(job)
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(job.stages['score']['attempts'], 2)
+        self.assertIn('duration_ms', job.stages['notify'])
+        self.assertEqual(mock_parse.call_count, 1)
+
+        application.refresh_from_db()
+        self.assertEqual(application.processing_status, 'COMPLETED')
+        self.assertAlmostEqual(application.match_score, 68.0)
+        self.assertEqual(application.skills_match_score, compute_match_v2(["Python", "Django"], ["Python"]))
+        self.assertEqual(application.experience_score, 6)
+
+    @override_settings(CV_PIPELINE_MAX_ATTEMPTS=2)
+    @patch('recruiting.email_service.notify_new_application', return_value={"success": True})
+    @patch('recruiting.pipeline.calculate_candidate_score')
+    @patch('recruiting.cv_cache.parse_cv_text', return_value={})
+    def test_exhausted_parse_still_scores_and_notifies(self, mock_parse, mock_score, mock_notify):
+        """Test: Si el parsing falla en todos los intentos se guarda el error y se notifica igual"""
+        mock_score.return_value = {"skills_score": 2, "experience_score": 2, "justification": "Sin datos"}
+        application = Application.objects.create(
+            candidate=self.candidate, project=self.project,
+            parsed_text="Ana - Python developer", processing_status="PENDING"
+        )
+
+        job = run_job(enqueue_application(application))
+        self.assertEqual(job.stages['parse_cv']['status'], 'failed')
+        mock_notify.assert_not_called()
+
+        job = run_job(job)
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(mock_parse.call_count, 2)
+        self.assertIn('parse_error', job.stages['parse_cv'])
+        mock_notify.assert_called_once_with(application.id)
+        application.refresh_from_db()
+        self.assertIn('error', application.extracted)
+        self.assertEqual(application.processing_status, 'COMPLETED')
+        self.assertAlmostEqual(application.match_score, 20.0)
+
+    @override_settings(CV_COMBINED_LLM_CALL=True)
+    @patch('recruiting.email_service.notify_new_application', return_value={"success": True})
+    @patch('recruiting.pipeline.calculate_candidate_score')
+    @patch('core.openai_client._client')
+    def test_combined_mode_single_call(self, mock_client, mock_score, mock_notify):
+        """Test: El modo combinado extrae y califica con una sola llamada y registra tokens"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = json.dumps({
+            "extracted": {"full_name": "Ana", "emails": [], "skills": {"hard": ["Python"], "soft": []}},
+            "scores": {"skills_score": 8, "experience_score": 6, "justification": "OK"},
+        })
+        mock_response.usage = Mock(prompt_tokens=900, completion_tokens=150)
+        mock_client.chat.completions.create.return_value = mock_response
+
+        application = Application.objects.create(
+            candidate=self.candidate, project=self.project,
+            parsed_text="Ana - Python developer", processing_status="PENDING"
+        )
+        job = run_job(enqueue_application(application))
+
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(mock_client.chat.completions.create.call_count, 1)
+        mock_score.assert_not_called()
+        self.assertEqual(job.stages['parse_cv']['llm_mode'], 'combined')
+        self.assertEqual(job.stages['parse_cv']['llm_tokens'], 1050)
+        application.refresh_from_db()
+        self.assertAlmostEqual(application.match_score, 68.0)
+        self.assertEqual(application.extracted['full_name'], 'Ana')
+
+    @override_settings(CV_COMBINED_LLM_CALL=True)
+    @patch('recruiting.email_service.notify_new_application', return_value={"success": True})
+    @patch('recruiting.pipeline.calculate_candidate_score')
+    @patch('recruiting.cv_cache.parse_cv_text')
+    @patch('recruiting.pipeline.parse_and_score_cv')
+    def test_combined_mode_falls_back_to_two_calls(self, mock_combined, mock_parse, mock_score, mock_notify):
+        """Test: Si la respuesta combinada no valida se usan las dos llamadas"""
+        mock_combined.side_effect = CombinedResponseError("'skills_score' debe ser un número entre 0 y 10")
+        mock_parse.return_value = {"full_name": "Ana", "skills": {"hard": ["Python"], "soft": []}}
+        mock_score.return_value = {"skills_score": 5, "experience_score": 5, "justification": "OK"}
+
+        application = Application.objects.create(
+            candidate=self.candidate, project=self.project,
+            parsed_text="Ana - Python developer", processing_status="PENDING"
+        )
+        job = run_job(enqueue_application(application))
+
+        self.assertEqual(job.status, 'DONE')
+        self.assertEqual(job.stages['parse_cv']['llm_mode'], 'two_step')
+        self.assertIn('combined_fallback', job.stages['parse_cv'])
+        mock_parse.assert_called_once()
+        mock_score.assert_called_once()
+
+
+class CVParseCacheTestCase(TestCase):
+    """Tests para el cache por contenido de parse_cv_text"""
+
+    @patch('recruiting.cv_cache.parse_cv_text')
+    def test_same_cv_reuses_cached_extraction(self, mock_parse):
+        """Test: El mismo CV (con distinto espaciado) no vuelve a llamar a la IA"""
+        mock_parse.return_value = {"full_name": "Ana", "emails": [], "skills": {"hard": ["Python"]}}
+
+        first, first_hit = parse_cv_text_cached("Ana Pérez\nPython  developer")
+        second, second_hit = parse_cv_text_cached("  Ana Pérez Python developer ")
+
+        self.assertFalse(first_hit)
+        self.assertTrue(second_hit)
+        self.assertEqual(first, second)
+        self.assertEqual(mock_parse.call_count, 1)
+        self.assertEqual(CVParseCache.objects.get().hits, 1)
+
+    @patch('recruiting.cv_cache.parse_cv_text')
+    def test_failed_parse_is_not_cached(self, mock_parse):
+        """Test: Una respuesta vacía de la IA no se guarda en cache"""
+        mock_parse.return_value = {}
+        parse_cv_text_cached("CV sin respuesta")
+        self.assertFalse(CVParseCache.objects.exists())
+
+    @patch('recruiting.cv_cache.parse_cv_text')
+    def test_combined_extraction_is_not_reused_by_two_step_parse(self, mock_parse):
+        """Test: Lo extraído con el prompt combinado no se sirve como resultado de dos llamadas"""
+        combined = {"full_name": "Ana (combinado)", "skills": {"hard": ["Python"]}}
+        mock_parse.return_value = {"full_name": "Ana", "skills": {"hard": ["Python"]}}
+        store_extraction("Ana - Python developer", combined, mode="combined")
+
+        extracted, hit = parse_cv_text_cached("Ana - Python developer")
+
+        self.assertFalse(hit)
+        self.assertEqual(extracted["full_name"], "Ana")
+        self.assertEqual(get_cached_extraction("Ana - Python developer", mode="combined"), combined)
+        self.assertNotEqual(cv_cache_key("x"), cv_cache_key("x", mode="combined"))
+
+    @override_settings(CV_PARSE_CACHE_MAX_ENTRIES=2)
+    @patch('recruiting.cv_cache.parse_cv_text')
+    def test_lru_eviction(self, mock_parse):
+        """Test: Al superar el máximo se elimina la entrada menos usada"""
+        mock_parse.return_value = {"full_name": "X"}
+        parse_cv_text_cached("cv uno")
+        parse_cv_text_cached("cv dos")
+        parse_cv_text_cached("cv uno")  # hit: "cv dos" queda como la menos usada
+        parse_cv_text_cached("cv tres")
+
+        keys = set(CVParseCache.objects.values_list('key', flat=True))
+        self.assertEqual(keys, {cv_cache_key("cv uno"), cv_cache_key("cv tres")})
+
+
+class DashboardStatsTestCase(APITestCase):
+    """Tests para el endpoint de estadísticas del dashboard"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='stats_admin', password='admin123', is_staff=True
+        )
+        self.project = Project.objects.create(
+            title="Proyecto Stats",
+            description="Proyecto para estadísticas",
+            required_skills=["Python"]
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def _create_candidate(self, idx, match_score, quiz_score=None, coding_score=None):
+        candidate = User.objects.create_user(
+            username=f'stats_candidate_{idx}', password='test123', email=f'stats{idx}@test.com'
+        )
+        for assessment_type, score in (('QUIZ', quiz_score), ('CODING', coding_score)):
+            Assessment.objects.create(
+                candidate=candidate,
+                project=self.project,
+                assessment_type=assessment_type,
+                title=f"{assessment_type} {idx}",
+                status='EVALUATED' if score is not None else 'PENDING',
+                score=score
+            )
+        # Al crear la aplicación se arma su fila con las pruebas que ya existan
+        Application.objects.create(candidate=candidate, project=self.project, match_score=match_score)
+        return candidate
+
+    def _query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/recruiting/applications/stats/', {'quiz_weight': 30})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_ranking_uses_weighted_averages(self):
+        """Test: El ranking aplica los pesos quiz/coding y cuenta pendientes"""
+        self._create_candidate(1, match_score=80, quiz_score=100, coding_score=50)
+        self._create_candidate(2, match_score=60, quiz_score=40)
+
+        _, data = self._query_count()
+
+        ranking = data['ranking_candidates']
+        self.assertEqual(ranking[0]['candidate_name'], 'stats1@test.com')
+        self.assertEqual(ranking[0]['promedio_tecnico'], 65.0)  # 100*0.3 + 50*0.7
+        self.assertEqual(ranking[0]['num_pruebas'], 2)
+        self.assertEqual(ranking[1]['num_pruebas_pendiente'], 1)
+        self.assertEqual(data['kpis']['applications'], 2)
+        self.assertEqual(data['top_candidates'][0]['tests_count'], 2)
+
+    def test_query_count_is_constant(self):
+        """Test: El número de queries no crece con la cantidad de aplicaciones"""
+        self._create_candidate(1, match_score=70, quiz_score=90, coding_score=80)
+        small_count, _ = self._query_count()
+
+        for idx in range(2, 12):
+            self._create_candidate(idx, match_score=50 + idx, quiz_score=60, coding_score=idx * 5)
+        large_count, data = self._query_count()
+
+        self.assertEqual(len(data['ranking_candidates']), 11)
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, 7)
+
+
+class CandidateScoreSummaryTestCase(APITestCase):
+    """Tests para la tabla materializada de puntajes por candidato"""
+
+    def setUp(self):
+        self.candidate = User.objects.create_user(
+            username='summary_candidate', password='test123', email='summary@test.com'
+        )
+        self.admin = User.objects.create_user(
+            username='summary_admin', password='admin123', is_staff=True
+        )
+        self.project = Project.objects.create(title="Proyecto Resumen", required_skills=["Python"])
+        self.application = Application.objects.create(
+            candidate=self.candidate, project=self.project, match_score=75
+        )
+
+    def test_evaluate_quiz_updates_summary(self):
+        """Test: Evaluar un quiz actualiza el promedio del resumen"""
+        from assessments.models import Question, CandidateAnswer
+
+        assessment = Assessment.objects.create(
+            candidate=self.candidate, project=self.project,
+            assessment_type='QUIZ', title="Quiz resumen"
+        )
+        question = Question.objects.create(
+            assessment=assessment, question_type='MULTIPLE_CHOICE',
+            question_text="¿2+2?", options=["3", "4"], correct_answer="1", points=10
+        )
+        CandidateAnswer.objects.create(question=question, candidate=self.candidate, answer_text="1")
+
+        self.client.force_authenticate(user=self.candidate)
+        response = self.client.post(f'/api/assessments/assessments/{assessment.id}/evaluate_quiz/')
+        self.assertEqual(response.status_code, 200)
+
+        summary = CandidateScoreSummary.objects.get(candidate=self.candidate, project=self.project)
+        self.assertEqual(summary.avg_quiz, 100.0)
+        self.assertEqual(summary.evaluated_count, 1)
+        self.assertEqual(summary.match_score, 75)
+
+    def test_new_application_is_ranked_before_scoring(self):
+        """Test: Una aplicación recién creada (CV sin procesar) ya aparece en el ranking"""
+        newcomer = User.objects.create_user(username='summary_new', password='test123', email='new@test.com')
+        self.client.force_authenticate(user=newcomer)
+        response = self.client.post('/api/recruiting/applications/', {"project": self.project.id}, format='json')
+        self.assertEqual(response.status_code, 202)
+
+        self.client.force_authenticate(user=self.admin)
+        data = self.client.get('/api/recruiting/applications/stats/').json()
+        self.assertEqual(
+            {row['candidate_name'] for row in data['ranking_candidates']}, {'summary@test.com', 'new@test.com'}
+        )
+        self.assertEqual(len(data['top_candidates']), 2)
+
+    def test_update_status_updates_summary(self):
+        """Test: Cambiar el estado de la aplicación se refleja en el resumen"""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.patch(
+            f'/api/recruiting/applications/{self.application.id}/update_status/',
+            {"status": "APPROVED"},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(CandidateScoreSummary.objects.get(application=self.application).status, 'APPROVED')
+
+    def test_full_update_updates_summary(self):
+        """Test: Un PUT de la aplicación también actualiza el resumen"""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.put(
+            f'/api/recruiting/applications/{self.application.id}/',
+            {"project": self.project.id, "status": "REJECTED"},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(CandidateScoreSummary.objects.get(application=self.application).status, 'REJECTED')
+
+    def test_rebuild_score_summaries(self):
+        """Test: La reconstrucción genera una fila por aplicación"""
+        Assessment.objects.create(
+            candidate=self.candidate, project=self.project, assessment_type='CODING',
+            title="Coding", status='EVALUATED', score=80
+        )
+        self.assertEqual(rebuild_score_summaries(), 1)
+        summary = CandidateScoreSummary.objects.get(application=self.application)
+        self.assertEqual(summary.avg_coding, 80.0)
+        self.assertEqual(summary.completed_count, 1)
+
+
+class RescoringTestCase(APITestCase):
+    """Tests para el re-scoring masivo de aplicaciones"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='rescore_admin', password='admin123', is_staff=True)
+        self.project = Project.objects.create(title="Proyecto Rescoring", required_skills=["Java"])
+        self.apps = []
+        # La última se calificó antes de guardar experience_score
+        for i, (skills, experience) in enumerate([(["Python", "Django"], 5), (["Java"], 8), (["React", "Node.js"], None)]):
+            candidate = User.objects.create_user(username=f'rescore_{i}', password='test123')
+            self.apps.append(Application.objects.create(
+                candidate=candidate, project=self.project,
+                extracted={"skills": {"hard": skills, "soft": []}}, match_score=50, experience_score=experience
+            ))
+
+    def test_rescoring_uses_extracted_skills(self):
+        """Test: Recalcula skills_match_score y match_score con los skills y la experiencia guardados"""
+        self.project.required_skills = ["Python", "Django"]
+        self.project.save()
+
+        job = run_rescoring_job(enqueue_rescoring(self.project), workers=2, chunk_size=1)
+
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual((job.total, job.processed), (3, 3))
+        for app in self.apps:
+            app.refresh_from_db()
+            skills = app.extracted["skills"]["hard"]
+            self.assertEqual(app.skills_match_score, compute_match_v2(["Python", "Django"], skills))
+        self.assertAlmostEqual(self.apps[0].match_score, self.apps[0].skills_match_score * 0.4 + 30)
+        self.assertAlmostEqual(self.apps[1].match_score, self.apps[1].skills_match_score * 0.4 + 48)
+        self.assertEqual(self.apps[2].match_score, 50)  # sin experience_score no se puede recalcular
+        self.assertAlmostEqual(
+            CandidateScoreSummary.objects.get(application=self.apps[0]).match_score, self.apps[0].match_score
+        )
+
+    def test_rescoring_resumes_from_cursor(self):
+        """Test: Un job interrumpido continúa desde la última aplicación guardada"""
+        job = enqueue_rescoring(self.project)
+        job.status = "FAILED"
+        job.processed = 1
+        job.last_application_id = self.apps[0].id
+        job.save()
+
+        job = run_rescoring_job(job, workers=1)
+
+        self.assertEqual(job.processed, 3)
+        self.apps[0].refresh_from_db()
+        self.assertIsNone(self.apps[0].skills_match_score)  # ya procesada, no se toca
+        self.apps[1].refresh_from_db()
+        self.assertEqual(self.apps[1].skills_match_score, compute_match_v2(["Java"], ["Java"]))
+
+    def test_updating_required_skills_enqueues_job(self):
+        """Test: Editar required_skills encola un re-scoring consultable por API"""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.patch(
+            f'/api/projects/{self.project.id}/', {"required_skills": ["Go"]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(RescoringJob.objects.filter(project=self.project, status="PENDING").count(), 1)
+
+        response = self.client.get(f'/api/projects/{self.project.id}/rescore/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["required_skills"], ["Go"])
+
+        response = self.client.post(f'/api/projects/{self.project.id}/rescore/')
+        self.assertEqual(response.status_code, 202)
+        # Reutiliza el job que aún no empezó
+        self.assertEqual(RescoringJob.objects.filter(project=self.project).count(), 1)
@@ -121,54 +121,9 @@ def compute_match_v2(required_skills, candidate_skills):
       - Normaliza skills (minúsculas + sinónimos).
       - Usa similitud difusa (fuzzy) para emparejar.
       - Da un bonus pequeño por amplitud de stack.
-    """
-    if not required_skills:
-        return 0.0
-
-    # Normalizar listas
-    req_norm = [normalize_skill(s) for s in required_skills if s]
-    cand_norm = [normalize_skill(s) for s in candidate_skills or [] if s]
-
-    # eliminar vacíos
-    req_norm = [s for s in req_norm if s]
-    cand_norm = [s for s in cand_norm if s]
-
-    if not req_norm or not cand_norm:
-        return 0.0
-
-    per_skill_scores = []
-
-    for req in req_norm:
-        best = 0.0
-        for cand in cand_norm:
-            sim = similarity(req, cand)
 
-            if req and cand and (req in cand or cand in req):
-                sim = max(sim, 0.95)
-
-            if sim > best:
-                best = sim
-
-        if best >= 0.90:
-            weight = 1.0      # match casi exacto o contenido dentro
-        elif best >= 0.75:
-            weight = 0.7
-        elif best >= 0.60:
-            weight = 0.4
-        else:
-            weight = 0.0
-
-        per_skill_scores.append(weight)
-
-    # Score base: promedio de pesos (0–1) → 0–100
-    if per_skill_scores:
-        base_score = (sum(per_skill_scores) / len(per_skill_scores)) * 100.0
-    else:
-        base_score = 0.0
-
-    # BONUS por amplitud de stack (máx 10 puntos extra)
-    unique_stack = set(cand_norm)
-    breadth_bonus = min(len(unique_stack) / 10.0, 1.0) * 10.0
-
-    final_score = base_score * 0.9 + breadth_bonus * 0.1  # 90% skills requeridos, 10% amplitud
-    return round(min(final_score, 100.0), 1)
\ No newline at end of file
+    Para puntuar muchos candidatos contra un mismo proyecto usar
+    SkillMatcher(required_skills).score_many(...), que reutiliza el índice.
+    """
+    from .skill_matcher import SkillMatcher
+    return SkillMatcher(required_skills).score(candidate_skills)
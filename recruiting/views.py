@@ -4,11 +4,11 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action,api_view
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from .models import Application,Project, Assessment
+from .models import Application,Project, Assessment, CVProcessingJob, CandidateScoreSummary
+from .scoring import refresh_summary_for_application
 from .serializers import ApplicationSerializer
-from .utils import extract_text, compute_match, compute_match_v2
-from .ai_client import calculate_candidate_score, parse_cv_text
-from django.db.models import Count, Avg
+from .pipeline import enqueue_application
+from django.db.models import Count, Avg, F, FloatField, ExpressionWrapper
 from django.db.models.functions import TruncDate
 from django.db.models import Q
 
@@ -20,11 +20,14 @@ class ApplicationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
+        """
+        Dashboard de reclutamiento.
+        El ranking se lee de CandidateScoreSummary y el resto de métricas de
+        consultas agrupadas: el número de queries es constante.
+        """
         project_id = request.query_params.get('project_id')
         status_filter = request.query_params.get('status') # Recibimos el filtro del gráfico circular
         filters = Q()
-        # Empezamos con una consulta vacía (trae todo por defecto)
-        ranking_data = []
 
         # Si hay proyecto, filtramos por proyecto
         if project_id and project_id != 'null' and project_id != '':
@@ -34,56 +37,40 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         if status_filter and status_filter != 'null' and status_filter != '':
             filters &= Q(status=status_filter)
 
-        if project_id: filters &= Q(project_id=project_id)
-        if status_filter: filters &= Q(status=status_filter)
         quiz_weight_raw = float(request.query_params.get('quiz_weight', 50))
         quiz_w = quiz_weight_raw / 100
         coding_w = 1 - quiz_w
-        applications = Application.objects.filter(filters).select_related('candidate', 'project')
-  
 
-        for app in applications:
-            # 3. Obtenemos los promedios de ese candidato por tipo en MySQL
-            # Solo tomamos evaluaciones finalizadas (EVALUATED o COMPLETED)
-            base_scores = Assessment.objects.filter(
-                candidate_id=app.candidate_id,
-                project_id=app.project_id,
-                status__in=['EVALUATED']
-            ).values('assessment_type').annotate(average=Avg('score'))
-
-            # Inicializamos variables para el cálculo
-            avg_quiz = 0
-            avg_coding = 0
-            
-            for score_data in base_scores:
-                if score_data['assessment_type'] == 'QUIZ':
-                    avg_quiz = score_data['average']
-                elif score_data['assessment_type'] == 'CODING':
-                    avg_coding = score_data['average']
-
-
-            weighted_technical_avg = (avg_quiz * quiz_w) + (avg_coding * coding_w)
+        # Ranking desde la tabla materializada: la ponderación del slider se aplica en SQL
+        summaries = list(
+            CandidateScoreSummary.objects.filter(filters)
+            .select_related('candidate', 'project')
+            .annotate(weighted_technical_avg=ExpressionWrapper(
+                F('avg_quiz') * quiz_w + F('avg_coding') * coding_w,
+                output_field=FloatField()
+            ))
+            .order_by('-weighted_technical_avg', '-match_score', 'id')
+        )
 
+        ranking_data = []
+        for summary in summaries:
             ranking_data.append({
-                "candidate_name": app.candidate.email, # Usamos el email como en tu dashboard
-                "project_title": app.project.title,
-                "num_pruebas_pendiente": Assessment.objects.filter(candidate_id=app.candidate_id, project_id=app.project_id, status='PENDING').count(),
-                "ia_match": f"{app.match_score}%", # El score de 60/40 de tu US03
-                "promedio_tecnico": round(weighted_technical_avg, 1), # Este es el que cambia con el slider
-                "num_pruebas": Assessment.objects.filter(candidate_id=app.candidate_id, project_id=app.project_id, status='EVALUATED').count(),
-                "status": app.status
+                "candidate_name": summary.candidate.email, # Usamos el email como en tu dashboard
+                "project_title": summary.project.title,
+                "num_pruebas_pendiente": summary.pending_count,
+                "ia_match": f"{summary.match_score}%", # El score de 60/40 de tu US03
+                "promedio_tecnico": round(summary.weighted_technical_avg, 1), # Este es el que cambia con el slider
+                "num_pruebas": summary.evaluated_count,
+                "status": summary.status
             })
 
-        # 5. Reordenamos el ranking basado en el nuevo promedio técnico calculado
-        # Esto permite que el ranking cambie en tiempo real en el frontend
-        ranking_data = sorted(ranking_data, key=lambda x: (x['promedio_tecnico'], x['ia_match']), reverse=True)
+        # KPIs de Evaluación (Promedio de todos los tipos: QUIZ y CODING)
+        avg_technical = Assessment.objects.filter(filters, status__in=['EVALUATED']).aggregate(Avg('score'))['score__avg'] or 0
+        application_kpis = Application.objects.filter(filters).aggregate(total=Count('id'), avg_match=Avg('match_score'))
+
+        # Conteos por estado: alimentan status_distribution y el gráfico de pastel
+        status_counts = list(Application.objects.filter(filters).values('status').annotate(total=Count('id')).order_by())
 
-        # 1. KPIs de Evaluación (Promedio de todos los tipos: QUIZ y CODING)
-        assessments_qs = Assessment.objects.filter(filters, status__in=['EVALUATED'])
-        avg_technical = assessments_qs.aggregate(Avg('score'))['score__avg'] or 0
-        # Obtenemos los conteos para el gráfico de pastel
-        status_counts = Application.objects.filter(filters).values('status').annotate(total=Count('id'))
-    
         # Mapeo de nombres técnicos a etiquetas amigables para el Dashboard
         friendly_status_map = {
             'APPROVED': 'Aprobados',
@@ -110,38 +97,32 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         type_data = [
             {
                 "type": "Prueba de Código" if item['assessment_type'] == 'CODING' else "Cuestionario (Quiz)",
-                "percentage": round(item['avg_score'], 1)
+                "percentage": round(item['avg_score'] or 0, 1)
             } for item in type_performance
         ]
 
+        # Top 5 por match_score, reutilizando los resúmenes ya cargados
         top_candidates_data = []
-        apps = Application.objects.filter(filters).order_by('-match_score')[:5]
-
-        for app in apps:
-            # Obtenemos el promedio de todas las pruebas del candidato para este proyecto
-            cand_assessments = Assessment.objects.filter(
-                candidate_id=app.candidate_id, 
-                project_id=app.project_id,
-                status__in=['EVALUATED', 'COMPLETED']
-            )
-            
+        for summary in sorted(summaries, key=lambda x: x.match_score, reverse=True)[:5]:
             top_candidates_data.append({
-                "username": app.candidate.username,
-                "match_score": app.match_score,
-                "project_title": app.project.title,
-                "tech_score_avg": round(cand_assessments.aggregate(Avg('score'))['score__avg'] or 0, 1),
-                "tests_count": cand_assessments.count() # Indica cuántas pruebas hizo
+                "username": summary.candidate.username,
+                "match_score": summary.match_score,
+                "project_title": summary.project.title,
+                "tech_score_avg": round(summary.completed_avg, 1),
+                "tests_count": summary.completed_count # Indica cuántas pruebas hizo
             })
-          
+
+        projects_list = list(Project.objects.values('id', 'title'))
+
         return Response({
-            "projects_list": Project.objects.values('id', 'title'),
+            "projects_list": projects_list,
             "kpis": {
-                "projects": Project.objects.count(),
-                "applications": Application.objects.filter(filters).count(),
-                "avg_match": round(Application.objects.filter(filters).aggregate(Avg('match_score'))['match_score__avg'] or 0, 1),
+                "projects": len(projects_list),
+                "applications": application_kpis['total'],
+                "avg_match": round(application_kpis['avg_match'] or 0, 1),
                 "avg_technical": round(avg_technical, 1)
             },
-            "status_distribution": list(Application.objects.filter(filters).values('status').annotate(total=Count('id'))),
+            "status_distribution": status_counts,
             "top_candidates": top_candidates_data,
             "pie_data": pie_data, # Nuevos datos para el gráfico de pastel
             "type_performance": type_data, # Nueva data para las barras
@@ -158,65 +139,44 @@ class ApplicationViewSet(viewsets.ModelViewSet):
             qs = qs.filter(candidate=self.request.user)
         return qs
 
-    def perform_create(self, serializer):
-        # Procesamiento de CV con IA (código de tu compañero)
-        app = serializer.save(candidate=self.request.user)
-
-        # 1. EXTRAER TEXTO DEL ARCHIVO
-        if app.cv_file:
-            text = extract_text(app.cv_file.path)
-            app.parsed_text = text[:20000]
-
-        # 2. ENVIAR A IA PARA JSON
-        extracted = {}
-        if app.parsed_text:
-            try:
-                extracted = parse_cv_text(app.parsed_text)
-                # Validar que extracted sea un diccionario y no None
-                if not isinstance(extracted, dict):
-                    extracted = {"error": "La IA retornó un formato inválido"}
-            except Exception as e:
-                extracted = {"error": str(e)}
-
-        app.extracted = extracted
-        project = serializer.validated_data['project']
-        requirements = {
-            "title": project.title,
-            "skills": project.required_skills,
-            "description": project.description
-        }
-
-        # 1. Llamamos a la nueva función de calificación
-        scores = calculate_candidate_score(extracted, requirements) #
-        
-        s_score = scores.get("skills_score", 0)
-        e_score = scores.get("experience_score", 0)
+    def create(self, request, *args, **kwargs):
+        """
+        Registra la aplicación y encola el procesamiento del CV.
+        Responde 202: el cliente consulta el avance en /applications/{id}/processing/
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED, headers=headers)
 
-        # 2. APLICAMOS LOS PESOS (Skills 40%, Experience 60%)
-        # Fórmula: (Skills * 0.4) + (Experience * 0.6)
-        final_score = (s_score * 0.4) + (e_score * 0.6) #
+    def perform_create(self, serializer):
+        # La extracción, el parsing con IA, el scoring y las notificaciones
+        # se ejecutan en el worker (python manage.py process_cv_jobs)
+        app = serializer.save(candidate=self.request.user, processing_status="PENDING")
+        enqueue_application(app)
 
-        print(f"📊 Calificación: Skills({s_score}) + Exp({e_score}) = Total: {final_score}")
+    def perform_update(self, serializer):
+        # PUT y PATCH: el resumen del ranking refleja el estado y el proyecto nuevos
+        refresh_summary_for_application(serializer.save())
 
-        # 3. Guardamos la postulación con la nueva nota
-        serializer.save(
-            extracted=extracted,
-            score=final_score,
-            ai_analysis=scores.get("justification", "Sin análisis disponible"),
-            hard_skills=extracted.get("skills", {}).get("hard", []),
-            soft_skills=extracted.get("skills", {}).get("soft", [])
-        )
+    @action(detail=True, methods=['get'])
+    def processing(self, request, pk=None):
+        """
+        Estado del procesamiento asíncrono del CV
+        GET /api/recruiting/applications/{id}/processing/
+        """
+        application = self.get_object()
+        job = CVProcessingJob.objects.filter(application=application).first()
 
-        app.match_score = final_score*10
-        app.save()
-        
-        # Enviar notificaciones por email a admins
-        from .email_service import notify_new_application
-        try:
-            notify_new_application(app.id)
-            print(f"✅ Notificaciones enviadas a admins para application {app.id}")
-        except Exception as e:
-            print(f"❌ Error enviando notificaciones para application {app.id}: {str(e)}")
+        return Response({
+            "application_id": application.id,
+            "processing_status": application.processing_status,
+            "current_stage": job.current_stage if job else "",
+            "stages": job.stages if job else {},
+            "error": job.last_error if job else "",
+            "updated_at": job.updated_at if job else None,
+        })
 
     # Endpoint personalizado para actualizar el estado (solo admin)
     @action(detail=True, methods=['patch'], permission_classes=[permissions.IsAdminUser])
@@ -239,6 +199,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         
         application.status = new_status
         application.save()
+        refresh_summary_for_application(application)
         
         serializer = self.get_serializer(application)
         return Response(serializer.data)
@@ -288,7 +249,7 @@ class ApplicationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Enviar notificaciones a admins
+        # Encolar notificaciones a admins
         result = notify_new_application(application_id=application.id)
         
-        return Response(result, status=status.HTTP_200_OK)
+        return Response(result, status=status.HTTP_202_ACCEPTED if result["success"] else status.HTTP_500_INTERNAL_SERVER_ERROR)